@@ -0,0 +1,126 @@
+"""Closed-loop load test of the auth stack: signup, login then /users/me.
+
+Run it against a server using the in-memory Cognito backend, so the
+numbers are those of Django, the database and the JWT validation rather
+than of AWS (and no user is left in a real pool)::
+
+    COGNITO_BACKEND=django_app.integrations.cognito.fake_cognito.FakeCognito \\
+    COGNITO_JWKS_LOADER=django_app.integrations.cognito.fake_cognito.load_jwks \\
+    COGNITO_FAKE_LATENCY=0.05 \\
+    CELERY_TASK_ALWAYS_EAGER=true \\
+    AUTH_THROTTLE_IP_RATE= AUTH_THROTTLE_RATE= \\
+    python manage.py runserver --noreload
+
+    python -m benchmarks.bench_auth_stack --base-url http://localhost:8000 --users 50 --iterations 20
+
+The fake keeps its users and signing key in the server process, serve a
+single process (threads or an async worker) running the signup tasks
+eagerly. The virtual users share an IP, the IP and global auth throttles
+are lifted. Each of the `--users` virtual users signs up, polls the signup
+until it is done and logs in once, then calls /users/me `--iterations`
+times; the next request is sent as soon as the previous one answers.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from benchmarks.utils import report
+
+PASSWORD = "P@ssw0rd!1"  # noqa: S105
+
+
+class Recorder:
+    """
+    Collect the latency of every request per step
+    """
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def call(self, step: str, send) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = send()
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - started
+
+        if response is None or response.is_error:
+            self.error(step)
+            return None
+        with self._lock:
+            self.latencies[step].append(elapsed)
+        return response
+
+    def error(self, step: str):
+        with self._lock:
+            self.errors[step] += 1
+
+
+def virtual_user(client: httpx.Client, recorder: Recorder, iterations: int):
+    email = f"bench-{uuid.uuid4().hex}@example.com"
+    credentials = {"email": email, "password": PASSWORD}
+
+    response = recorder.call("signup", lambda: client.post("/api/auth/sign-up/", json=credentials))
+    if response is None:
+        return
+    location = response.headers["Location"]
+    while response.json()["status"] == "pending":
+        time.sleep(0.05)
+        response = recorder.call("signup status", lambda: client.get(location))
+        if response is None:
+            return
+    if response.json()["status"] != "completed":
+        recorder.error("signup")
+        return
+
+    response = recorder.call("login", lambda: client.post("/api/auth/login/", json=credentials))
+    if response is None:
+        return
+
+    headers = {"Authorization": f"Bearer {response.json()['id_token']}"}
+    for _ in range(iterations):
+        recorder.call("me", lambda: client.get("/api/users/me/", headers=headers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=20, help="/users/me calls per virtual user")
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    with (
+        httpx.Client(base_url=args.base_url, limits=limits, timeout=30) as client,
+        ThreadPoolExecutor(max_workers=args.users) as executor,
+    ):
+        started = time.perf_counter()
+        futures = [executor.submit(virtual_user, client, recorder, args.iterations) for _ in range(args.users)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+    report(f"all steps, {args.users} users", total / elapsed, "requests/s")
+    for step in ("signup", "signup status", "login", "me"):
+        latencies = recorder.latencies[step]
+        if len(latencies) > 1:
+            quantiles = statistics.quantiles(latencies, n=100)
+            for name, value in (("p50", quantiles[49]), ("p95", quantiles[94]), ("p99", quantiles[98])):
+                report(f"{step} {name}", value * 1000, "ms")
+        report(f"{step} errors", recorder.errors[step], "requests")
+
+
+if __name__ == "__main__":
+    main()
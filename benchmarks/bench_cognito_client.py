@@ -0,0 +1,61 @@
+"""Load test the boto3 Cognito client against a local stub endpoint.
+
+Compares the botocore defaults with the settings driven configuration
+at 64 concurrent requests, each stub call waits 50ms like an AWS round-trip.
+Besides throughput it reports the TCP connections opened: with the default
+pool of 10 every request beyond the pool size opens (and against AWS, TLS
+handshakes) a new connection.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import report
+from benchmarks.utils import setup_django
+
+CONCURRENCY = 64
+REQUESTS = 2000
+LATENCY = 0.05
+
+
+def run(client) -> float:
+    import time
+
+    def call(_):
+        client.admin_get_user(UserPoolId="pool", Username="john")
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        # Warm up the connection pool.
+        list(executor.map(call, range(CONCURRENCY)))
+        started = time.perf_counter()
+        list(executor.map(call, range(REQUESTS)))
+        return REQUESTS / (time.perf_counter() - started)
+
+
+def main():
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "key")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "secret")
+    setup_django()
+
+    from botocore.config import Config
+    from django.conf import settings
+
+    from django_app.integrations.cognito.client import create_client
+    from django_app.integrations.cognito.client import get_client_config
+    from django_app.integrations.cognito.tests.stub_server import StubCognitoServer
+
+    with StubCognitoServer({"AdminGetUser": (200, {"Username": "john"})}, latency=LATENCY) as server:
+        settings.COGNITO_ENDPOINT_URL = server.url
+        settings.COGNITO_CLIENT_MAX_POOL_CONNECTIONS = CONCURRENCY
+
+        for name, config in (
+            ("botocore defaults", Config(region_name=settings.AWS_REGION)),
+            ("tuned client", get_client_config()),
+        ):
+            server.connections = 0
+            report(f"{name}, {CONCURRENCY} threads", run(create_client(config)), "requests/s")
+            report(f"{name}, connections opened", server.connections, "connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Benchmark the overhead of the Cognito call instrumentation on a call doing nothing."""
+
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import setup_django
+
+ITERATIONS = 200000
+
+
+def main():
+    setup_django()
+
+    from django_app.integrations.cognito.instrumentation import instrument
+
+    def call():
+        return None
+
+    instrumented = instrument("bench")(call)
+
+    bare = measure(call, ITERATIONS)
+    measured = measure(instrumented, ITERATIONS)
+    report("bare call", bare, "calls/s")
+    report("instrumented call", measured, "calls/s")
+    report("overhead", (1 / measured - 1 / bare) * 1e9, "ns/call")
+
+
+if __name__ == "__main__":
+    main()
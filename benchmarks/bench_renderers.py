@@ -0,0 +1,67 @@
+"""Benchmark JSON rendering of a 10k-user list page, DRF's JSONRenderer against ORJSONRenderer.
+
+Two payloads: the serializer output (UUIDs and datetimes already strings)
+and raw values (UUID, datetime and Decimal objects), as returned by views
+building dicts themselves.
+"""
+
+import datetime
+import decimal
+import uuid
+
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import setup_django
+
+USERS = 10000
+ITERATIONS = 20
+
+
+def build_payloads() -> dict[str, dict]:
+    now = datetime.datetime.now(tz=datetime.UTC)
+    raw = [
+        {
+            "uuid": uuid.uuid4(),
+            "cognito_sub": uuid.uuid4(),
+            "email": f"user{i}@example.com",
+            "first_name": "John",
+            "last_name": "Doe",
+            "created": now - datetime.timedelta(seconds=i),
+            "modified": now,
+            "dob": datetime.date(1990, 1, 1),
+            "city": "San Francisco",
+            "country": "US",
+            "balance": decimal.Decimal("12.50"),
+        }
+        for i in range(USERS)
+    ]
+    serialized = [
+        {
+            key: value.isoformat().replace("+00:00", "Z") if isinstance(value, datetime.date) else str(value)
+            for key, value in row.items()
+        }
+        for row in raw
+    ]
+    return {
+        "serializer output": {"next": None, "previous": None, "results": serialized},
+        "raw values": {"next": None, "previous": None, "results": raw},
+    }
+
+
+def main():
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from django_app.core.renderers import ORJSONRenderer
+
+    for payload_name, payload in build_payloads().items():
+        size = len(JSONRenderer().render(payload))
+        report(f"{payload_name}, size", size / 1024, "KiB")
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            rate = measure(lambda renderer=renderer, payload=payload: renderer.render(payload), ITERATIONS)
+            report(f"{payload_name}, {type(renderer).__name__}", rate * USERS, "users/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure the startup cost the lazy Cognito provider keeps out of every process.
+
+Reports, each in a fresh interpreter:
+- `manage.py check` wall time, the floor of every management command
+- Django setup plus URLconf import, what a gunicorn worker pays on boot
+- Building the first RealCognito, the cost that used to be paid on import
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.utils import BASE_DIR
+from benchmarks.utils import report
+
+RUNS = 5
+
+SETUP = (
+    "import sys, time; sys.path.append('django_app'); import django; "
+    "started = time.perf_counter(); django.setup(); import config.urls; "
+)
+
+
+def best_of(command: list[str], env: dict) -> list[str]:
+    outputs = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        result = subprocess.run(  # noqa: S603
+            command,
+            capture_output=True,
+            check=True,
+            cwd=BASE_DIR,
+            env=env,
+            text=True,
+        )
+        outputs.append((time.perf_counter() - started, result.stdout.strip()))
+    return min(outputs)
+
+
+def main():
+    env = {
+        "DJANGO_SETTINGS_MODULE": "config.settings.test",
+        "AWS_ACCESS_KEY_ID": "key",
+        "AWS_SECRET_ACCESS_KEY": "secret",
+        **os.environ,
+    }
+
+    elapsed, _ = best_of([sys.executable, "manage.py", "check", "--deploy", "--fail-level", "CRITICAL"], env)
+    report("manage.py check", elapsed * 1000, "ms")
+
+    _, output = best_of(
+        [sys.executable, "-c", SETUP + "print((time.perf_counter() - started) * 1000)"],
+        env,
+    )
+    report("django.setup() + URLconf import", float(output), "ms")
+
+    _, output = best_of(
+        [
+            sys.executable,
+            "-c",
+            SETUP + "started = time.perf_counter(); "
+            "from django_app.integrations.cognito.real_cognito import RealCognito; RealCognito(); "
+            "print((time.perf_counter() - started) * 1000)",
+        ],
+        env,
+    )
+    report("first RealCognito() (deferred cost)", float(output), "ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark Cognito token verification with and without the verified token cache."""
+
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import setup_django
+
+ITERATIONS = 20000
+
+
+def main():
+    setup_django()
+
+    import json
+    import tempfile
+    from pathlib import Path
+
+    from django.conf import settings
+
+    from django_app.integrations.cognito import jwks
+    from django_app.integrations.cognito.authentication import CognitoTokenValidator
+    from django_app.integrations.cognito.tests.utils import generate_rsa_key
+    from django_app.integrations.cognito.tests.utils import make_token
+
+    private_key, jwk = generate_rsa_key("bench")
+    with tempfile.TemporaryDirectory() as directory:
+        jwks_file = Path(directory) / "jwks.json"
+        jwks_file.write_text(json.dumps({"keys": [jwk]}))
+        jwks._store = jwks.JWKSStore(file_path=str(jwks_file))  # noqa: SLF001
+
+        validator = CognitoTokenValidator(
+            settings.COGNITO_AWS_REGION,
+            settings.COGNITO_USER_POOL,
+            settings.COGNITO_AUDIENCE,
+        )
+        token = make_token(
+            private_key,
+            "bench",
+            validator.pool_url,
+            settings.COGNITO_AUDIENCE,
+            **{"cognito:username": "bench"},
+        )
+
+        settings.COGNITO_TOKEN_CACHE_ENABLED = False
+        report("verify without cache", measure(lambda: validator.validate(token), ITERATIONS), "verifications/s")
+
+        settings.COGNITO_TOKEN_CACHE_ENABLED = True
+        report("verify with cache", measure(lambda: validator.validate(token), ITERATIONS), "verifications/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark GET /api/users/ on a 1M-row user table.
+
+Compares the cursor paginated list with OFFSET pagination at the same
+depth and with the previous unpaginated list serializing the whole table.
+The table is created in a throwaway test database, point DATABASE_URL at
+Postgres to measure the production setup::
+
+    python -m benchmarks.bench_user_list --rows 1000000
+"""
+
+import argparse
+import time
+import uuid
+from datetime import timedelta
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+from benchmarks.utils import report
+from benchmarks.utils import setup_django
+from benchmarks.utils import test_database
+
+BATCH_SIZE = 10000
+PAGE_SIZE = 50
+
+
+def populate(rows: int):
+    from django.utils import timezone
+
+    from django_app.users.models import User
+
+    started = timezone.now() - timedelta(microseconds=rows)
+    for offset in range(0, rows, BATCH_SIZE):
+        User.objects.bulk_create(
+            User(
+                uuid=uuid.uuid4(),
+                cognito_sub=uuid.uuid4(),
+                email=f"user{i}@example.com",
+                created=started + timedelta(microseconds=i),
+                modified=started + timedelta(microseconds=i),
+            )
+            for i in range(offset, min(offset + BATCH_SIZE, rows))
+        )
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skip-full", action="store_true", help="skip the unpaginated list of the whole table")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.pagination import Cursor
+    from rest_framework.pagination import LimitOffsetPagination
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.test import force_authenticate
+
+    from django_app.core.pagination import CursorPagination
+    from django_app.users.models import User
+    from django_app.users.views import UserViewSet
+
+    with test_database():
+        started = time.perf_counter()
+        populate(args.rows)
+        report(f"insert {args.rows:,} users", time.perf_counter() - started, "s")
+
+        user = User.objects.order_by("created").first()
+        factory = APIRequestFactory()
+        depth = args.rows * 9 // 10
+
+        def list_users(pagination_class, **params):
+            request = factory.get("/api/users/", params)
+            force_authenticate(request, user)
+            view = UserViewSet.as_view({"get": "list"}, pagination_class=pagination_class)
+            response = view(request)
+            response.render()
+            return response
+
+        report("cursor, first page", timed(lambda: list_users(CursorPagination)), "ms")
+
+        # Cursor of the page starting `depth` rows in, as a `next` link would carry.
+        paginator = CursorPagination()
+        paginator.base_url = "/api/users/"
+        boundary = User.objects.order_by("-created", "-uuid").values_list("created", flat=True)[depth]
+        link = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(boundary)))
+        cursor = parse_qs(urlsplit(link).query)["cursor"][0]
+        report(f"cursor, page at row {depth:,}", timed(lambda: list_users(CursorPagination, cursor=cursor)), "ms")
+
+        report("offset, first page", timed(lambda: list_users(LimitOffsetPagination, limit=PAGE_SIZE)), "ms")
+        report(
+            f"offset, page at row {depth:,}",
+            timed(lambda: list_users(LimitOffsetPagination, limit=PAGE_SIZE, offset=depth)),
+            "ms",
+        )
+
+        if not args.skip_full:
+            report("unpaginated, whole table", timed(lambda: list_users(None)), "ms")
+
+
+if __name__ == "__main__":
+    main()
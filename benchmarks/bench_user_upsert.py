@@ -0,0 +1,76 @@
+"""Benchmark `UserManager.bulk_upsert` on 100k users.
+
+Upserts the users into an empty table (all inserted), again (all
+updated), then a half new, half existing set, and compares with one
+`update_or_create` per user on a sample. The table is created in a
+throwaway test database, point DATABASE_URL at Postgres to measure the
+production setup::
+
+    python -m benchmarks.bench_user_upsert --rows 100000
+"""
+
+import argparse
+import time
+import uuid
+
+from benchmarks.utils import report
+from benchmarks.utils import setup_django
+from benchmarks.utils import test_database
+
+
+def make_users(start: int, stop: int, subs: dict[int, uuid.UUID]):
+    from django_app.users.models import User
+
+    for i in range(start, stop):
+        yield User(
+            email=f"user{i}@example.com",
+            cognito_sub=subs.setdefault(i, uuid.uuid4()),
+            first_name=f"First {i}",
+            last_name=f"Last {i}",
+            country="US",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--sample", type=int, default=2_000, help="users upserted one by one for comparison")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django_app.users.models import User
+
+    update_fields = ["email", "first_name", "last_name", "country"]
+    subs: dict[int, uuid.UUID] = {}
+
+    def upsert(name: str, start: int, stop: int):
+        started = time.perf_counter()
+        result = User.objects.bulk_upsert(
+            make_users(start, stop, subs),
+            update_fields=update_fields,
+            batch_size=args.batch_size,
+        )
+        elapsed = time.perf_counter() - started
+        report(f"{name}, created", result.created, "rows")
+        report(f"{name}, updated", result.updated, "rows")
+        report(f"{name}, throughput", (stop - start) / elapsed, "rows/s")
+
+    with test_database():
+        upsert("bulk_upsert insert", 0, args.rows)
+        upsert("bulk_upsert update", 0, args.rows)
+        upsert("bulk_upsert mixed", args.rows // 2, args.rows + args.rows // 2)
+
+        started = time.perf_counter()
+        for user in make_users(0, args.sample, subs):
+            User.objects.update_or_create(
+                cognito_sub=user.cognito_sub,
+                defaults={name: getattr(user, name) for name in update_fields},
+            )
+        elapsed = time.perf_counter() - started
+        report("update_or_create per row, throughput", args.sample / elapsed, "rows/s")
+
+
+if __name__ == "__main__":
+    main()
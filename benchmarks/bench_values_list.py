@@ -0,0 +1,85 @@
+"""Benchmark UserViewSet.list built by the serializer against the `values()` read path.
+
+Lists 10k users unpaginated, once with `UserSerializer` and once with a
+serializer exposing most user columns, and reports rows/s of building
+the response data (rendering excluded).
+"""
+
+import argparse
+
+from benchmarks.bench_user_list import populate
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import setup_django
+from benchmarks.utils import test_database
+
+ITERATIONS = 5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework import serializers
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.test import force_authenticate
+
+    from django_app.users.models import User
+    from django_app.users.serializers import UserSerializer
+    from django_app.users.views import UserViewSet
+
+    class WideUserSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = User
+            fields = [
+                "uuid",
+                "email",
+                "cognito_sub",
+                "created",
+                "modified",
+                "last_login",
+                "dob",
+                "first_name",
+                "last_name",
+                "is_active",
+                "street_line_1",
+                "city",
+                "state",
+                "postal_code",
+                "country",
+                "gender",
+                "race",
+            ]
+
+    with test_database():
+        populate(args.rows)
+        user = User.objects.first()
+        factory = APIRequestFactory()
+
+        def list_users(serializer_class, *, list_from_values: bool):
+            request = factory.get("/api/users/")
+            force_authenticate(request, user)
+            view = UserViewSet.as_view(
+                {"get": "list"},
+                serializer_class=serializer_class,
+                pagination_class=None,
+                list_from_values=list_from_values,
+            )
+            return view(request).data
+
+        for serializer_class in (UserSerializer, WideUserSerializer):
+            columns = len(serializer_class.Meta.fields)
+            for list_from_values in (False, True):
+                rate = measure(
+                    lambda s=serializer_class, v=list_from_values: list_users(s, list_from_values=v),
+                    ITERATIONS,
+                )
+                path = "values()" if list_from_values else "serializer"
+                report(f"{columns} fields, {path}", rate * args.rows, "rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Helpers shared by the benchmark scripts.
+
+Run a benchmark from the project root, for example::
+
+    python -m benchmarks.bench_token_cache
+"""
+
+import os
+import sys
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+
+
+def setup_django(settings_module: str = "config.settings.test"):
+    """
+    Configure Django the same way manage.py does
+    """
+    sys.path.append(str(BASE_DIR / "django_app"))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Create a throwaway test database, tables are built from the models
+
+    Point DATABASE_URL at Postgres to measure the production setup, the
+    migrations building indexes concurrently are Postgres only so they are skipped.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.settings_dict["TEST"]["MIGRATE"] = False
+    name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+
+
+def measure(func: Callable[[], object], iterations: int) -> float:
+    """
+    Run `func` `iterations` times and return the number of calls per second
+    """
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    return iterations / elapsed
+
+
+def report(name: str, value: float, unit: str):
+    """
+    Print one benchmark result
+    """
+    print(f"{name:<40} {value:>14,.0f} {unit}")  # noqa: T201
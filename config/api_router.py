@@ -1,15 +1,24 @@
 from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
 
+from django_app.users import async_views
 from django_app.users.views import AuthViewSet
+from django_app.users.views import UserImportViewSet
 from django_app.users.views import UserViewSet
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 
 router.register("users", UserViewSet)
 router.register("auth", AuthViewSet, basename="auth")
+router.register("user-imports", UserImportViewSet, basename="user-import")
 
 
 app_name = "api"
-urlpatterns = router.urls
+urlpatterns = [
+    *router.urls,
+    # Async auth endpoints, served without blocking a worker when running under ASGI
+    path("auth/async/sign-up/", async_views.signup, name="auth-async-sign-up"),
+    path("auth/async/login/", async_views.login, name="auth-async-login"),
+]
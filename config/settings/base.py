@@ -316,12 +316,63 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.TokenAuthentication",
-        "django_cognito_jwt.JSONWebTokenAuthentication",
+        "django_app.integrations.cognito.authentication.JSONWebTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "django_app.core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "django_app.core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "EXCEPTION_HANDLER": "django_app.core.exception_handler.process_exception",
+    # Proxies appending to X-Forwarded-For in front of Django, the throttles identify clients with it
+    # (0: REMOTE_ADDR only, a client could otherwise pick its own IP)
+    "NUM_PROXIES": env.int("DJANGO_NUM_PROXIES", default=0),
+    # Sliding-window rates of django_app/users/throttling.py (empty: no limit)
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_ip": env("AUTH_THROTTLE_IP_RATE", default="20/min"),
+        "auth_email": env("AUTH_THROTTLE_EMAIL_RATE", default="5/min"),
+        # Under the Cognito quotas of AdminCreateUser and AdminInitiateAuth
+        "auth": env("AUTH_THROTTLE_RATE", default="50/s"),
+    },
 }
+# Page size of list endpoints, `?page_size=` overrides it up to API_MAX_PAGE_SIZE
+API_PAGE_SIZE = env.int("API_PAGE_SIZE", default=50)
+API_MAX_PAGE_SIZE = env.int("API_MAX_PAGE_SIZE", default=500)
+# Cache of the /api/users/me/ response, the Redis cache in production
+USERS_ME_CACHE_ALIAS = "default"
+USERS_ME_CACHE_TIMEOUT = env.int("USERS_ME_CACHE_TIMEOUT", default=5 * 60)
+# Rows per INSERT ... ON CONFLICT statement of UserManager.bulk_upsert
+USERS_BULK_UPSERT_BATCH_SIZE = env.int("USERS_BULK_UPSERT_BATCH_SIZE", default=1000)
+# Bulk user import, see django_app/users/imports.py
+USERS_IMPORT_MAX_ROWS = env.int("USERS_IMPORT_MAX_ROWS", default=100_000)
+USERS_IMPORT_CHUNK_SIZE = env.int("USERS_IMPORT_CHUNK_SIZE", default=100)
+# Cognito calls in flight per chunk task
+USERS_IMPORT_CONCURRENCY = env.int("USERS_IMPORT_CONCURRENCY", default=8)
+# Cognito calls per second of all workers together, keep it under the AdminCreateUser quota (0: no limit)
+USERS_IMPORT_COGNITO_RATE = env.int("USERS_IMPORT_COGNITO_RATE", default=20)
+USERS_IMPORT_CACHE_ALIAS = "default"
+USERS_IMPORT_MAX_ERRORS = env.int("USERS_IMPORT_MAX_ERRORS", default=100)
+# Signup outbox, see django_app/users/outbox.py
+# Fernet key of the passwords waiting in the outbox, derived from SECRET_KEY when not set
+SIGNUP_OUTBOX_ENCRYPTION_KEY = env("SIGNUP_OUTBOX_ENCRYPTION_KEY", default=None)
+# Seconds a worker holds a signup, past them another worker may take it over
+SIGNUP_OUTBOX_LEASE = env.int("SIGNUP_OUTBOX_LEASE", default=60)
+SIGNUP_OUTBOX_MAX_ATTEMPTS = env.int("SIGNUP_OUTBOX_MAX_ATTEMPTS", default=8)
+# Seconds before a pending signup is sent again by the relay_signups periodic task
+SIGNUP_OUTBOX_RELAY_DELAY = env.int("SIGNUP_OUTBOX_RELAY_DELAY", default=60)
+SIGNUP_OUTBOX_RELAY_BATCH_SIZE = env.int("SIGNUP_OUTBOX_RELAY_BATCH_SIZE", default=500)
+# Custom attribute of the user pool holding the signup id of the Cognito users created by a signup,
+# a retry only adopts a user holding its id. The attribute must exist in the pool schema, e.g.
+# custom:signup_id (empty: not sent and never adopt, a lost create fails the signup)
+COGNITO_SIGNUP_ID_ATTRIBUTE = env("COGNITO_SIGNUP_ID_ATTRIBUTE", default="")
+# Bearer token required by the Prometheus /metrics endpoint, when not set it is only served with DEBUG on
+METRICS_TOKEN = env("METRICS_TOKEN", default=None)
 
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
 CORS_URLS_REGEX = r"^/api/.*$"
@@ -340,6 +391,50 @@ SPECTACULAR_SETTINGS = {
 AWS_REGION = env("AWS_REGION", default="us-east-1")
 COGNITO_USER_POOL_ID = env("COGNITO_USER_POOL_ID")
 COGNITO_CLIENT_ID = env("COGNITO_CLIENT_ID")
+# Cognito backends, built lazily per process by django_app/integrations/cognito/provider.py
+COGNITO_BACKEND = env(
+    "COGNITO_BACKEND",
+    default="django_app.integrations.cognito.real_cognito.RealCognito",
+)
+COGNITO_ASYNC_BACKEND = env(
+    "COGNITO_ASYNC_BACKEND",
+    default="django_app.integrations.cognito.async_cognito.AsyncCognito",
+)
+# In-memory backend (django_app.integrations.cognito.fake_cognito.FakeCognito) used for load tests
+COGNITO_FAKE_LATENCY = env.float("COGNITO_FAKE_LATENCY", default=0)
+COGNITO_FAKE_LATENCY_JITTER = env.float("COGNITO_FAKE_LATENCY_JITTER", default=0)
+COGNITO_FAKE_ERROR_RATE = env.float("COGNITO_FAKE_ERROR_RATE", default=0)
+COGNITO_FAKE_TOKEN_VALIDITY = env.int("COGNITO_FAKE_TOKEN_VALIDITY", default=60 * 60)
+# Override the Cognito endpoint, e.g. to point the clients at a local stub server
+COGNITO_ENDPOINT_URL = env("COGNITO_ENDPOINT_URL", default=None)
+COGNITO_CLIENT_MAX_POOL_CONNECTIONS = env.int("COGNITO_CLIENT_MAX_POOL_CONNECTIONS", default=50)
+COGNITO_CLIENT_CONNECT_TIMEOUT = env.float("COGNITO_CLIENT_CONNECT_TIMEOUT", default=2)
+COGNITO_CLIENT_READ_TIMEOUT = env.float("COGNITO_CLIENT_READ_TIMEOUT", default=5)
+# https://boto3.amazonaws.com/v1/documentation/api/latest/guide/retries.html
+COGNITO_CLIENT_RETRY_MODE = env("COGNITO_CLIENT_RETRY_MODE", default="adaptive")
+COGNITO_CLIENT_MAX_ATTEMPTS = env.int("COGNITO_CLIENT_MAX_ATTEMPTS", default=3)
+COGNITO_CLIENT_TCP_KEEPALIVE = env.bool("COGNITO_CLIENT_TCP_KEEPALIVE", default=True)
+# Cognito circuit breaker and bulkhead of every process, see django_app/integrations/cognito/resilience.py
+# Failed calls in a row opening the breaker, seconds it stays open before probing Cognito again
+COGNITO_BREAKER_FAILURE_THRESHOLD = env.int("COGNITO_BREAKER_FAILURE_THRESHOLD", default=5)
+COGNITO_BREAKER_RESET_TIMEOUT = env.float("COGNITO_BREAKER_RESET_TIMEOUT", default=30)
+COGNITO_BREAKER_HALF_OPEN_CALLS = env.int("COGNITO_BREAKER_HALF_OPEN_CALLS", default=1)
+# Cognito calls in flight per process, and seconds a call waits for a slot before being shed
+COGNITO_BULKHEAD_SIZE = env.int("COGNITO_BULKHEAD_SIZE", default=20)
+COGNITO_BULKHEAD_TIMEOUT = env.float("COGNITO_BULKHEAD_TIMEOUT", default=0.5)
+# Coalescing of identical Cognito reads and logins in flight, see django_app/integrations/cognito/singleflight.py
+# Logins and refreshes are only coalesced in the process, credentials and tokens stay out of the cache
+COGNITO_SINGLE_FLIGHT_ENABLED = env.bool("COGNITO_SINGLE_FLIGHT_ENABLED", default=True)
+COGNITO_SINGLE_FLIGHT_ALIAS = "default"
+# Seconds the lock and outcome of a call live in the cache
+COGNITO_SINGLE_FLIGHT_TIMEOUT = env.int("COGNITO_SINGLE_FLIGHT_TIMEOUT", default=10)
+# Seconds other processes wait for a call, past them they make it themselves
+COGNITO_SINGLE_FLIGHT_WAIT = env.float("COGNITO_SINGLE_FLIGHT_WAIT", default=2)
+# Cognito / database reconciliation, see django_app/users/reconciliation.py
+# Accounts held in memory per side, the rest is spilled to temporary files
+COGNITO_RECONCILE_CHUNK_SIZE = env.int("COGNITO_RECONCILE_CHUNK_SIZE", default=10000)
+COGNITO_RECONCILE_TIME_LIMIT = env.int("COGNITO_RECONCILE_TIME_LIMIT", default=60 * 60)
+COGNITO_RECONCILE_CACHE_ALIAS = "default"
 
 # Django Cognito JWT
 # ------------------------------------------------------------------------------
@@ -347,3 +442,33 @@ COGNITO_USER_MODEL = "users.User"
 COGNITO_AWS_REGION = AWS_REGION
 COGNITO_USER_POOL = COGNITO_USER_POOL_ID
 COGNITO_AUDIENCE = COGNITO_CLIENT_ID
+# Read-through cache of the user row looked up for every authenticated request
+COGNITO_USER_CACHE_ALIAS = "default"
+COGNITO_USER_CACHE_TIMEOUT = env.int("COGNITO_USER_CACHE_TIMEOUT", default=5 * 60)
+# Local JWKS store, see django_app/integrations/cognito/jwks.py
+COGNITO_JWKS_URL = env(
+    "COGNITO_JWKS_URL",
+    default=f"https://cognito-idp.{AWS_REGION}.amazonaws.com/{COGNITO_USER_POOL_ID}/.well-known/jwks.json",
+)
+# Read keys from a local JWKS file instead of the user pool (tests, offline development)
+COGNITO_JWKS_FILE = env("COGNITO_JWKS_FILE", default=None)
+# Dotted path to a callable returning the JWKS document, e.g. the fake backend's keys:
+# django_app.integrations.cognito.fake_cognito.load_jwks
+COGNITO_JWKS_LOADER = env("COGNITO_JWKS_LOADER", default=None)
+COGNITO_JWKS_CACHE_ALIAS = "default"
+COGNITO_JWKS_TTL = env.int("COGNITO_JWKS_TTL", default=60 * 60)
+COGNITO_JWKS_REFRESH_MARGIN = env.int("COGNITO_JWKS_REFRESH_MARGIN", default=5 * 60)
+COGNITO_JWKS_MIN_REFETCH_INTERVAL = env.int("COGNITO_JWKS_MIN_REFETCH_INTERVAL", default=30)
+# Seconds an unknown `kid` is answered from memory before the shared copy is checked again
+COGNITO_JWKS_UNKNOWN_KID_TTL = env.int("COGNITO_JWKS_UNKNOWN_KID_TTL", default=60)
+# Verified token cache, see django_app/integrations/cognito/token_cache.py
+COGNITO_TOKEN_CACHE_ENABLED = env.bool("COGNITO_TOKEN_CACHE_ENABLED", default=True)
+COGNITO_TOKEN_CACHE_ALIAS = "default"  # noqa: S105
+COGNITO_TOKEN_CACHE_MAX_SIZE = env.int("COGNITO_TOKEN_CACHE_MAX_SIZE", default=10000)
+# Seconds a worker trusts its in-process copy before re-checking the shared cache
+COGNITO_TOKEN_CACHE_LOCAL_TTL = env.int("COGNITO_TOKEN_CACHE_LOCAL_TTL", default=30)
+# Must cover the longest token validity configured on the user pool
+COGNITO_TOKEN_CACHE_REVOCATION_TTL = env.int("COGNITO_TOKEN_CACHE_REVOCATION_TTL", default=24 * 60 * 60)
+# Tokens of a refresh token, shared until COGNITO_REFRESH_CACHE_MARGIN seconds before they expire
+COGNITO_REFRESH_CACHE_ALIAS = "default"
+COGNITO_REFRESH_CACHE_MARGIN = env.int("COGNITO_REFRESH_CACHE_MARGIN", default=5 * 60)
@@ -34,5 +34,10 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = "http://media.testserver"
+# COGNITO
+# ------------------------------------------------------------------------------
+# Never reach AWS from the test suite.
+COGNITO_BACKEND = "django_app.integrations.cognito.fake_cognito.FakeCognito"
+COGNITO_JWKS_LOADER = "django_app.integrations.cognito.fake_cognito.load_jwks"
 # Your stuff...
 # ------------------------------------------------------------------------------
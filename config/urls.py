@@ -6,6 +6,9 @@ from drf_spectacular.views import SpectacularAPIView
 from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework.authtoken.views import obtain_auth_token
 
+from django_app.core.views import metrics
+from django_app.integrations.cognito.urls import get_urlpatterns as cognito_urlpatterns
+
 
 # API URLS
 urlpatterns = [
@@ -19,6 +22,10 @@ urlpatterns = [
         SpectacularSwaggerView.as_view(url_name="api-schema"),
         name="api-docs",
     ),
+    # JWKS of the in-memory Cognito backend, only routed with that backend
+    *cognito_urlpatterns(),
+    # Prometheus scrape endpoint
+    path("metrics", metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
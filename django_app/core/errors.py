@@ -16,4 +16,13 @@ class AuthErrorMessage:
     SIGN_UP = ("Unable to sign up new account.",)
     LOGIN = ("Unable to login.",)
     INVALID_CREDENTIALS = ("Invalid credentials.",)
+    INVALID_REFRESH_TOKEN = ("Invalid or expired refresh token.",)
     USER_EXISTS = ("User already exists.",)
+
+
+class FilterErrorMessage:
+    """
+    Filter error messages
+    """
+
+    UNINDEXED_FILTER = ("This combination of filters is not supported.",)
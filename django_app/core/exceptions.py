@@ -2,6 +2,7 @@ from rest_framework import status
 
 from .errors import AuthErrorMessage
 from .errors import CognitoErrorMessage
+from .errors import FilterErrorMessage
 
 
 class BaseError(Exception):
@@ -115,3 +116,13 @@ class AuthError(BaseError):
     app_name = "AUTH"
     error = AuthErrorMessage
     status_code = status.HTTP_400_BAD_REQUEST
+
+
+class FilterError(BaseError):
+    """
+    Filter exception
+    """
+
+    app_name = "FILTER"
+    error = FilterErrorMessage
+    status_code = status.HTTP_400_BAD_REQUEST
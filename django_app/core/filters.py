@@ -0,0 +1,152 @@
+"""Define the filter backend of the model view sets, this file only lets clients filter on indexed columns."""
+
+from dataclasses import dataclass
+from functools import cache
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .exceptions import FilterError
+
+# Lookups a btree index serves.
+INDEXED_LOOKUPS = {"exact", "in", "gt", "gte", "lt", "lte", "startswith"}
+
+# Prefix matches need an index of their own: Django adds a `*_pattern_ops`
+# index for unique / db_index char fields on PostgreSQL, not for composite indexes.
+PATTERN_LOOKUPS = {"startswith"}
+
+
+@dataclass(frozen=True)
+class IndexedFilter:
+    """
+    One `?<field>__<lookup>=` query parameter
+    """
+
+    field: models.Field
+    lookup: str
+
+    @property
+    def param(self) -> str:
+        return self.field.name if self.lookup == "exact" else f"{self.field.name}__{self.lookup}"
+
+    def parse(self, value: str):
+        """
+        Convert the query parameter to the python value(s) of the field
+
+        Raises:
+            ValidationError: If a value is invalid for the field
+        """
+        if self.lookup == "in":
+            return [self.parse_one(item) for item in value.split(",") if item]
+        if self.lookup in PATTERN_LOOKUPS:
+            return value
+        return self.parse_one(value)
+
+    def parse_one(self, value: str):
+        try:
+            value = self.field.to_python(value)
+        except DjangoValidationError as e:
+            raise ValidationError({self.param: e.messages}) from e
+
+        if self.field.choices and value not in {choice for choice, _ in self.field.flatchoices}:
+            raise ValidationError({self.param: f"Select a valid choice. {value} is not one of the available choices."})
+        return value
+
+
+@cache
+def get_indexes(model: type[models.Model]) -> tuple[tuple[str, ...], ...]:
+    """
+    Get the columns (field names) of every index of the model, in index order
+    """
+    opts = model._meta  # noqa: SLF001
+    indexes = [(field.name,) for field in opts.concrete_fields if field.primary_key or field.unique or field.db_index]
+    indexes += [
+        tuple(name.removeprefix("-") for name in index.fields)
+        for index in opts.indexes
+        if index.fields and index.condition is None
+    ]
+    indexes += [
+        tuple(constraint.fields)
+        for constraint in opts.constraints
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields and constraint.condition is None
+    ]
+    indexes += [tuple(fields) for fields in opts.unique_together]
+    return tuple(indexes)
+
+
+@cache
+def get_filters(view_class: type) -> dict[str, IndexedFilter]:
+    """
+    Build the filters declared by `filterset_fields` of a view set, by query parameter
+
+    Raises:
+        ImproperlyConfigured: If a filter could not be served by an index
+    """
+    model = view_class.queryset.model
+    indexes = get_indexes(model)
+    indexed_fields = {name for index in indexes for name in index}
+    single_indexed_fields = {index[0] for index in indexes if len(index) == 1}
+
+    filters = {}
+    for name, lookups in view_class.filterset_fields.items():
+        field = model._meta.get_field(name)  # noqa: SLF001
+        if name not in indexed_fields:
+            msg = f"{view_class.__name__} filters on {name}, which is not indexed."
+            raise ImproperlyConfigured(msg)
+
+        for lookup in lookups:
+            if lookup not in INDEXED_LOOKUPS or (lookup in PATTERN_LOOKUPS and name not in single_indexed_fields):
+                msg = f"{view_class.__name__} filters on {name}__{lookup}, which an index can not serve."
+                raise ImproperlyConfigured(msg)
+
+            indexed_filter = IndexedFilter(field, lookup)
+            filters[indexed_filter.param] = indexed_filter
+    return filters
+
+
+class IndexedFilterBackend(BaseFilterBackend):
+    """
+    Filter the queryset with the `filterset_fields` of the view
+
+    `filterset_fields` maps field names to their lookups, e.g.
+    `{"email": ["exact", "startswith"], "created": ["gte", "lt"]}` accepts
+    `?email=`, `?email__startswith=`, `?created__gte=` and `?created__lt=`.
+
+    - Declared fields must be indexed, checked when the view is first used
+    - A query must filter on the leading column of at least one index,
+      e.g. `state` alone is rejected when it is only indexed after `country`,
+      so no accepted filter combination scans the table
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filters = get_filters(type(view))
+        applied = {
+            indexed_filter: indexed_filter.parse(request.query_params[param])
+            for param, indexed_filter in filters.items()
+            if request.query_params.get(param, "") != ""
+        }
+        if not applied:
+            return queryset
+
+        filtered_fields = {indexed_filter.field.name for indexed_filter in applied}
+        leading_fields = {index[0] for index in get_indexes(queryset.model)}
+        if not filtered_fields & leading_fields:
+            fields = ", ".join(sorted(leading_fields & set(view.filterset_fields)))
+            raise FilterError(code="UNINDEXED_FILTER", developer_message=f"Filter on at least one of: {fields}.")
+
+        return queryset.filter(**{f"{item.field.name}__{item.lookup}": value for item, value in applied.items()})
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": param,
+                "required": False,
+                "in": "query",
+                "description": f"{indexed_filter.field.verbose_name} ({indexed_filter.lookup})",
+                "schema": {"type": "string"},
+            }
+            for param, indexed_filter in get_filters(type(view)).items()
+        ]
@@ -0,0 +1,55 @@
+"""Define the application metrics, this file holds the Prometheus collectors shared by the apps."""
+
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+CACHE_REQUESTS = Counter(
+    "django_app_cache_requests_total",
+    "Response cache lookups by cache and result (hit, miss)",
+    ["cache", "result"],
+)
+
+COGNITO_COALESCED_CALLS = Counter(
+    "django_app_cognito_coalesced_calls_total",
+    "Cognito calls answered by an identical call in flight, by operation and by who made it (process, shared)",
+    ["operation", "source"],
+)
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    "django_app_circuit_breaker_state",
+    "State of a circuit breaker of the process (0 closed, 1 half-open, 2 open)",
+    ["breaker"],
+)
+
+CIRCUIT_BREAKER_TRANSITIONS = Counter(
+    "django_app_circuit_breaker_transitions_total",
+    "Circuit breaker state changes by breaker and new state",
+    ["breaker", "state"],
+)
+
+SHED_CALLS = Counter(
+    "django_app_shed_calls_total",
+    "Calls rejected without being made, by dependency and reason (open, half_open, bulkhead)",
+    ["dependency", "reason"],
+)
+
+COGNITO_CALL_DURATION = Histogram(
+    "django_app_cognito_call_duration_seconds",
+    "Duration of the Cognito calls by operation, failed calls included",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 0.75, 1, 2.5, 5, 10),
+)
+
+COGNITO_CALL_ERRORS = Counter(
+    "django_app_cognito_call_errors_total",
+    "Failed Cognito calls by operation and error code (e.g. USER_EXISTS), or exception class when it has none",
+    ["operation", "code"],
+)
+
+COGNITO_CALLS_IN_FLIGHT = Gauge(
+    "django_app_cognito_calls_in_flight",
+    "Cognito calls in flight by operation",
+    ["operation"],
+    multiprocess_mode="livesum",
+)
@@ -0,0 +1,34 @@
+"""Define the pagination classes, this file keeps list endpoints bounded whatever the table size."""
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination as BaseCursorPagination
+
+
+class CursorPagination(BaseCursorPagination):
+    """
+    Keyset (cursor) pagination
+
+    Pages are selected with a `WHERE` on the indexed `created` column
+    instead of a large OFFSET, the cost of a page does not grow with its
+    depth nor with the table. DRF positions the cursor on the first ordering
+    field only, rows created in the same microsecond are stepped over with a
+    small offset kept in the cursor. `-uuid` is no keyset column, it only
+    orders these rows deterministically so the offset lands on the same rows.
+
+    - `?cursor=` is the opaque cursor of the `next` / `previous` links
+    - `?page_size=` overrides `API_PAGE_SIZE`, up to `API_MAX_PAGE_SIZE`
+    """
+
+    ordering = ("-created", "-uuid")
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+def get_ordering_columns(paginator) -> list[str]:
+    """
+    Get the columns a cursor paginator reads from the rows of a page
+    """
+    ordering = getattr(paginator, "ordering", None) or ()
+    ordering = [ordering] if isinstance(ordering, str) else ordering
+    return [name.lstrip("-") for name in ordering]
@@ -0,0 +1,85 @@
+"""Define the request parsers, this file decodes JSON request bodies with orjson and streams bulk uploads."""
+
+import codecs
+import csv
+from collections.abc import Iterator
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSON parser backed by orjson
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        body = stream.read()
+        try:
+            # orjson reads UTF-8 bytes directly, other charsets are decoded first.
+            return orjson.loads(body if encoding.lower().replace("-", "") == "utf8" else body.decode(encoding))
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as e:
+            msg = f"JSON parse error - {e}"
+            raise ParseError(msg) from e
+
+
+class CSVStreamParser(BaseParser):
+    """
+    CSV parser reading the body lazily
+
+    Returns an iterator of dicts keyed by the header row, the body is read
+    line by line as the rows are consumed instead of being loaded whole.
+    """
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        lines = codecs.iterdecode(iter(stream.readline, b""), encoding)
+        return _iter_csv(csv.DictReader(lines))
+
+
+class NDJSONStreamParser(BaseParser):
+    """
+    Newline delimited JSON parser reading the body lazily
+
+    Returns an iterator of the documents of the non-blank lines.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        return _iter_ndjson(iter(stream.readline, b""), encoding)
+
+
+def _iter_csv(reader: csv.DictReader) -> Iterator[dict]:
+    try:
+        yield from reader
+    except (csv.Error, UnicodeDecodeError) as e:
+        msg = f"CSV parse error - {e}"
+        raise ParseError(msg) from e
+
+
+def _iter_ndjson(lines: Iterator[bytes], encoding: str) -> Iterator:
+    utf8 = encoding.lower().replace("-", "") == "utf8"
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield orjson.loads(line if utf8 else line.decode(encoding))
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as e:
+            msg = f"JSON parse error on line {number} - {e}"
+            raise ParseError(msg) from e
@@ -0,0 +1,173 @@
+"""Define the rate limiters, this file spreads calls to rate limited APIs across processes."""
+
+import logging
+import threading
+import time
+
+from django.core.cache import caches
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Fixed-window rate limiter shared through a cache
+
+    Every process calling `acquire()` with the same key counts in the same
+    one-second window of the cache (Redis in production), so `rate` holds
+    for all Celery workers together, e.g. to stay under a Cognito quota.
+    """
+
+    def __init__(self, key: str, rate: int, cache_alias: str = "default", clock=time.time, sleep=time.sleep):
+        self.key = key
+        self.rate = rate
+        self.cache = caches[cache_alias]
+        self.clock = clock
+        self.sleep = sleep
+
+    def try_acquire(self) -> float:
+        """
+        Take a slot of the current window
+
+        Returns:
+            float: 0 when a slot was taken, else the seconds until the next window
+        """
+        now = self.clock()
+        window = int(now)
+        key = f"ratelimit:{self.key}:{window}"
+        # The window outlives its second a little so late increments still find it.
+        self.cache.add(key, 0, timeout=2)
+        try:
+            count = self.cache.incr(key)
+        except ValueError:
+            # Evicted between `add` and `incr`, count this call as the first of the window.
+            self.cache.set(key, 1, timeout=2)
+            count = 1
+        return 0 if count <= self.rate else window + 1 - now
+
+    def acquire(self):
+        """
+        Wait for a slot, the caller then makes its call (no limit when `rate` is 0)
+        """
+        if self.rate <= 0:
+            return
+        while (wait := self.try_acquire()) > 0:
+            self.sleep(wait)
+
+
+# (key, limit, window in seconds) of a sliding-window bucket
+Bucket = tuple[str, int, int]
+
+# Sliding-window counter: the count of the previous window, weighted by the share
+# of it still inside the sliding window, plus the count of the current window.
+# Every bucket is checked before any is counted, a rejected hit counts nowhere.
+# KEYS: the current and previous window counters of every bucket
+# ARGV: now, then the limit, window and current window start of every bucket
+# Returns: 0 when counted, else the milliseconds to wait
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+for i = 1, #KEYS, 2 do
+    local n = (i - 1) / 2
+    local limit = tonumber(ARGV[n * 3 + 2])
+    local window = tonumber(ARGV[n * 3 + 3])
+    local elapsed = now - tonumber(ARGV[n * 3 + 4])
+    local current = tonumber(redis.call("GET", KEYS[i]) or "0")
+    local previous = tonumber(redis.call("GET", KEYS[i + 1]) or "0")
+    if current + 1 > limit then
+        wait = math.max(wait, window - elapsed + math.max(0, window * (1 - (limit - 1) / current)))
+    elseif previous * (window - elapsed) / window + current + 1 > limit then
+        wait = math.max(wait, window * (1 - (limit - 1 - current) / previous) - elapsed)
+    end
+end
+if wait > 0 then
+    return math.ceil(wait * 1000)
+end
+for i = 1, #KEYS, 2 do
+    redis.call("INCR", KEYS[i])
+    redis.call("EXPIRE", KEYS[i], tonumber(ARGV[(i - 1) / 2 * 3 + 3]) * 2)
+end
+return 0
+"""
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window rate limiter over several buckets
+
+    A hit is admitted when it fits in every bucket, e.g. the client IP, the
+    email and a global bucket of a login, and then counted in all of them.
+    On Redis (django-redis) the check and the count are one Lua script, so
+    concurrent hits of all processes are admitted atomically; on other
+    caches (tests, local development) they run under a process lock.
+
+    The time comes from `clock`, not from Redis, so tests can drive it.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, cache_alias: str = "default", clock=time.time):
+        self.cache = caches[cache_alias]
+        self.clock = clock
+        self._script = None
+
+    def hit(self, buckets: list[Bucket]) -> float:
+        """
+        Count a hit in every bucket, if it fits in all of them
+
+        Buckets with a limit of 0 are not limited.
+
+        Returns:
+            float: 0 when the hit was counted, else the seconds until it would fit
+        """
+        now = self.clock()
+        windows = []
+        for key, limit, window in buckets:
+            if limit > 0:
+                index = int(now // window)
+                prefix = f"ratelimit:{key}:{window}:"
+                windows.append((f"{prefix}{index}", f"{prefix}{index - 1}", limit, window, index * window))
+        if not windows:
+            return 0
+
+        client = self._get_redis_client()
+        if client is None:
+            return self._hit_cache(now, windows)
+        try:
+            return self._hit_redis(client, now, windows)
+        except RedisError:
+            # Like the cache with IGNORE_EXCEPTIONS, an unreachable Redis lets the hit through.
+            logger.warning("Rate limiter unavailable, hit admitted.", exc_info=True)
+            return 0
+
+    def _get_redis_client(self):
+        client = getattr(self.cache, "client", None)
+        return client.get_client(write=True) if hasattr(client, "get_client") else None
+
+    def _hit_redis(self, client, now: float, windows: list) -> float:
+        if self._script is None:
+            self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        keys, args = [], [now]
+        for current, previous, limit, window, start in windows:
+            keys += [self.cache.make_key(current), self.cache.make_key(previous)]
+            args += [limit, window, start]
+        return self._script(keys=keys, args=args, client=client) / 1000
+
+    def _hit_cache(self, now: float, windows: list) -> float:
+        with self._lock:
+            counts = self.cache.get_many([key for current, previous, *_ in windows for key in (current, previous)])
+            wait = 0
+            for current_key, previous_key, limit, window, start in windows:
+                elapsed = now - start
+                current, previous = counts.get(current_key, 0), counts.get(previous_key, 0)
+                if current + 1 > limit:
+                    wait = max(wait, window - elapsed + max(0, window * (1 - (limit - 1) / current)))
+                elif previous * (window - elapsed) / window + current + 1 > limit:
+                    wait = max(wait, window * (1 - (limit - 1 - current) / previous) - elapsed)
+            if wait > 0:
+                return wait
+
+            for current_key, _, _, window, _ in windows:
+                self.cache.set(current_key, counts.get(current_key, 0) + 1, timeout=window * 2)
+            return 0
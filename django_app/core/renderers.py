@@ -0,0 +1,91 @@
+"""Define the response renderers, this file encodes API responses with orjson."""
+
+import math
+from decimal import Decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+encoder = JSONEncoder()
+
+# The only orjson error worth retrying, the others are rendered by `JSONRenderer`.
+NON_STR_KEYS_ERROR = "Dict key must be str"
+
+
+def default(obj):
+    """
+    Encode the types orjson does not support natively, like DRF's encoder does
+    """
+    # Decimal is the common one, skip the type checks of the encoder.
+    if type(obj) is Decimal:
+        return float(obj)
+    return encoder.default(obj)
+
+
+def is_finite(data) -> bool:
+    """
+    Check the payload has no NaN or Infinity, orjson encodes them as null where `JSONRenderer` does not
+    """
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, float):
+            if not math.isfinite(obj):
+                return False
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, list | tuple):
+            stack.extend(obj)
+        elif isinstance(obj, Decimal) and not obj.is_finite():
+            return False
+    return True
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson
+
+    Output matches `JSONRenderer` with the default (compact, unicode) settings:
+    str, int, float, dict, list, UUID, date/datetime and their subclasses are
+    encoded in C, UTC datetimes end with `Z`, Decimal is a float like with
+    `JSONRenderer` and other types (lazy strings, querysets...) go through DRF's encoder.
+    Payloads orjson can not encode the same way (integers beyond 64 bits, NaN and Infinity)
+    are rendered by `JSONRenderer`, which also enforces `STRICT_JSON` for them.
+    Note: orjson only indents by 2 spaces, any requested indent is rendered as 2
+    """
+
+    options = orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        try:
+            ret = self.dumps(data, options)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, unsupported types...: render, or fail, exactly like `JSONRenderer`.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # orjson writes NaN and Infinity as null, only look for them when the output has one.
+        if b"null" in ret and not is_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape \u2028 and \u2029 like `JSONRenderer`, JSON stays a strict javascript subset.
+        # Checking for ASCII first is much cheaper than searching them in large responses.
+        if not ret.isascii() and (b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret):
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+    def dumps(self, data, options: int) -> bytes:
+        try:
+            return orjson.dumps(data, default=default, option=options)
+        except orjson.JSONEncodeError as e:
+            if str(e) != NON_STR_KEYS_ERROR:
+                raise
+        # Non-str dict keys are rare, only pay for the slower option when there are.
+        return orjson.dumps(data, default=default, option=options | orjson.OPT_NON_STR_KEYS)
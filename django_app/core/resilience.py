@@ -0,0 +1,170 @@
+"""Define the circuit breaker and the bulkhead, this file sheds calls to a failing or saturated dependency."""
+
+import asyncio
+import logging
+import threading
+import time
+
+from .metrics import CIRCUIT_BREAKER_STATE
+from .metrics import CIRCUIT_BREAKER_TRANSITIONS
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of the calls of a process to a dependency
+
+    - closed: calls are made, `failure_threshold` failures in a row open it
+    - open: calls are shed for `reset_timeout` seconds, then it is half-open
+    - half-open: `half_open_calls` probe calls are made, the others shed;
+      a probe success closes it, a probe failure opens it again
+
+    The caller asks `allow()` before a call and reports its outcome with
+    `record_success()` or `record_failure()`, or gives the call up with
+    `release()`.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    state_values = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        half_open_calls: int = 1,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        CIRCUIT_BREAKER_STATE.labels(name).set(0)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """
+        Check if a call can be made now, a half-open breaker counts it as a probe
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Report a call that got an answer, a half-open breaker closes
+        """
+        with self._lock:
+            self._failures = 0
+            if self._state == self.HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        """
+        Report a failed call, e.g. a timeout or a server error
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+                self._open()
+            elif self._state == self.CLOSED:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._open()
+
+    def release(self):
+        """
+        Give up an allowed call without making it
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._probes = 0
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _open(self):
+        self._opened_at = self.clock()
+        self._failures = 0
+        logger.warning("Circuit breaker %s opened for %ss.", self.name, self.reset_timeout)
+        self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        if state != self._state or state == self.OPEN:
+            CIRCUIT_BREAKER_TRANSITIONS.labels(self.name, state).inc()
+        self._state = state
+        CIRCUIT_BREAKER_STATE.labels(self.name).set(self.state_values[state])
+
+
+class Bulkhead:
+    """
+    Cap of the calls of a process in flight to a dependency
+
+    A slow dependency then holds at most `size` threads (or tasks, see
+    `acquire_async`) of the process, the others keep serving the requests
+    that do not need it.
+    """
+
+    def __init__(self, size: int, timeout: float = 0):
+        self.size = size
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    def acquire(self) -> bool:
+        """
+        Take a slot, waiting at most `timeout` seconds
+
+        Returns:
+            bool: False when every slot stayed taken
+        """
+        if self.timeout > 0:
+            return self._semaphore.acquire(timeout=self.timeout)
+        return self._semaphore.acquire(blocking=False)
+
+    async def acquire_async(self) -> bool:
+        """
+        Take a slot like `acquire` from a coroutine, the wait happens in a
+        thread rather than blocking the event loop
+
+        Returns:
+            bool: False when every slot stayed taken
+        """
+        if self._semaphore.acquire(blocking=False):
+            return True
+        if self.timeout <= 0:
+            return False
+
+        wait = asyncio.ensure_future(asyncio.to_thread(self._semaphore.acquire, timeout=self.timeout))
+        try:
+            return await asyncio.shield(wait)
+        except asyncio.CancelledError:
+            # The thread may still get the slot, it is given back.
+            wait.add_done_callback(lambda done: done.cancelled() or not done.result() or self.release())
+            raise
+
+    def release(self):
+        self._semaphore.release()
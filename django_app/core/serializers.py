@@ -0,0 +1,133 @@
+"""Define the serializer helpers shared by the apps."""
+
+from collections.abc import Callable
+from collections.abc import Iterable
+from functools import cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+# Serializer fields returning text columns unchanged (`str(value)`).
+TEXT_FIELDS = {serializers.CharField, serializers.EmailField}
+
+FieldMap = tuple[tuple[str, str, serializers.Field | None], ...]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer keeping only the fields passed in `fields`
+
+    Used by `SparseFieldsetViewSet` for `?fields=`, e.g.
+    `UserSerializer(user, fields=["email"])` only renders the email.
+    """
+
+    def __init__(self, *args, fields: list[str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+@cache
+def get_field_columns(serializer_class: type[serializers.ModelSerializer]) -> dict[str, str | None]:
+    """
+    Map the fields of a model serializer to the model field they read
+
+    Returns:
+        dict: The model field name by serializer field name, None when the
+            field is not a plain model field (method, nested, dotted source)
+    """
+    model = serializer_class.Meta.model
+    columns = {}
+    for name, field in serializer_class().fields.items():
+        try:
+            model_field = model._meta.get_field(field.source)  # noqa: SLF001
+        except FieldDoesNotExist:
+            model_field = None
+        columns[name] = model_field.name if model_field is not None and model_field.concrete else None
+    return columns
+
+
+@cache
+def get_values_field_map(
+    serializer_class: type[serializers.ModelSerializer],
+    fields: tuple[str, ...] | None = None,
+) -> FieldMap | None:
+    """
+    Compile the readable fields of a model serializer to read `queryset.values()` rows
+
+    Args:
+        serializer_class (type): The model serializer
+        fields (tuple, optional): Only compile these fields, see `SparseFieldsetSerializerMixin`
+
+    Returns:
+        tuple: (field name, column, serializer field or None when the column
+            value is returned unchanged) per field, None when a field is not
+            read from a column of the model (method, nested, relation...)
+    """
+    model = serializer_class.Meta.model
+    field_map = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only or (fields is not None and name not in fields):
+            continue
+
+        try:
+            model_field = model._meta.get_field(field.source)  # noqa: SLF001
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.is_relation:
+            return None
+
+        unchanged = (type(field) in TEXT_FIELDS and isinstance(model_field, models.CharField | models.TextField)) or (
+            type(field) is serializers.BooleanField and isinstance(model_field, models.BooleanField)
+        )
+        field_map.append((name, model_field.attname, None if unchanged else field))
+    return tuple(field_map)
+
+
+def get_converter(field: serializers.Field, tz) -> Callable:
+    """
+    Get the `to_representation` of a field, specialized for the common column types
+    """
+    if type(field) is serializers.UUIDField and field.uuid_format == "hex_verbose":
+        return str
+
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if (
+        type(field) is serializers.DateTimeField
+        and not hasattr(field, "timezone")
+        and isinstance(output_format, str)
+        and output_format.lower() == ISO_8601
+        and tz is not None
+    ):
+        # `DateTimeField.to_representation` looks the current timezone up for every value.
+        def convert(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+        return convert
+
+    return field.to_representation
+
+
+def to_representation(field_map: FieldMap, rows: Iterable[dict]) -> list[dict]:
+    """
+    Build the serializer output of `queryset.values()` rows, see `get_values_field_map`
+    """
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    converters = [(name, column, field and get_converter(field, tz)) for name, column, field in field_map]
+    return [
+        {
+            # Like `Serializer.to_representation`, None is not passed to the fields.
+            name: value if (value := row[column]) is None or convert is None else convert(value)
+            for name, column, convert in converters
+        }
+        for row in rows
+    ]
@@ -0,0 +1,38 @@
+import pytest
+from django.urls import reverse
+
+from django_app.core.metrics import CACHE_REQUESTS
+
+
+class TestMetrics:
+    @pytest.fixture(autouse=True)
+    def _debug(self, settings):
+        settings.DEBUG = True
+
+    def test_prometheus_text(self, client):
+        CACHE_REQUESTS.labels("test-metrics", "hit").inc()
+
+        response = client.get(reverse("metrics"))
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert b'django_app_cache_requests_total{cache="test-metrics",result="hit"} 1.0' in response.content
+        assert b"# TYPE django_app_cognito_call_duration_seconds histogram" in response.content
+
+    def test_openmetrics(self, client):
+        response = client.get(reverse("metrics"), HTTP_ACCEPT="application/openmetrics-text; version=1.0.0")
+
+        assert response["Content-Type"].startswith("application/openmetrics-text")
+        assert response.content.endswith(b"# EOF\n")
+
+    def test_token(self, client, settings):
+        settings.METRICS_TOKEN = "secret"  # noqa: S105
+
+        assert client.get(reverse("metrics")).status_code == 401  # noqa: PLR2004
+        assert client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code == 401  # noqa: PLR2004
+        assert client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret").status_code == 200  # noqa: PLR2004
+
+    def test_no_token_without_debug(self, client, settings):
+        settings.DEBUG = False
+
+        assert client.get(reverse("metrics")).status_code == 403  # noqa: PLR2004
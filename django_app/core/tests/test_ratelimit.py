@@ -0,0 +1,93 @@
+import pytest
+from django.core.cache import cache
+
+from django_app.core.ratelimit import RateLimiter
+from django_app.core.ratelimit import SlidingWindowLimiter
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter:
+    def test_waits_for_next_window(self):
+        clock = FakeClock(1000.25)
+        limiter = RateLimiter("test", 2, clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            limiter.acquire()
+
+        assert clock.sleeps == [0.75]
+
+    def test_shared_between_limiters(self):
+        clock = FakeClock()
+        first = RateLimiter("test", 1, clock=clock, sleep=clock.sleep)
+        second = RateLimiter("test", 1, clock=clock, sleep=clock.sleep)
+
+        assert first.try_acquire() == 0
+        assert second.try_acquire() == 1
+
+    def test_no_limit(self):
+        clock = FakeClock()
+        limiter = RateLimiter("test", 0, clock=clock, sleep=clock.sleep)
+
+        for _ in range(10):
+            limiter.acquire()
+
+        assert clock.sleeps == []
+
+
+@pytest.fixture(params=["cache", "redis"])
+def sliding_limiter(request):
+    clock = FakeClock(1000.0)
+    limiter = SlidingWindowLimiter(clock=clock)
+    if request.param == "redis":
+        # Runs the Lua script, see requirements/local.txt
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeStrictRedis()
+        limiter._get_redis_client = lambda: client  # noqa: SLF001
+    return limiter, clock
+
+
+class TestSlidingWindowLimiter:
+    def test_previous_window_slides_out(self, sliding_limiter):
+        limiter, clock = sliding_limiter
+
+        assert [limiter.hit([("test", 2, 60)]) for _ in range(3)] == [0, 0, 50]
+
+        # Half of the previous window still counts: 2 * 0.5 + 1 hit.
+        clock.now = 1050.0
+        assert limiter.hit([("test", 2, 60)]) == 0
+        assert limiter.hit([("test", 2, 60)]) == 30  # noqa: PLR2004
+
+        clock.now = 1080.0
+        assert limiter.hit([("test", 2, 60)]) == 0
+
+    def test_rejected_hit_counts_nowhere(self, sliding_limiter):
+        limiter, _ = sliding_limiter
+        assert limiter.hit([("ip", 1, 60)]) == 0
+
+        assert limiter.hit([("email", 5, 60), ("ip", 1, 60)]) > 0
+        for _ in range(5):
+            assert limiter.hit([("email", 5, 60)]) == 0
+
+    def test_no_limit(self, sliding_limiter):
+        limiter, _ = sliding_limiter
+
+        assert all(limiter.hit([("test", 0, 60)]) == 0 for _ in range(10))
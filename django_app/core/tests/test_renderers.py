@@ -0,0 +1,90 @@
+import datetime
+import decimal
+import io
+import uuid
+import zoneinfo
+
+import orjson
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from django_app.core.parsers import ORJSONParser
+from django_app.core.renderers import ORJSONRenderer
+
+PAYLOAD = {
+    "uuid": uuid.UUID("8b7c1c2e-6f2c-4a55-9a43-6b9e5b3f5a01"),
+    "utc": datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.UTC),
+    "tokyo": datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=zoneinfo.ZoneInfo("Asia/Tokyo")),
+    "naive": datetime.datetime(2024, 1, 2, 3, 4, 5),  # noqa: DTZ001
+    "date": datetime.date(2024, 1, 2),
+    "decimal": decimal.Decimal("12.50"),
+    "lazy": gettext_lazy("User"),
+    "unicode": "Caf\u00e9 \u2028 \u2029",
+    "numbers": [1, 2.5, True, None],
+    "int_keys": {1: "one"},
+    "results": ReturnList([ReturnDict({"email": "john@example.com"}, serializer=None)], serializer=None),
+}
+
+
+class TestORJSONRenderer:
+    def test_matches_json_renderer(self):
+        assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+    def test_none(self):
+        assert ORJSONRenderer().render(None) == b""
+
+    def test_indent(self):
+        assert ORJSONRenderer().render({"a": 1}, "application/json; indent=4") == b'{\n  "a": 1\n}'
+
+    def test_big_int(self):
+        data = {"big": 2**70, "int_keys": {1: -(2**64)}}
+
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.parametrize("value", [float("nan"), float("inf"), decimal.Decimal("NaN")])
+    def test_strict_json(self, value):
+        with pytest.raises(ValueError, match="Out of range float values are not JSON compliant"):
+            ORJSONRenderer().render({"value": value, "none": None})
+
+    def test_non_strict_json(self, monkeypatch):
+        monkeypatch.setattr(ORJSONRenderer, "strict", False)
+        data = {"values": [float("nan"), None]}
+
+        assert ORJSONRenderer().render(data) == b'{"values":[NaN,null]}'
+
+    def test_other_errors_are_not_retried(self, monkeypatch):
+        calls = []
+        dumps = orjson.dumps
+
+        def counting_dumps(*args, **kwargs):
+            calls.append(kwargs["option"])
+            return dumps(*args, **kwargs)
+
+        monkeypatch.setattr(orjson, "dumps", counting_dumps)
+
+        with pytest.raises(TypeError, match="not JSON serializable"):
+            ORJSONRenderer().render({"a": object()})
+
+        assert len(calls) == 1
+
+
+class TestORJSONParser:
+    def test_matches_json_parser(self):
+        body = JSONRenderer().render({"email": "café@example.com", "numbers": [1, 2.5, None]})
+
+        assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    def test_other_encoding(self):
+        body = '{"name": "café"}'.encode("latin-1")
+
+        assert ORJSONParser().parse(io.BytesIO(body), parser_context={"encoding": "latin-1"}) == {"name": "café"}
+
+    @pytest.mark.parametrize("body", [b"{", b'{"a": NaN}', b"\xff"])
+    def test_invalid(self, body: bytes):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(body))
@@ -0,0 +1,86 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from django_app.core.resilience import Bulkhead
+from django_app.core.resilience import CircuitBreaker
+
+from .test_ratelimit import FakeClock
+
+
+def breaker_state(name: str) -> float | None:
+    return REGISTRY.get_sample_value("django_app_circuit_breaker_state", {"breaker": name})
+
+
+class TestCircuitBreaker:
+    def test_opens_after_failures_in_a_row(self):
+        breaker = CircuitBreaker("test-open", failure_threshold=2, clock=FakeClock())
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+        assert breaker_state("test-open") == 2  # noqa: PLR2004
+
+    def test_half_open_probe_closes(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("test-probe", failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now += 30
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker_state("test-probe") == 1
+        assert breaker.allow()
+        # A single probe at a time.
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker_state("test-probe") == 0
+
+    def test_half_open_probe_failure_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("test-reopen", failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now += 29
+        assert not breaker.allow()
+
+    def test_released_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("test-release", failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+
+        assert breaker.allow()
+        breaker.release()
+
+        assert breaker.allow()
+
+
+def test_bulkhead():
+    bulkhead = Bulkhead(2)
+
+    assert bulkhead.acquire()
+    assert bulkhead.acquire()
+    assert not bulkhead.acquire()
+    bulkhead.release()
+    assert bulkhead.acquire()
+
+
+def test_bulkhead_async():
+    bulkhead = Bulkhead(1, timeout=0.05)
+
+    assert asyncio.run(bulkhead.acquire_async())
+    assert not asyncio.run(bulkhead.acquire_async())
+    bulkhead.release()
+    assert asyncio.run(bulkhead.acquire_async())
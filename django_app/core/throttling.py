@@ -0,0 +1,66 @@
+"""Define the throttles, this file rejects requests over a sliding-window rate before they are handled."""
+
+import time
+from collections.abc import Callable
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .ratelimit import SlidingWindowLimiter
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Throttle counting requests in sliding windows of the shared cache
+
+    A request is counted in a bucket per scope, e.g. its IP and its email,
+    and rejected if it does not fit in one of them; a rejected request is
+    counted in none. The rate of a scope is
+    `REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"][scope]`, e.g. "10/min", a scope
+    without rate or without cache key for the request is not throttled.
+    """
+
+    scopes: tuple[str, ...] = ()
+    cache_alias = "default"
+    clock = time.time
+
+    durations = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+    def get_cache_key(self, request, view, scope: str) -> str | None:
+        """
+        Get the bucket of the request in a scope, None to not count it there
+        """
+        raise NotImplementedError
+
+    def get_rate(self, scope: str) -> tuple[int, int] | None:
+        """
+        Get the (limit, window in seconds) of a scope
+        """
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if not rate:
+            return None
+        limit, period = rate.split("/")
+        return int(limit), self.durations[period[0]]
+
+    def allow_request(self, request, view) -> bool:
+        return self.hit(lambda scope: self.get_cache_key(request, view, scope))
+
+    def hit(self, get_cache_key: Callable[[str], str | None]) -> bool:
+        """
+        Count a request in the bucket `get_cache_key` gives for every scope with a rate
+
+        Returns:
+            bool: Whether the request is allowed, see `wait` otherwise
+        """
+        buckets = []
+        for scope in self.scopes:
+            rate = self.get_rate(scope)
+            key = get_cache_key(scope) if rate is not None else None
+            if key is not None:
+                buckets.append((f"throttle:{scope}:{key}", *rate))
+
+        self.wait_time = SlidingWindowLimiter(self.cache_alias, clock=self.clock).hit(buckets) if buckets else 0
+        return self.wait_time == 0
+
+    def wait(self) -> float | None:
+        return self.wait_time or None
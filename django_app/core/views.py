@@ -1,18 +1,50 @@
+import hashlib
+import hmac
+import os
+from datetime import datetime
+
 from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.http import quote_etag
+from prometheus_client import REGISTRY
+from prometheus_client import CollectorRegistry
+from prometheus_client.exposition import choose_encoder
+from prometheus_client.multiprocess import MultiProcessCollector
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.permissions import BasePermission
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.viewsets import ViewSet
 
+from .filters import IndexedFilterBackend
+from .pagination import CursorPagination
+from .pagination import get_ordering_columns
+from .serializers import SparseFieldsetSerializerMixin
+from .serializers import get_field_columns
+from .serializers import get_values_field_map
+from .serializers import to_representation
+
 
 class CommonViewSet:
     """
     Common view set for all view sets
     - create response
     - get resource URI
+    - conditional GET with ETag / Last-Modified
     """
 
+    # Part of the ETags, bump it when the representation changes without the serializer class changing
+    etag_version = "1"
+
     def ok(self, data: dict | None = None) -> Response:
         """
         Default response ok. Status code is 200
@@ -25,6 +57,12 @@ class CommonViewSet:
         """
         return Response(data=data, status=status.HTTP_201_CREATED)
 
+    def accepted(self, data: dict | None = None, headers: dict | None = None) -> Response:
+        """
+        Default response accepted, the work continues in the background. Status code is 202
+        """
+        return Response(data=data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
     def no_content(self) -> Response:
         """
         Default response no content. Status code is 204
@@ -73,18 +111,159 @@ class CommonViewSet:
 
         return f"{domain}{api_root}{self.resource_name}/"
 
+    def get_validators(self, key, modified: datetime) -> tuple[str, int]:
+        """
+        Get the ETag and Last-Modified timestamp of a resource version
+
+        The ETag changes with the resource, its modified time and its
+        representation: the rendered format (e.g. JSON or the browsable API),
+        the serializer and `etag_version`, and the fields of `?fields=`
+
+        Args:
+            key: The resource identifier, e.g. its primary key
+            modified (datetime): The last modification time of the resource
+        """
+        renderer = getattr(self.request, "accepted_renderer", None)
+        serializer_class = getattr(self, "serializer_class", None)
+        fields = self.get_requested_fields() if isinstance(self, SparseFieldsetViewSet) else None
+        version = ":".join(
+            [
+                type(self).__name__,
+                str(key),
+                modified.isoformat(),
+                getattr(renderer, "format", ""),
+                f"{serializer_class.__module__}.{serializer_class.__qualname__}" if serializer_class else "",
+                self.etag_version,
+                ",".join(sorted(set(fields))) if fields is not None else "*",
+            ],
+        )
+        etag = quote_etag(hashlib.md5(version.encode(), usedforsecurity=False).hexdigest())
+        return etag, int(modified.timestamp())
+
+    def not_modified(self, key, modified: datetime) -> HttpResponseBase | None:
+        """
+        Default response not modified when the request validators (If-None-Match,
+        If-Modified-Since) match the resource version. Status code is 304
+
+        Returns:
+            HttpResponseBase: 304 (or 412 for a failed If-Match) response, None
+                when the resource has to be sent
+        """
+        etag, last_modified = self.get_validators(key, modified)
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            self.set_validators(response, key, modified)
+        return response
+
+    def set_validators(self, response: HttpResponseBase, key, modified: datetime) -> HttpResponseBase:
+        """
+        Set the ETag and Last-Modified headers of a resource response
+        """
+        etag, last_modified = self.get_validators(key, modified)
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
 
 class PaginationViewSet:
     """
     View set for pagination
+    - list endpoints are paginated with a cursor, see `CursorPagination`
     """
 
+    pagination_class = CursorPagination
+
 
 class FilteringViewSet:
     """
     View set for filtering
+    - filters are declared per field in `filterset_fields`, see `IndexedFilterBackend`
+    """
+
+    filter_backends = [IndexedFilterBackend]
+    filterset_fields: dict[str, list[str]] = {}
+
+
+class SparseFieldsetViewSet:
+    """
+    View set for sparse fieldsets
+    - `?fields=email,cognito_sub` narrows the serializer output to these fields
+    - reads select only the columns the rendered fields need (`only()`)
+    """
+
+    fields_query_param = "fields"
+
+    def get_requested_fields(self) -> list[str] | None:
+        """
+        Get the fields of `?fields=`, None when all fields are requested (no or only empty names)
+
+        Raises:
+            ValidationError: If a field is not a field of the serializer
+        """
+        request = getattr(self, "request", None)
+        value = request.query_params.get(self.fields_query_param) if request is not None else None
+        if not value:
+            return None
+
+        fields = [name.strip() for name in value.split(",") if name.strip()]
+        if not fields:
+            return None
+        unknown = set(fields) - set(get_field_columns(self.get_serializer_class()))
+        if unknown:
+            raise ValidationError({self.fields_query_param: f"Unknown field(s): {', '.join(sorted(unknown))}."})
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        if issubclass(self.get_serializer_class(), SparseFieldsetSerializerMixin):
+            kwargs.setdefault("fields", self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Writes go through `save()`, which needs the whole row.
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return queryset
+
+        columns = get_field_columns(self.get_serializer_class())
+        requested = self.get_requested_fields() or list(columns)
+        if any(columns[name] is None for name in requested):
+            return queryset
+
+        # The cursor paginator reads its ordering fields from the last row,
+        # `retrieve` the Last-Modified field of its validators.
+        extra = get_ordering_columns(self.paginator)
+        if getattr(self, "action", None) == "retrieve" and getattr(self, "last_modified_field", None):
+            extra = [*extra, self.last_modified_field]
+        return queryset.only(*{columns[name] for name in requested}, *extra)
+
+
+class ValuesListViewSet:
+    """
+    View set for read-only lists built from `queryset.values()`
+    - opt in with `list_from_values = True`
+    - rows go through the compiled field map of the serializer instead of a model
+      and serializer fields per row, the response is the same as the serializer's
+    - falls back to the serializer when a field is not read from a column
     """
 
+    list_from_values = False
+
+    def list(self, request, *args, **kwargs):
+        field_map = None
+        if self.list_from_values:
+            fields = self.get_requested_fields() if isinstance(self, SparseFieldsetViewSet) else None
+            field_map = get_values_field_map(self.get_serializer_class(), tuple(fields) if fields is not None else None)
+        if field_map is None:
+            return super().list(request, *args, **kwargs)
+
+        columns = {column for _, column, _ in field_map} | set(get_ordering_columns(self.paginator))
+        queryset = self.filter_queryset(self.get_queryset()).values(*columns)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(to_representation(field_map, page))
+        return Response(to_representation(field_map, queryset))
+
 
 class AuthenticatedViewSet:
     permission_classes = [IsAuthenticated]
@@ -96,7 +275,68 @@ class BaseViewSet(ViewSet, CommonViewSet, AuthenticatedViewSet):
     """
 
 
-class BaseModelViewSet(ModelViewSet, CommonViewSet, AuthenticatedViewSet):
+class BaseModelViewSet(
+    PaginationViewSet,
+    FilteringViewSet,
+    SparseFieldsetViewSet,
+    ValuesListViewSet,
+    ModelViewSet,
+    CommonViewSet,
+    AuthenticatedViewSet,
+):
     """
     Base view set for Django model
+    Note: the mixins setting DRF attributes come before `ModelViewSet` to override its defaults
+    """
+
+    # Model field of the Last-Modified header, see `retrieve`
+    last_modified_field = "modified"
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve a resource, 304 when the client copy is current
+
+        The validators are read with a one-column query, the row is only
+        loaded and serialized when the resource has to be sent.
+        """
+        if getattr(self.queryset.model, self.last_modified_field, None) is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        # Object permissions need the row, only skip loading it when no permission checks objects.
+        if all(
+            type(permission).has_object_permission is BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        ):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = self.filter_queryset(self.get_queryset()).values_list("pk", self.last_modified_field)
+            pk, modified = get_object_or_404(queryset, **{self.lookup_field: kwargs[lookup_url_kwarg]})
+            response = self.not_modified(pk, modified)
+            if response is not None:
+                return response
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return self.set_validators(self.ok(serializer.data), instance.pk, getattr(instance, self.last_modified_field))
+
+
+@transaction.non_atomic_requests
+def metrics(request: HttpRequest) -> HttpResponse:
     """
+    Serve the metrics of `django_app/core/metrics.py` in the Prometheus text format
+
+    With `PROMETHEUS_MULTIPROC_DIR` set, the metrics of every worker process are
+    merged. When `METRICS_TOKEN` is set it is required as a bearer token, without
+    it the metrics are only served with `DEBUG` on.
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"})
+
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    encoder, content_type = choose_encoder(request.headers.get("Accept", ""))
+    return HttpResponse(encoder(registry), content_type=content_type)
@@ -0,0 +1,319 @@
+"""Define the async Cognito client, this file talks to the Cognito JSON API over a pooled HTTP session."""
+
+import asyncio
+import json
+import weakref
+
+import httpx
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.session import get_session
+from django.conf import settings
+
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import CognitoError
+
+from .cognito_interface import AsyncCognitoInterface
+from .instrumentation import instrument
+from .resilience import build_breaker
+from .resilience import build_bulkhead
+from .resilience import guarded
+
+TARGET_PREFIX = "AWSCognitoIdentityProviderService"
+
+
+class CognitoClientError(Exception):
+    """
+    Error response returned by the Cognito API
+    """
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class AsyncCognito(AsyncCognitoInterface):
+    """
+    Async Cognito client
+
+    Requests are signed with SigV4 and sent through one pooled `httpx.AsyncClient`
+    per event loop, so a worker keeps serving other requests while AWS answers.
+    The clients are held by weak reference to their loop, the client of a loop
+    that is gone (e.g. one of `async_to_sync`) is dropped with it.
+    """
+
+    def __init__(self, endpoint_url: str | None = None, credentials=None):
+        self.region = settings.AWS_REGION
+        self.endpoint_url = (
+            endpoint_url or settings.COGNITO_ENDPOINT_URL or f"https://cognito-idp.{self.region}.amazonaws.com"
+        )
+        self.credentials = credentials or get_session().get_credentials()
+
+        self.USER_POOL_ID = settings.COGNITO_USER_POOL_ID
+        self.CLIENT_ID = settings.COGNITO_CLIENT_ID
+
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+            weakref.WeakKeyDictionary()
+        )
+
+        # Per backend, so per process: see `django_app/integrations/cognito/resilience.py`
+        self.breaker = build_breaker("cognito_async")
+        self.bulkhead = build_bulkhead()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Get the pooled HTTP client of the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = self._clients[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.COGNITO_CLIENT_MAX_POOL_CONNECTIONS,
+                    max_keepalive_connections=settings.COGNITO_CLIENT_MAX_POOL_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(
+                    settings.COGNITO_CLIENT_READ_TIMEOUT,
+                    connect=settings.COGNITO_CLIENT_CONNECT_TIMEOUT,
+                ),
+            )
+        return client
+
+    async def close(self):
+        """
+        Close the HTTP client of the running event loop
+        """
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def call(self, operation: str, params: dict) -> dict:
+        """
+        Call a Cognito API operation
+
+        Args:
+            operation (str): The operation name, e.g. AdminCreateUser
+            params (dict): The request parameters
+
+        Raises:
+            CognitoClientError: If Cognito returns an error response
+            CognitoError: If Cognito can not be reached or its response is not JSON
+
+        Returns:
+            dict: The response from cognito
+        """
+        body = json.dumps(params)
+        request = AWSRequest(
+            method="POST",
+            url=self.endpoint_url,
+            data=body,
+            headers={
+                "Content-Type": "application/x-amz-json-1.1",
+                "X-Amz-Target": f"{TARGET_PREFIX}.{operation}",
+            },
+        )
+        SigV4Auth(self.credentials, "cognito-idp", self.region).add_auth(request)
+
+        try:
+            response = await self.client.post(self.endpoint_url, content=body, headers=dict(request.headers))
+        except httpx.HTTPError as e:
+            raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
+
+        try:
+            data = response.json() if response.content else {}
+        except ValueError as e:
+            # e.g. the HTML page of a proxy 502
+            raise CognitoError(
+                code="INTERNAL_ERROR",
+                developer_message=f"Invalid Cognito response ({response.status_code})",
+            ) from e
+        if response.is_error:
+            error_type = data.get("__type", "").rsplit("#", 1)[-1]
+            raise CognitoClientError(error_type, data.get("message") or data.get("Message", ""))
+        return data
+
+    @guarded
+    @instrument("admin_create_user")
+    async def create_user(
+        self,
+        username: str,
+        temporary_password: str | None = None,
+        attributes: dict[str, str] | None = None,
+    ) -> str | None:
+        """
+        Create a cognito user
+
+        Args:
+            username (str): The user email
+            temporary_password (str, optional): Generated by Cognito and sent with
+                the invitation email when not given
+            attributes (dict, optional): Extra user attributes
+
+        Raises:
+            CognitoError: If error when create user
+
+        Returns:
+            str: The cognito sub of the user
+        """
+        params = {
+            "UserPoolId": self.USER_POOL_ID,
+            "Username": username,
+            "UserAttributes": [
+                {"Name": "email", "Value": username},
+                {"Name": "email_verified", "Value": "True"},
+                *({"Name": name, "Value": value} for name, value in (attributes or {}).items()),
+            ],
+        }
+        if temporary_password is not None:
+            params["TemporaryPassword"] = temporary_password
+        try:
+            response = await self.call("AdminCreateUser", params)
+        except CognitoClientError as e:
+            code = {
+                "UsernameExistsException": "USER_EXISTS",
+                "InvalidPasswordException": "INVALID_PASSWORD",
+            }.get(e.error_type, "INTERNAL_ERROR")
+            raise CognitoError(code=code, developer_message=str(e)) from e
+
+        # Return cognito sub to save in database
+        for attribute in response.get("User", {}).get("Attributes", []):
+            if attribute["Name"] == "sub":
+                return attribute["Value"]
+        return None
+
+    @guarded
+    @instrument("admin_set_user_password")
+    async def set_user_password(self, username, password):
+        """
+        Set user password
+
+        Args:
+            username (str): The username is the email of the user
+            password (str): The password to set
+        """
+        try:
+            await self.call(
+                "AdminSetUserPassword",
+                {
+                    "UserPoolId": self.USER_POOL_ID,
+                    "Username": username,
+                    "Password": password,
+                    "Permanent": True,
+                },
+            )
+        except CognitoClientError as e:
+            code = "INVALID_PASSWORD" if e.error_type == "InvalidPasswordException" else "INTERNAL_ERROR"
+            raise CognitoError(code=code, developer_message=str(e)) from e
+
+    @guarded
+    @instrument("admin_initiate_auth")
+    async def admin_login_user(self, username: str, password: str) -> dict:
+        """
+        Admin login user
+        Note: this API is for admin test login user only
+
+        Args:
+            username (str): user email
+            password (str): user password
+
+        Returns:
+            dict: response
+        """
+        try:
+            response = await self.call(
+                "AdminInitiateAuth",
+                {
+                    "UserPoolId": self.USER_POOL_ID,
+                    "ClientId": self.CLIENT_ID,
+                    "AuthFlow": "ADMIN_USER_PASSWORD_AUTH",
+                    "AuthParameters": {"USERNAME": username, "PASSWORD": password},
+                },
+            )
+        except CognitoClientError as e:
+            if e.error_type in ("NotAuthorizedException", "UserNotFoundException"):
+                raise AuthError(code="INVALID_CREDENTIALS", developer_message=str(e)) from e
+            raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
+
+        result = response["AuthenticationResult"]
+        return {
+            "id_token": result["IdToken"],
+            "access_token": result["AccessToken"],
+            "refresh_token": result["RefreshToken"],
+        }
+
+    @guarded
+    @instrument("admin_initiate_auth")
+    async def admin_refresh_tokens(self, refresh_token: str) -> dict:
+        """
+        Exchange a refresh token for new id and access tokens, see `RealCognito.admin_refresh_tokens`
+        """
+        try:
+            response = await self.call(
+                "AdminInitiateAuth",
+                {
+                    "UserPoolId": self.USER_POOL_ID,
+                    "ClientId": self.CLIENT_ID,
+                    "AuthFlow": "REFRESH_TOKEN_AUTH",
+                    "AuthParameters": {"REFRESH_TOKEN": refresh_token},
+                },
+            )
+        except CognitoClientError as e:
+            if e.error_type == "NotAuthorizedException":
+                raise AuthError(code="INVALID_REFRESH_TOKEN", developer_message=str(e)) from e
+            raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
+
+        result = response["AuthenticationResult"]
+        return {
+            "id_token": result["IdToken"],
+            "access_token": result["AccessToken"],
+            "expires_in": result["ExpiresIn"],
+        }
+
+    @guarded
+    @instrument("admin_get_user")
+    async def get_user(self, username: str) -> dict | None:
+        """
+        Get user from cognito
+
+        Args:
+            username (str): The username of the user
+
+        Returns:
+            Dict: The user data
+        """
+        try:
+            return await self.call(
+                "AdminGetUser",
+                {"UserPoolId": self.USER_POOL_ID, "Username": username},
+            )
+        except CognitoClientError as e:
+            if e.error_type == "UserNotFoundException":
+                return None
+            raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
+
+    @guarded
+    @instrument("list_users")
+    async def list_users(self, pagination_token: str | None = None, limit: int = 60) -> dict:
+        """
+        List one page of the users of the pool, see `RealCognito.list_users`
+        """
+        params = {"UserPoolId": self.USER_POOL_ID, "AttributesToGet": ["sub", "email"], "Limit": limit}
+        if pagination_token is not None:
+            params["PaginationToken"] = pagination_token
+        try:
+            return await self.call("ListUsers", params)
+        except CognitoClientError as e:
+            raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
+
+    async def is_user_existed(self, username: str) -> bool:
+        """
+        Check if user is existed
+
+        Args:
+            username (str): The email of the user
+
+        Returns:
+            bool: True if user is existed
+        """
+        return await self.get_user(username) is not None
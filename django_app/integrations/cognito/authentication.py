@@ -0,0 +1,61 @@
+"""Define the Cognito JWT authentication used by Django REST framework."""
+
+import jwt
+from django.conf import settings
+from django_cognito_jwt import JSONWebTokenAuthentication as BaseJSONWebTokenAuthentication
+from django_cognito_jwt.validator import TokenError
+from django_cognito_jwt.validator import TokenValidator
+
+from .jwks import get_jwks_store
+from .token_cache import get_token_cache
+
+
+class CognitoTokenValidator(TokenValidator):
+    """
+    Token validator that reads public keys from the process JWKS store
+    instead of fetching the JWKS document for every request, and skips the
+    signature check for tokens already verified
+    """
+
+    def _get_public_key(self, token):
+        try:
+            headers = jwt.get_unverified_header(token)
+        except jwt.DecodeError as e:
+            raise TokenError(str(e)) from e
+
+        return get_jwks_store().get_key(headers.get("kid"))
+
+    def validate(self, token):
+        if not settings.COGNITO_TOKEN_CACHE_ENABLED:
+            return super().validate(token)
+
+        token_cache = get_token_cache()
+        claims = token_cache.get(token)
+        if claims is not None:
+            return claims
+
+        claims = super().validate(token)
+        if token_cache.is_revoked(token, claims):
+            msg = "Token has been revoked"
+            raise TokenError(msg)
+
+        token_cache.set(token, claims)
+        return claims
+
+
+class JSONWebTokenAuthentication(BaseJSONWebTokenAuthentication):
+    """
+    Cognito JWT authentication sharing one validator per process
+    """
+
+    _token_validator = None
+
+    def get_token_validator(self, request):
+        validator = JSONWebTokenAuthentication._token_validator
+        if validator is None:
+            validator = JSONWebTokenAuthentication._token_validator = CognitoTokenValidator(
+                settings.COGNITO_AWS_REGION,
+                settings.COGNITO_USER_POOL,
+                settings.COGNITO_AUDIENCE,
+            )
+        return validator
@@ -0,0 +1,70 @@
+"""Define the boto3 Cognito client shared by every RealCognito of a process."""
+
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client_config() -> Config:
+    """
+    Build the botocore client configuration from the `COGNITO_CLIENT_*` settings
+    """
+    return Config(
+        region_name=settings.AWS_REGION,
+        max_pool_connections=settings.COGNITO_CLIENT_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.COGNITO_CLIENT_CONNECT_TIMEOUT,
+        read_timeout=settings.COGNITO_CLIENT_READ_TIMEOUT,
+        retries={
+            "mode": settings.COGNITO_CLIENT_RETRY_MODE,
+            "max_attempts": settings.COGNITO_CLIENT_MAX_ATTEMPTS,
+        },
+        tcp_keepalive=settings.COGNITO_CLIENT_TCP_KEEPALIVE,
+    )
+
+
+def create_client(config: Config | None = None):
+    """
+    Create a new boto3 Cognito client
+
+    A dedicated session is used because the default boto3 session is not thread-safe.
+    """
+    return boto3.session.Session().client(
+        service_name="cognito-idp",
+        endpoint_url=settings.COGNITO_ENDPOINT_URL,
+        config=config or get_client_config(),
+    )
+
+
+def get_client():
+    """
+    Get the Cognito client of the current process
+
+    boto3 clients are thread-safe once created, so every thread of a process
+    shares the same client and its connection pool. A forked process builds
+    its own client instead of reusing the parent's sockets.
+    """
+    global _client, _client_pid  # noqa: PLW0603
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = create_client()
+                _client_pid = pid
+    return _client
+
+
+def reset_client():
+    """
+    Drop the shared client, the next `get_client` call builds a new one
+    """
+    global _client, _client_pid  # noqa: PLW0603
+    with _client_lock:
+        _client = None
+        _client_pid = None
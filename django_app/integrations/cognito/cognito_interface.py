@@ -1,5 +1,7 @@
 from abc import ABCMeta
 from abc import abstractmethod
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
 
 
 class CognitoInterface(metaclass=ABCMeta):
@@ -14,9 +16,24 @@ class CognitoInterface(metaclass=ABCMeta):
         super().__init__()
 
     @abstractmethod
-    def create_user(self, username: str) -> dict:
+    def create_user(
+        self,
+        username: str,
+        temporary_password: str | None = None,
+        attributes: dict[str, str] | None = None,
+    ) -> dict:
         """
         Admin create a cognito user
+
+        Without a temporary password, Cognito generates one and emails the invitation.
+        `attributes` are extra user attributes, e.g. `{"custom:signup_id": ...}`,
+        custom ones must be defined on the user pool.
+        """
+
+    @abstractmethod
+    def set_user_password(self, username: str, password: str):
+        """
+        Admin set a permanent password for a cognito user
         """
 
     @abstractmethod
@@ -30,3 +47,143 @@ class CognitoInterface(metaclass=ABCMeta):
         """
         Admin login user
         """
+
+    @abstractmethod
+    def admin_refresh_tokens(self, refresh_token: str) -> dict:
+        """
+        Admin exchange a refresh token for new id and access tokens (REFRESH_TOKEN_AUTH)
+
+        Returns:
+            dict: `id_token`, `access_token` and their validity in seconds `expires_in`
+        """
+
+    @abstractmethod
+    def list_users(self, pagination_token: str | None = None, limit: int = 60) -> dict:
+        """
+        Admin list one page of the users of the pool, in the `ListUsers` response shape
+        """
+
+    def iter_users(self, page_size: int = 60) -> Iterator[dict]:
+        """
+        Iterate the users of the pool page by page, in no particular order
+
+        Yields:
+            dict: The `ListUsers` entry of a user (Username, Attributes, Enabled, UserStatus)
+        """
+        pagination_token = None
+        while True:
+            response = self.list_users(pagination_token, page_size)
+            yield from response.get("Users", [])
+            pagination_token = response.get("PaginationToken")
+            if not pagination_token:
+                return
+
+    def get_user_sub(self, username: str) -> str | None:
+        """
+        Get the cognito sub of a user, None when the user does not exist
+        """
+        user = self.get_user(username)
+        if user is None:
+            return None
+        for attribute in user.get("UserAttributes", []):
+            if attribute["Name"] == "sub":
+                return attribute["Value"]
+        return None
+
+    def signup_user(self, username: str, password: str) -> str:
+        """
+        Create a cognito user with a permanent password
+
+        The password is used as the temporary password too, so an invalid
+        password is rejected by the create call before anything is written.
+        An existing username surfaces as `CognitoError(code="USER_EXISTS")`
+        from the create call, no lookup is made beforehand.
+
+        Returns:
+            str: The cognito sub of the new user
+        """
+        cognito_sub = self.create_user(username, password)
+        self.set_user_password(username, password)
+        return cognito_sub
+
+
+class AsyncCognitoInterface(metaclass=ABCMeta):
+    """
+    Async counterpart of `CognitoInterface`, its calls are coroutines
+    Note: a separate interface, an async backend can not stand in for a sync one
+    """
+
+    @abstractmethod
+    async def create_user(
+        self,
+        username: str,
+        temporary_password: str | None = None,
+        attributes: dict[str, str] | None = None,
+    ) -> str | None:
+        """
+        Admin create a cognito user, see `CognitoInterface.create_user`
+        """
+
+    @abstractmethod
+    async def set_user_password(self, username: str, password: str):
+        """
+        Admin set a permanent password for a cognito user
+        """
+
+    @abstractmethod
+    async def get_user(self, username: str) -> dict | None:
+        """
+        Admin get user info from cognito, None when the user does not exist
+        """
+
+    @abstractmethod
+    async def admin_login_user(self, username: str, password: str) -> dict:
+        """
+        Admin login user
+        """
+
+    @abstractmethod
+    async def admin_refresh_tokens(self, refresh_token: str) -> dict:
+        """
+        Admin exchange a refresh token for new id and access tokens, see `CognitoInterface.admin_refresh_tokens`
+        """
+
+    @abstractmethod
+    async def list_users(self, pagination_token: str | None = None, limit: int = 60) -> dict:
+        """
+        Admin list one page of the users of the pool, in the `ListUsers` response shape
+        """
+
+    async def iter_users(self, page_size: int = 60) -> AsyncIterator[dict]:
+        """
+        Iterate the users of the pool page by page, see `CognitoInterface.iter_users`
+        """
+        pagination_token = None
+        while True:
+            response = await self.list_users(pagination_token, page_size)
+            for user in response.get("Users", []):
+                yield user
+            pagination_token = response.get("PaginationToken")
+            if not pagination_token:
+                return
+
+    async def get_user_sub(self, username: str) -> str | None:
+        """
+        Get the cognito sub of a user, None when the user does not exist
+        """
+        user = await self.get_user(username)
+        for attribute in (user or {}).get("UserAttributes", []):
+            if attribute["Name"] == "sub":
+                return attribute["Value"]
+        return None
+
+    async def signup_user(self, username: str, password: str) -> str | None:
+        """
+        Create a cognito user with a permanent password, see `CognitoInterface.signup_user`
+
+        Returns:
+            str: The cognito sub of the new user
+        """
+        cognito_sub = await self.create_user(username, password)
+        await self.set_user_password(username, password)
+        return cognito_sub
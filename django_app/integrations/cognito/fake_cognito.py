@@ -0,0 +1,250 @@
+"""Define the in-memory Cognito backend, this file stands in for Cognito without any AWS call."""
+
+import json
+import random
+import secrets
+import threading
+import time
+import uuid
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.conf import settings
+from django.utils import timezone
+from jwt.algorithms import RSAAlgorithm
+
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import CognitoError
+
+from .cognito_interface import CognitoInterface
+from .instrumentation import instrument
+
+FAKE_KEY_ID = "fake-cognito"
+
+
+class FakeCognito(CognitoInterface):
+    """
+    In-memory Cognito backend
+
+    Users live in a dict of the instance, it is selectable with
+    `COGNITO_BACKEND` for tests, local development and load tests.
+
+    - Every call waits `latency` seconds (+/- `latency_jitter`) like an AWS round-trip
+    - Every call fails with `CognitoError(code="INTERNAL_ERROR")` with probability `error_rate`
+    - Logins return RS256 tokens shaped like Cognito's, signed by a key of the
+      process; its public JWKS is available from `jwks()`
+    - Calls are measured like the AWS ones, see `instrumentation.py`
+
+    Users and keys are per process, run load tests against a single process
+    (threads or an async worker) so signup and login see the same users.
+    """
+
+    def __init__(
+        self,
+        latency: float | None = None,
+        latency_jitter: float | None = None,
+        error_rate: float | None = None,
+        seed: int | None = None,
+    ):
+        super().__init__()
+        self.latency = settings.COGNITO_FAKE_LATENCY if latency is None else latency
+        self.latency_jitter = settings.COGNITO_FAKE_LATENCY_JITTER if latency_jitter is None else latency_jitter
+        self.error_rate = settings.COGNITO_FAKE_ERROR_RATE if error_rate is None else error_rate
+
+        self.users: dict[str, dict] = {}
+        self.refresh_tokens: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)  # noqa: S311
+        self._private_key = None
+
+        self.issuer = f"https://cognito-idp.{settings.AWS_REGION}.amazonaws.com/{settings.COGNITO_USER_POOL_ID}"
+        self.client_id = settings.COGNITO_CLIENT_ID
+
+    @instrument("admin_create_user")
+    def create_user(
+        self,
+        username: str,
+        temporary_password: str | None = None,
+        attributes: dict[str, str] | None = None,
+    ) -> str:
+        """
+        Create a cognito user
+
+        Raises:
+            CognitoError: USER_EXISTS if the username is taken
+
+        Returns:
+            str: The cognito sub of the user
+        """
+        self._simulate()
+        with self._lock:
+            if username in self.users:
+                raise CognitoError(code="USER_EXISTS")
+
+            sub = str(uuid.uuid4())
+            self.users[username] = {
+                "sub": sub,
+                "password": secrets.token_urlsafe(16) if temporary_password is None else temporary_password,
+                "status": "FORCE_CHANGE_PASSWORD",
+                "attributes": dict(attributes or {}),
+                "created": timezone.now(),
+            }
+        return sub
+
+    @instrument("admin_set_user_password")
+    def set_user_password(self, username: str, password: str):
+        """
+        Set a permanent user password
+        """
+        self._simulate()
+        with self._lock:
+            user = self.users.get(username)
+            if user is None:
+                raise CognitoError(code="INTERNAL_ERROR", developer_message="User does not exist.")
+            user.update({"password": password, "status": "CONFIRMED"})
+
+    @instrument("admin_initiate_auth")
+    def admin_login_user(self, username: str, password: str) -> dict:
+        """
+        Login user with its password
+
+        Returns:
+            dict: Signed id and access tokens and an opaque refresh token
+        """
+        self._simulate()
+        user = self.users.get(username)
+        if user is None or user["password"] != password:
+            raise AuthError(code="INVALID_CREDENTIALS")
+
+        refresh_token = secrets.token_urlsafe(32)
+        with self._lock:
+            self.refresh_tokens[refresh_token] = username
+
+        return {**self._issue_tokens(username, user), "refresh_token": refresh_token}
+
+    @instrument("admin_initiate_auth")
+    def admin_refresh_tokens(self, refresh_token: str) -> dict:
+        """
+        Exchange a refresh token of `admin_login_user` for new id and access tokens
+
+        Raises:
+            AuthError: INVALID_REFRESH_TOKEN if the token was not issued by this backend
+        """
+        self._simulate()
+        username = self.refresh_tokens.get(refresh_token)
+        user = self.users.get(username) if username is not None else None
+        if user is None:
+            raise AuthError(code="INVALID_REFRESH_TOKEN")
+
+        return {**self._issue_tokens(username, user), "expires_in": settings.COGNITO_FAKE_TOKEN_VALIDITY}
+
+    @instrument("admin_get_user")
+    def get_user(self, username: str) -> dict | None:
+        """
+        Get user in the `admin_get_user` response shape
+        """
+        self._simulate()
+        user = self.users.get(username)
+        if user is None:
+            return None
+
+        return {
+            "Username": username,
+            "UserAttributes": [
+                {"Name": "sub", "Value": user["sub"]},
+                {"Name": "email", "Value": username},
+                {"Name": "email_verified", "Value": "true"},
+                *({"Name": name, "Value": value} for name, value in user.get("attributes", {}).items()),
+            ],
+            "UserStatus": user["status"],
+            "UserCreateDate": user.get("created"),
+            "Enabled": user.get("enabled", True),
+        }
+
+    @instrument("list_users")
+    def list_users(self, pagination_token: str | None = None, limit: int = 60) -> dict:
+        """
+        List one page of users in the `ListUsers` response shape, in creation order
+        """
+        self._simulate()
+        start = int(pagination_token or 0)
+        with self._lock:
+            page = list(self.users.items())[start : start + limit]
+            more = start + limit < len(self.users)
+
+        response = {
+            "Users": [
+                {
+                    "Username": username,
+                    "Attributes": [
+                        {"Name": "sub", "Value": user["sub"]},
+                        {"Name": "email", "Value": username},
+                    ],
+                    "UserStatus": user["status"],
+                    "Enabled": user.get("enabled", True),
+                }
+                for username, user in page
+            ],
+        }
+        if more:
+            response["PaginationToken"] = str(start + limit)
+        return response
+
+    def is_user_existed(self, username: str) -> bool:
+        return self.get_user(username) is not None
+
+    @property
+    def private_key(self):
+        """
+        Get the signing key, generated on first use
+        """
+        if self._private_key is None:
+            with self._lock:
+                if self._private_key is None:
+                    self._private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return self._private_key
+
+    def jwks(self) -> dict:
+        """
+        Get the public JWKS document matching the issued tokens
+        """
+        jwk = json.loads(RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        jwk.update({"kid": FAKE_KEY_ID, "alg": "RS256", "use": "sig"})
+        return {"keys": [jwk]}
+
+    def _issue_tokens(self, username: str, user: dict) -> dict:
+        now = int(time.time())
+        claims = {
+            "sub": user["sub"],
+            "iss": self.issuer,
+            "iat": now,
+            "auth_time": now,
+            "exp": now + settings.COGNITO_FAKE_TOKEN_VALIDITY,
+            # Cognito username, the pool uses the sub as username.
+            "cognito:username": user["sub"],
+        }
+        id_claims = {**claims, "aud": self.client_id, "token_use": "id", "email": username}
+        access_claims = {**claims, "client_id": self.client_id, "token_use": "access", "jti": str(uuid.uuid4())}
+
+        headers = {"kid": FAKE_KEY_ID}
+        return {
+            "id_token": jwt.encode(id_claims, self.private_key, algorithm="RS256", headers=headers),
+            "access_token": jwt.encode(access_claims, self.private_key, algorithm="RS256", headers=headers),
+        }
+
+    def _simulate(self):
+        if self.latency:
+            jitter = self._random.uniform(-self.latency_jitter, self.latency_jitter) if self.latency_jitter else 0
+            time.sleep(max(self.latency + jitter, 0))
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise CognitoError(code="INTERNAL_ERROR", developer_message="Injected fake Cognito error.")
+
+
+def load_jwks() -> dict:
+    """
+    JWKS loader for `COGNITO_JWKS_LOADER`, returns the keys of the fake backend
+    """
+    from .provider import get_cognito
+
+    return get_cognito().jwks()
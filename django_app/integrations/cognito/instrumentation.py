@@ -0,0 +1,108 @@
+"""Define the Cognito call instrumentation, this file measures the latency and the errors of every AWS call."""
+
+import functools
+import inspect
+import logging
+import time
+
+from django_app.core.exceptions import BaseError
+from django_app.core.metrics import COGNITO_CALL_DURATION
+from django_app.core.metrics import COGNITO_CALL_ERRORS
+from django_app.core.metrics import COGNITO_CALLS_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+
+def error_code(error: Exception) -> str:
+    """
+    Get the code reported for a failed call: the `CognitoError` / `AuthError` code, else the exception class
+    """
+    if isinstance(error, BaseError) and error.code:
+        return error.code
+    return type(error).__name__
+
+
+def record_call(operation: str, duration, started: float, error: Exception | None = None):
+    """
+    Record the latency of one Cognito call, and its error code when it failed
+
+    Args:
+        operation (str): The name reported for the call
+        duration: The duration histogram of the operation
+        started (float): `time.perf_counter()` when the call started
+        error (Exception, optional): The exception raised by the call
+    """
+    elapsed = time.perf_counter() - started
+    duration.observe(elapsed)
+    if error is None:
+        # The histogram has the latency, successful calls are only logged when debugging.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "cognito.%s took %.1fms",
+                operation,
+                elapsed * 1000,
+                extra={"cognito_operation": operation, "duration_ms": elapsed * 1000},
+            )
+        return
+
+    code = error_code(error)
+    COGNITO_CALL_ERRORS.labels(operation, code).inc()
+    logger.info(
+        "cognito.%s took %.1fms (%s)",
+        operation,
+        elapsed * 1000,
+        code,
+        extra={"cognito_operation": operation, "duration_ms": elapsed * 1000, "error_code": code},
+    )
+
+
+def instrument(operation: str):
+    """
+    Decorate a sync or async Cognito call to measure it
+
+    The call is counted in flight while it runs, its duration is observed
+    and its error code counted when it fails, see `django_app/core/metrics.py`.
+    The labelled metrics are looked up once here, a call costs a few microseconds.
+
+    Args:
+        operation (str): The name reported for the call, e.g. admin_create_user
+    """
+    duration = COGNITO_CALL_DURATION.labels(operation)
+    in_flight = COGNITO_CALLS_IN_FLIGHT.labels(operation)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                in_flight.inc()
+                started = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    record_call(operation, duration, started, e)
+                    raise
+                finally:
+                    in_flight.dec()
+                record_call(operation, duration, started)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            in_flight.inc()
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                record_call(operation, duration, started, e)
+                raise
+            finally:
+                in_flight.dec()
+            record_call(operation, duration, started)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,286 @@
+"""Define the JWKS store, this file keeps the user pool public keys warm for JWT verification."""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from jwt.algorithms import RSAAlgorithm
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSError(Exception):
+    """
+    Raised when the JWKS document can not be loaded
+    """
+
+
+class JWKSStore:
+    """
+    Process local store of the user pool public keys
+
+    - Keys are parsed once per process and kept in memory
+    - The raw JWKS document is shared across workers through the Django cache
+    - A daemon thread refreshes the keys before they expire
+    - An unknown `kid` schedules a refetch instead of blocking the request,
+      and is remembered for `unknown_kid_ttl` seconds so forged kids cost a dict lookup
+    - The refresh thread adopts a copy another worker fetched before going to the network
+    """
+
+    cache_key = "cognito:jwks:v2"
+    max_unknown_kids = 1024
+
+    def __init__(  # noqa: PLR0913
+        self,
+        url: str | None = None,
+        file_path: str | None = None,
+        loader: str | None = None,
+        cache_alias: str = "default",
+        ttl: int = 3600,
+        refresh_margin: int = 300,
+        min_refetch_interval: int = 30,
+        timeout: float = 5,
+        unknown_kid_ttl: int = 60,
+    ):
+        self.url = url
+        self.file_path = file_path
+        self.loader = loader
+        self.cache_alias = cache_alias
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self.unknown_kid_ttl = unknown_kid_ttl
+
+        self._keys: dict = {}
+        self._unknown_kids: dict[str, float] = {}
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._last_fetch_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid = os.getpid()
+
+    @classmethod
+    def from_settings(cls) -> "JWKSStore":
+        """
+        Build the store from the `COGNITO_JWKS_*` settings
+        """
+        return cls(
+            url=settings.COGNITO_JWKS_URL,
+            file_path=settings.COGNITO_JWKS_FILE,
+            loader=settings.COGNITO_JWKS_LOADER,
+            cache_alias=settings.COGNITO_JWKS_CACHE_ALIAS,
+            ttl=settings.COGNITO_JWKS_TTL,
+            refresh_margin=settings.COGNITO_JWKS_REFRESH_MARGIN,
+            min_refetch_interval=settings.COGNITO_JWKS_MIN_REFETCH_INTERVAL,
+            unknown_kid_ttl=settings.COGNITO_JWKS_UNKNOWN_KID_TTL,
+        )
+
+    def get_key(self, kid: str):
+        """
+        Get the public key for a key id
+
+        Args:
+            kid (str): The key id from the JWT header
+
+        Returns:
+            RSAPublicKey | None: The public key or None if the key is unknown
+        """
+        self._ensure_loaded()
+
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        now = time.monotonic()
+        if self._unknown_kids.get(kid, 0) > now:
+            return None
+
+        # Another worker may already have refreshed the shared document.
+        self._load_from_cache()
+        key = self._keys.get(kid)
+        if key is None:
+            self._remember_unknown(kid, now)
+            self.request_refresh()
+        return key
+
+    def request_refresh(self):
+        """
+        Ask the background thread to refetch the keys
+        """
+        self._ensure_thread()
+        self._refresh_event.set()
+
+    def refresh(self) -> bool:
+        """
+        Fetch the JWKS document from the source and publish it to the cache
+
+        Returns:
+            bool: True if the keys were refreshed
+        """
+        now = time.monotonic()
+        # Also without keys: while the source is down a cold worker answers 401 instead of refetching per request.
+        if self._last_fetch_at and now - self._last_fetch_at < self.min_refetch_interval:
+            return False
+        self._last_fetch_at = now
+
+        try:
+            document = self._fetch()
+        except (JWKSError, requests.RequestException, OSError, ValueError) as e:
+            logger.warning("Unable to refresh Cognito JWKS: %s", e)
+            return False
+
+        fetched_at = time.time()
+        self._set_document(document, fetched_at)
+        caches[self.cache_alias].set(
+            self.cache_key,
+            {"fetched_at": fetched_at, "document": document},
+            timeout=self.ttl,
+        )
+        return True
+
+    def clear(self):
+        """
+        Drop the in-memory keys, the shared cache entry is kept
+        """
+        with self._lock:
+            self._keys = {}
+            self._unknown_kids = {}
+            self._fetched_at = 0.0
+            self._expires_at = 0.0
+            self._last_fetch_at = 0.0
+
+    def _ensure_loaded(self):
+        if os.getpid() != self._pid:
+            # Forked worker: the parent's refresh thread did not survive the fork.
+            self._pid = os.getpid()
+            self._thread = None
+            self._refresh_event = threading.Event()
+
+        if self._keys:
+            self._ensure_thread()
+            return
+
+        with self._lock:
+            if self._keys:
+                return
+            # Cold start: prefer the copy shared by other workers, a failed fetch is
+            # only retried by the refresh thread after `min_refetch_interval`.
+            if not self._load_from_cache():
+                self.refresh()
+        self._ensure_thread()
+
+    def _remember_unknown(self, kid: str, now: float):
+        if len(self._unknown_kids) >= self.max_unknown_kids:
+            # Bounded so a flood of forged kids can not grow the process memory.
+            self._unknown_kids = {k: t for k, t in self._unknown_kids.items() if t > now}
+            if len(self._unknown_kids) >= self.max_unknown_kids:
+                self._unknown_kids = {}
+        self._unknown_kids[kid] = now + self.unknown_kid_ttl
+
+    def _load_from_cache(self) -> dict | None:
+        """
+        Adopt the shared document when it is newer than ours, keys are only parsed when it changed
+
+        Returns:
+            dict | None: The shared cache entry, None when there is none
+        """
+        entry = caches[self.cache_alias].get(self.cache_key)
+        if not entry:
+            return None
+        if entry["fetched_at"] > self._fetched_at or not self._keys:
+            self._set_document(entry["document"], entry["fetched_at"])
+        return entry
+
+    def _refresh_shared(self, *, triggered: bool):
+        """
+        Refresh the keys, reusing the shared document when another worker fetched it first
+
+        Args:
+            triggered (bool): True when an unknown `kid` asked for the refresh
+        """
+        fetched_at = self._fetched_at
+        entry = self._load_from_cache()
+        if entry is not None:
+            if time.time() - entry["fetched_at"] < self.min_refetch_interval:
+                return
+            if entry["fetched_at"] > fetched_at and (triggered or not self._is_due()):
+                return
+        self.refresh()
+
+    def _is_due(self) -> bool:
+        return time.monotonic() >= self._expires_at - self.refresh_margin
+
+    def _set_document(self, document: dict, fetched_at: float):
+        keys = {}
+        for item in document.get("keys", []):
+            if item.get("kty") != "RSA" or "kid" not in item:
+                continue
+            keys[item["kid"]] = RSAAlgorithm.from_jwk(json.dumps(item))
+
+        self._keys = keys
+        self._fetched_at = fetched_at
+        # The shared copy may have been fetched a while ago, it expires with the cache entry.
+        self._expires_at = time.monotonic() + self.ttl - max(time.time() - fetched_at, 0)
+
+    def _fetch(self) -> dict:
+        if self.loader:
+            return import_string(self.loader)()
+
+        if self.file_path:
+            return json.loads(Path(self.file_path).read_text())
+
+        if not self.url:
+            msg = "Neither COGNITO_JWKS_URL nor COGNITO_JWKS_FILE is configured."
+            raise JWKSError(msg)
+
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name="cognito-jwks-refresh",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            wait = max(self._expires_at - self.refresh_margin - time.monotonic(), 0)
+            triggered = self._refresh_event.wait(timeout=wait or self.min_refetch_interval)
+            self._refresh_event.clear()
+
+            if triggered or self._is_due():
+                self._refresh_shared(triggered=triggered)
+
+
+_store: JWKSStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_jwks_store() -> JWKSStore:
+    """
+    Get the JWKS store of the current process
+    """
+    global _store  # noqa: PLW0603
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JWKSStore.from_settings()
+    return _store
@@ -0,0 +1,50 @@
+"""Define the Cognito provider, this file builds the configured Cognito backend lazily."""
+
+import os
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .cognito_interface import CognitoInterface
+
+_local = {}
+_lock = threading.Lock()
+
+
+def _get_instance(name: str, backend_path: str):
+    pid = os.getpid()
+    instance = _local.get(name)
+    if instance is None or instance[0] != pid:
+        with _lock:
+            instance = _local.get(name)
+            if instance is None or instance[0] != pid:
+                # A forked process builds its own backend, it never reuses the parent's sockets.
+                instance = _local[name] = (pid, import_string(backend_path)())
+    return instance[1]
+
+
+def get_cognito() -> CognitoInterface:
+    """
+    Get the Cognito backend of the current process
+
+    The backend class is read from `COGNITO_BACKEND` and only built on first
+    use, so importing the URLconf, running management commands or booting a
+    worker does not load the botocore service models.
+    """
+    return _get_instance("sync", settings.COGNITO_BACKEND)
+
+
+def get_async_cognito():
+    """
+    Get the async Cognito backend of the current process, see `get_cognito`
+    """
+    return _get_instance("async", settings.COGNITO_ASYNC_BACKEND)
+
+
+def reset_cognito():
+    """
+    Drop the backends of the current process, they are built again on next use
+    """
+    with _lock:
+        _local.clear()
@@ -1,35 +1,57 @@
 """Define Cognito Client, this file contains all method to connect with Cognito."""
 
-import boto3
 from botocore.exceptions import ClientError
-from core.exceptions import AuthError
-from core.exceptions import CognitoError
 from django.conf import settings
 
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import CognitoError
+
+from .client import get_client
 from .cognito_interface import CognitoInterface
+from .instrumentation import instrument
+from .resilience import build_breaker
+from .resilience import build_bulkhead
+from .resilience import guarded
+from .singleflight import single_flight
 
 
 class RealCognito(CognitoInterface):
     def __init__(self):
-        self.client = boto3.client(service_name="cognito-idp", region_name=settings.AWS_REGION)
+        self.client = get_client()
         self.cognito_exceptions = self.client.exceptions
 
         self.USER_POOL_ID = settings.COGNITO_USER_POOL_ID
         self.CLIENT_ID = settings.COGNITO_CLIENT_ID
 
-    def create_user(self, username: str, temporary_password: str) -> dict:
+        # Per backend, so per process: see `django_app/integrations/cognito/resilience.py`
+        self.breaker = build_breaker()
+        self.bulkhead = build_bulkhead()
+
+    @guarded
+    @instrument("admin_create_user")
+    def create_user(
+        self,
+        username: str,
+        temporary_password: str | None = None,
+        attributes: dict[str, str] | None = None,
+    ) -> dict:
         """
         Create a cognito user
 
         Args:
             username (str): The user email
+            temporary_password (str, optional): Generated by Cognito and sent with
+                the invitation email when not given
+            attributes (dict, optional): Extra user attributes
 
         Raises:
-            AuthError: If error when create user
+            CognitoError: USER_EXISTS if the username is taken, INVALID_PASSWORD if
+                the password does not match the user pool policy
 
         Returns:
             Dict: The response from cognito
         """
+        kwargs = {} if temporary_password is None else {"TemporaryPassword": temporary_password}
         try:
             response = self.client.admin_create_user(
                 UserPoolId=self.USER_POOL_ID,
@@ -37,8 +59,9 @@ class RealCognito(CognitoInterface):
                 UserAttributes=[
                     {"Name": "email", "Value": username},
                     {"Name": "email_verified", "Value": "True"},
+                    *({"Name": name, "Value": value} for name, value in (attributes or {}).items()),
                 ],
-                TemporaryPassword=temporary_password,
+                **kwargs,
             )
 
             # Return cognito sub to save in database
@@ -48,9 +71,13 @@ class RealCognito(CognitoInterface):
                     return attribute["Value"]
         except self.cognito_exceptions.UsernameExistsException as e:
             raise CognitoError(code="USER_EXISTS", developer_message=str(e)) from e
+        except self.cognito_exceptions.InvalidPasswordException as e:
+            raise CognitoError(code="INVALID_PASSWORD", developer_message=str(e)) from e
         except ClientError as e:
             raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
 
+    @guarded
+    @instrument("admin_set_user_password")
     def set_user_password(self, username, password):
         """
         Set user password
@@ -71,6 +98,10 @@ class RealCognito(CognitoInterface):
         except ClientError as e:
             raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
 
+    # Credentials in, tokens out: coalesced in the process only.
+    @single_flight("admin_login_user", shared=False)
+    @guarded
+    @instrument("admin_initiate_auth")
     def admin_login_user(self, username: str, password: str) -> dict:
         """
         Admin login user
@@ -113,6 +144,44 @@ class RealCognito(CognitoInterface):
                 "refresh_token": refresh_token,
             }
 
+    @single_flight("admin_refresh_tokens", shared=False)
+    @guarded
+    @instrument("admin_initiate_auth")
+    def admin_refresh_tokens(self, refresh_token: str) -> dict:
+        """
+        Exchange a refresh token for new id and access tokens
+
+        Args:
+            refresh_token (str): The refresh token of a login
+
+        Raises:
+            AuthError: INVALID_REFRESH_TOKEN if the token is expired or revoked
+
+        Returns:
+            dict: The id and access tokens and their validity in seconds
+        """
+        try:
+            response = self.client.admin_initiate_auth(
+                UserPoolId=self.USER_POOL_ID,
+                ClientId=self.CLIENT_ID,
+                AuthFlow="REFRESH_TOKEN_AUTH",
+                AuthParameters={"REFRESH_TOKEN": refresh_token},
+            )
+        except self.cognito_exceptions.NotAuthorizedException as e:
+            raise AuthError(code="INVALID_REFRESH_TOKEN", developer_message=str(e)) from e
+        except ClientError as e:
+            raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
+
+        result = response["AuthenticationResult"]
+        return {
+            "id_token": result["IdToken"],
+            "access_token": result["AccessToken"],
+            "expires_in": result["ExpiresIn"],
+        }
+
+    @single_flight("admin_get_user")
+    @guarded
+    @instrument("admin_get_user")
     def get_user(self, username: str) -> dict:
         """
         Get user from cognito
@@ -134,6 +203,30 @@ class RealCognito(CognitoInterface):
         except ClientError as e:
             raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
 
+    @guarded
+    @instrument("list_users")
+    def list_users(self, pagination_token: str | None = None, limit: int = 60) -> dict:
+        """
+        List one page of the users of the pool
+
+        Args:
+            pagination_token (str, optional): The `PaginationToken` of the previous page
+            limit (int): Users per page, 60 at most
+
+        Returns:
+            Dict: The users and the `PaginationToken` of the next page, if any
+        """
+        kwargs = {} if pagination_token is None else {"PaginationToken": pagination_token}
+        try:
+            return self.client.list_users(
+                UserPoolId=self.USER_POOL_ID,
+                AttributesToGet=["sub", "email"],
+                Limit=limit,
+                **kwargs,
+            )
+        except ClientError as e:
+            raise CognitoError(code="INTERNAL_ERROR", developer_message=str(e)) from e
+
     # Other methods
     def is_user_existed(self, username: str) -> bool:
         """
@@ -0,0 +1,133 @@
+"""Define the Cognito circuit breaker and bulkhead, this file sheds Cognito calls while Cognito is down or saturated."""
+
+import functools
+import inspect
+
+from botocore.exceptions import BotoCoreError
+from django.conf import settings
+
+from django_app.core.exceptions import BaseError
+from django_app.core.exceptions import CognitoError
+from django_app.core.metrics import SHED_CALLS
+from django_app.core.resilience import Bulkhead
+from django_app.core.resilience import CircuitBreaker
+
+
+def build_breaker(name: str = "cognito") -> CircuitBreaker:
+    """
+    Build a Cognito circuit breaker from the `COGNITO_BREAKER_*` settings
+    """
+    return CircuitBreaker(
+        name,
+        failure_threshold=settings.COGNITO_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.COGNITO_BREAKER_RESET_TIMEOUT,
+        half_open_calls=settings.COGNITO_BREAKER_HALF_OPEN_CALLS,
+    )
+
+
+def build_bulkhead() -> Bulkhead:
+    """
+    Build a Cognito bulkhead from the `COGNITO_BULKHEAD_*` settings
+    """
+    return Bulkhead(settings.COGNITO_BULKHEAD_SIZE, timeout=settings.COGNITO_BULKHEAD_TIMEOUT)
+
+
+def is_failure(error: Exception) -> bool:
+    """
+    Check if an error tells that Cognito failed, rather than rejected the call (e.g. a wrong password)
+    """
+    if isinstance(error, BaseError):
+        return error.code == "INTERNAL_ERROR"
+    # Connection errors and timeouts.
+    return True
+
+
+def allow(backend):
+    """
+    Let a call of a backend through its breaker
+
+    Raises:
+        CognitoError: INTERNAL_ERROR when the breaker is open
+    """
+    if not backend.breaker.allow():
+        SHED_CALLS.labels("cognito", backend.breaker.state).inc()
+        raise CognitoError(code="INTERNAL_ERROR", developer_message="Cognito circuit breaker is open.")
+
+
+def shed(backend):
+    """
+    Shed a call of a backend let through by its breaker but finding its bulkhead full
+
+    Raises:
+        CognitoError: INTERNAL_ERROR
+    """
+    backend.breaker.release()
+    SHED_CALLS.labels("cognito", "bulkhead").inc()
+    raise CognitoError(code="INTERNAL_ERROR", developer_message="Too many Cognito calls in flight.")
+
+
+def record_error(backend, error: Exception) -> Exception:
+    """
+    Record a failed call of a backend in its breaker
+
+    Returns:
+        Exception: The error to raise, transport errors of botocore (e.g.
+            `EndpointConnectionError`, `ReadTimeoutError`) become `CognitoError(code="INTERNAL_ERROR")`
+    """
+    if is_failure(error):
+        backend.breaker.record_failure()
+    else:
+        backend.breaker.record_success()
+    if isinstance(error, BotoCoreError):
+        return CognitoError(code="INTERNAL_ERROR", developer_message=str(error))
+    return error
+
+
+def guarded(func):
+    """
+    Decorate a sync or async Cognito call of a backend with the `breaker` and `bulkhead` of the backend
+
+    A shed call raises `CognitoError(code="INTERNAL_ERROR")` at once, like
+    a call failing to reach Cognito.
+    """
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            allow(self)
+            if not await self.bulkhead.acquire_async():
+                shed(self)
+
+            try:
+                result = await func(self, *args, **kwargs)
+            except Exception as e:
+                error = record_error(self, e)
+                if error is e:
+                    raise
+                raise error from e
+            finally:
+                self.bulkhead.release()
+            self.breaker.record_success()
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        allow(self)
+        if not self.bulkhead.acquire():
+            shed(self)
+
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception as e:
+            error = record_error(self, e)
+            if error is e:
+                raise
+            raise error from e
+        finally:
+            self.bulkhead.release()
+        self.breaker.record_success()
+        return result
+
+    return wrapper
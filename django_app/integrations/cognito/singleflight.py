@@ -0,0 +1,232 @@
+"""Define the single-flight layer, this file coalesces identical Cognito calls in flight."""
+
+import functools
+import hashlib
+import hmac
+import threading
+import time
+import uuid
+from collections.abc import Callable
+
+from django.conf import settings
+from django.core.cache import caches
+
+from django_app.core.exceptions import BaseError
+from django_app.core.exceptions import CognitoError
+from django_app.core.metrics import COGNITO_COALESCED_CALLS
+
+
+class _Call:
+    """
+    A call in flight in the current process
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+    def outcome(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Coalesce identical calls in flight, every caller gets the result or the error of one call
+
+    - Threads of a process wait for the call of the first one
+    - Shared calls: processes wait for the process holding the lock of the
+      call in the Django cache (Redis in production), the outcome is passed
+      through the cache. The lock and the outcome expire after `timeout`
+      seconds. A waiter polls with a backoff from `poll_interval` to
+      `max_poll_interval` for at most `wait` seconds, then, or when the
+      holder died, makes the call itself.
+
+    Calls that completed are not remembered, a call made after the outcome
+    is out is made again.
+    """
+
+    key_prefix = "cognito:flight"
+
+    def __init__(  # noqa: PLR0913
+        self,
+        timeout: float = 10,
+        wait: float = 2,
+        poll_interval: float = 0.01,
+        max_poll_interval: float = 0.2,
+        cache_alias: str = "default",
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.timeout = timeout
+        self.wait = min(wait, timeout)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.cache_alias = cache_alias
+        self.clock = clock
+        self.sleep = sleep
+
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "SingleFlight":
+        """
+        Build the layer from the `COGNITO_SINGLE_FLIGHT_*` settings
+        """
+        return cls(
+            timeout=settings.COGNITO_SINGLE_FLIGHT_TIMEOUT,
+            wait=settings.COGNITO_SINGLE_FLIGHT_WAIT,
+            cache_alias=settings.COGNITO_SINGLE_FLIGHT_ALIAS,
+        )
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def do(self, key: str, func: Callable, *, shared: bool = True):
+        """
+        Call `func`, or wait for the identical call in flight
+
+        Args:
+            key (str): Identifies the call, e.g. the operation and a digest of its arguments
+            func (Callable): Makes the call
+            shared (bool): Coalesce with the other processes too, the outcome is
+                written to the cache; only in the process when False
+
+        Returns:
+            The result of the call, its error is raised
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            COGNITO_COALESCED_CALLS.labels(key.split(":", 1)[0], "process").inc()
+            return call.outcome()
+
+        try:
+            call.result = self._do_shared(key, func) if shared else func()
+        except Exception as e:  # noqa: BLE001
+            call.error = e
+        except BaseException:
+            # Interrupted, the waiters are not left with a result of None.
+            call.error = CognitoError(code="INTERNAL_ERROR")
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.outcome()
+
+    def _do_shared(self, key: str, func: Callable):
+        lock_key = f"{self.key_prefix}:{key}"
+        call_id = uuid.uuid4().hex
+        if self.shared.add(lock_key, call_id, timeout=self.timeout):
+            try:
+                return self._lead(call_id, func)
+            finally:
+                if self.shared.get(lock_key) == call_id:
+                    self.shared.delete(lock_key)
+
+        leader_id = self.shared.get(lock_key)
+        if leader_id is not None:
+            outcome = self._follow(lock_key, leader_id)
+            if outcome is not None:
+                COGNITO_COALESCED_CALLS.labels(key.split(":", 1)[0], "shared").inc()
+                return self._unpack(outcome)
+        return func()
+
+    def _lead(self, call_id: str, func: Callable):
+        result_key = self._result_key(call_id)
+        try:
+            result = func()
+        except BaseError as e:
+            self.shared.set(result_key, ("error", type(e), e.code, e.developer_message), timeout=self.timeout)
+            raise
+        except Exception as e:
+            self.shared.set(result_key, ("error", CognitoError, "INTERNAL_ERROR", str(e)), timeout=self.timeout)
+            raise
+        self.shared.set(result_key, ("result", result), timeout=self.timeout)
+        return result
+
+    def _follow(self, lock_key: str, leader_id: str) -> tuple | None:
+        result_key = self._result_key(leader_id)
+        deadline = self.clock() + self.wait
+        interval = self.poll_interval
+        while True:
+            values = self.shared.get_many([result_key, lock_key])
+            if result_key in values:
+                return values[result_key]
+            if values.get(lock_key) != leader_id or self.clock() >= deadline:
+                # The leader is gone without outcome, or too slow.
+                return self.shared.get(result_key)
+            self.sleep(min(interval, max(deadline - self.clock(), 0)))
+            interval = min(interval * 2, self.max_poll_interval)
+
+    @staticmethod
+    def _unpack(outcome: tuple):
+        if outcome[0] == "error":
+            _, error_class, code, developer_message = outcome
+            raise error_class(code=code, developer_message=developer_message)
+        return outcome[1]
+
+    def _result_key(self, call_id: str) -> str:
+        return f"{self.key_prefix}:result:{call_id}"
+
+
+_single_flight: SingleFlight | None = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the single-flight layer of the current process
+    """
+    global _single_flight  # noqa: PLW0603
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight.from_settings()
+    return _single_flight
+
+
+def single_flight(operation: str, *, shared: bool = True):
+    """
+    Decorate a Cognito call to coalesce it with the identical calls in flight
+
+    Calls are identical when their arguments are, only wrap calls whose
+    result can be shared, e.g. reads and logins. The key is an HMAC of the
+    arguments with the secret key, it may be derived from a password.
+
+    Args:
+        operation (str): The name of the call, e.g. admin_get_user
+        shared (bool): Coalesce across processes through the cache, pass False
+            for calls taking credentials or returning tokens, they stay in the process
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not settings.COGNITO_SINGLE_FLIGHT_ENABLED:
+                return func(self, *args, **kwargs)
+
+            digest = hmac.new(
+                settings.SECRET_KEY.encode(),
+                repr((args, sorted(kwargs.items()))).encode(),
+                hashlib.sha256,
+            ).hexdigest()
+            return get_single_flight().do(
+                f"{operation}:{digest}",
+                lambda: func(self, *args, **kwargs),
+                shared=shared,
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+
+class StubCognitoServer:
+    """
+    Local HTTP server replaying canned Cognito JSON API responses
+
+    Responses are registered per operation (the `X-Amz-Target` suffix) as
+    `(status, body)` tuples, body being JSON data or raw bytes, every received call is recorded in `calls`.
+    `latency` seconds are waited before answering to mimic AWS round-trips,
+    `connections` counts the TCP connections opened by clients.
+    """
+
+    def __init__(self, responses: dict | None = None, latency: float = 0):
+        self.responses = responses or {}
+        self.latency = latency
+        self.calls: list[tuple[str, dict]] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def operations(self) -> list[str]:
+        return [operation for operation, _ in self.calls]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:  # noqa: SLF001
+                    stub.connections += 1
+
+            def do_POST(self):  # noqa: N802
+                length = int(self.headers.get("Content-Length", 0))
+                params = json.loads(self.rfile.read(length) or b"{}")
+                operation = self.headers.get("X-Amz-Target", "").rsplit(".", 1)[-1]
+                with stub._lock:  # noqa: SLF001
+                    stub.calls.append((operation, params))
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                status, body = stub.responses.get(operation, (200, {}))
+                body = body(params) if callable(body) else body
+                # Raw bytes are sent as is, e.g. the HTML error page of a proxy
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/x-amz-json-1.1")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def error(error_type: str, message: str = "") -> tuple[int, dict]:
+    """
+    Build a Cognito error response
+    """
+    return 400, {"__type": error_type, "message": message}
+
+
+def created_user(sub: str) -> tuple[int, dict]:
+    """
+    Build an AdminCreateUser response
+    """
+    return 200, {"User": {"Attributes": [{"Name": "sub", "Value": sub}]}}
@@ -0,0 +1,87 @@
+import asyncio
+import gc
+
+import pytest
+from botocore.credentials import Credentials
+
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import CognitoError
+from django_app.integrations.cognito.async_cognito import AsyncCognito
+
+from .stub_server import StubCognitoServer
+from .stub_server import created_user
+from .stub_server import error
+
+SUB = "9a8e6a4c-3a53-4c38-9d41-1d7c8e5f6f10"
+
+
+def run(cognito: AsyncCognito, coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await cognito.close()
+
+    return asyncio.run(main())
+
+
+def make_cognito(server: StubCognitoServer) -> AsyncCognito:
+    return AsyncCognito(endpoint_url=server.url, credentials=Credentials("key", "secret"))
+
+
+class TestAsyncCognito:
+    def test_create_user(self):
+        with StubCognitoServer({"AdminCreateUser": created_user(SUB)}) as server:
+            cognito = make_cognito(server)
+            assert run(cognito, cognito.create_user("john@example.com", "P@ssw0rd!")) == SUB
+
+        operation, params = server.calls[0]
+        assert operation == "AdminCreateUser"
+        assert params["Username"] == "john@example.com"
+
+    def test_create_user_exists(self):
+        with StubCognitoServer({"AdminCreateUser": error("UsernameExistsException")}) as server:
+            cognito = make_cognito(server)
+            with pytest.raises(CognitoError) as e:
+                run(cognito, cognito.create_user("john@example.com", "P@ssw0rd!"))
+
+        assert e.value.code == "USER_EXISTS"
+
+    def test_get_user_not_found(self):
+        with StubCognitoServer({"AdminGetUser": error("UserNotFoundException")}) as server:
+            cognito = make_cognito(server)
+            assert run(cognito, cognito.is_user_existed("john@example.com")) is False
+
+    def test_admin_login_user_invalid_credentials(self):
+        with StubCognitoServer({"AdminInitiateAuth": error("NotAuthorizedException")}) as server:
+            cognito = make_cognito(server)
+            with pytest.raises(AuthError) as e:
+                run(cognito, cognito.admin_login_user("john@example.com", "wrong"))
+
+        assert e.value.code == "INVALID_CREDENTIALS"
+
+    def test_non_json_error_response(self):
+        with StubCognitoServer({"AdminInitiateAuth": (502, b"<html>Bad Gateway</html>")}) as server:
+            cognito = make_cognito(server)
+            with pytest.raises(CognitoError) as e:
+                run(cognito, cognito.admin_login_user("john@example.com", "P@ssw0rd!"))
+
+        assert e.value.code == "INTERNAL_ERROR"
+
+    def test_get_user(self):
+        with StubCognitoServer({"AdminGetUser": (200, {"Username": "john"})}) as server:
+            cognito = make_cognito(server)
+            assert run(cognito, cognito.get_user("john")) == {"Username": "john"}
+
+
+def test_clients_are_dropped_with_their_loop():
+    cognito = AsyncCognito(endpoint_url="http://127.0.0.1:1", credentials=Credentials("key", "secret"))
+
+    async def client():
+        return cognito.client
+
+    for _ in range(3):
+        asyncio.run(client())
+    gc.collect()
+
+    assert len(cognito._clients) == 0  # noqa: SLF001
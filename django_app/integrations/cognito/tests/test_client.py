@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from django_app.integrations.cognito import client as cognito_client
+from django_app.integrations.cognito.real_cognito import RealCognito
+
+from .stub_server import StubCognitoServer
+
+THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def _reset_client():
+    cognito_client.reset_client()
+    yield
+    cognito_client.reset_client()
+
+
+class TestClientConfig:
+    def test_config_from_settings(self, settings):
+        settings.COGNITO_CLIENT_MAX_POOL_CONNECTIONS = 64
+        settings.COGNITO_CLIENT_RETRY_MODE = "adaptive"
+        settings.COGNITO_CLIENT_CONNECT_TIMEOUT = 1
+
+        config = cognito_client.get_client_config()
+
+        assert config.max_pool_connections == 64  # noqa: PLR2004
+        assert config.retries["mode"] == "adaptive"
+        assert config.connect_timeout == 1
+        assert config.tcp_keepalive is True
+
+    def test_client_is_shared(self):
+        assert RealCognito().client is RealCognito().client
+
+    def test_client_is_created_once_across_threads(self):
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(cognito_client.get_client())) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(client) for client in clients}) == 1
+
+    def test_client_uses_endpoint_url(self, settings, monkeypatch):
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "key")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+
+        with StubCognitoServer({"AdminGetUser": (200, {"Username": "john"})}) as server:
+            settings.COGNITO_ENDPOINT_URL = server.url
+            assert RealCognito().get_user("john")["Username"] == "john"
+
+        assert server.operations() == ["AdminGetUser"]
@@ -0,0 +1,107 @@
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import CognitoError
+from django_app.integrations.cognito.authentication import CognitoTokenValidator
+from django_app.integrations.cognito.fake_cognito import FakeCognito
+from django_app.integrations.cognito.jwks import JWKSStore
+from django_app.integrations.cognito.provider import get_cognito
+from django_app.integrations.cognito.provider import reset_cognito
+from django_app.integrations.cognito.urls import get_urlpatterns
+
+EMAIL = "john@example.com"
+PASSWORD = "P@ssw0rd!"  # noqa: S105
+
+
+@pytest.fixture(autouse=True)
+def _reset_cognito():
+    reset_cognito()
+    yield
+    reset_cognito()
+
+
+@pytest.fixture()
+def store():
+    cache.delete(JWKSStore.cache_key)
+    yield JWKSStore(loader="django_app.integrations.cognito.fake_cognito.load_jwks")
+    cache.delete(JWKSStore.cache_key)
+
+
+class TestFakeCognito:
+    def test_signup_existing_user(self):
+        cognito = FakeCognito()
+        cognito.signup_user(EMAIL, PASSWORD)
+
+        with pytest.raises(CognitoError) as e:
+            cognito.signup_user(EMAIL, PASSWORD)
+
+        assert e.value.code == "USER_EXISTS"
+
+    def test_login_invalid_credentials(self):
+        cognito = FakeCognito()
+        cognito.signup_user(EMAIL, PASSWORD)
+
+        with pytest.raises(AuthError):
+            cognito.admin_login_user(EMAIL, "wrong")
+
+    def test_refresh_tokens(self):
+        cognito = FakeCognito()
+        cognito.signup_user(EMAIL, PASSWORD)
+        tokens = cognito.admin_login_user(EMAIL, PASSWORD)
+
+        refreshed = cognito.admin_refresh_tokens(tokens["refresh_token"])
+
+        assert set(refreshed) == {"id_token", "access_token", "expires_in"}
+        with pytest.raises(AuthError) as e:
+            cognito.admin_refresh_tokens("unknown")
+        assert e.value.code == "INVALID_REFRESH_TOKEN"
+
+    def test_latency(self):
+        cognito = FakeCognito(latency=0.02)
+
+        started = time.perf_counter()
+        cognito.get_user(EMAIL)
+
+        assert time.perf_counter() - started >= 0.02  # noqa: PLR2004
+
+    def test_error_rate(self):
+        cognito = FakeCognito(error_rate=0.5, seed=1)
+
+        failures = []
+        for _ in range(200):
+            try:
+                cognito.get_user(EMAIL)
+            except CognitoError as e:
+                failures.append(e.code)
+
+        assert set(failures) == {"INTERNAL_ERROR"}
+        assert 60 < len(failures) < 140  # noqa: PLR2004
+
+    def test_tokens_validate_against_jwks(self, settings, store: JWKSStore):
+        settings.COGNITO_TOKEN_CACHE_ENABLED = False
+        cognito = get_cognito()
+        sub = cognito.signup_user(EMAIL, PASSWORD)
+        tokens = cognito.admin_login_user(EMAIL, PASSWORD)
+        validator = CognitoTokenValidator(settings.AWS_REGION, settings.COGNITO_USER_POOL_ID, cognito.client_id)
+
+        with mock.patch("django_app.integrations.cognito.authentication.get_jwks_store", return_value=store):
+            payload = validator.validate(tokens["id_token"])
+
+        assert payload["cognito:username"] == sub
+        assert payload["email"] == EMAIL
+
+    def test_jwks_view(self, db, client):
+        response = client.get(reverse("cognito-jwks"))
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response.json() == get_cognito().jwks()
+
+    def test_jwks_is_not_routed_with_real_backend(self, settings):
+        settings.COGNITO_BACKEND = "django_app.integrations.cognito.real_cognito.RealCognito"
+
+        assert get_urlpatterns() == []
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import CognitoError
+from django_app.integrations.cognito.fake_cognito import FakeCognito
+from django_app.integrations.cognito.instrumentation import instrument
+
+from .stub_server import StubCognitoServer
+from .stub_server import error
+from .test_async_cognito import make_cognito
+from .test_async_cognito import run
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def calls(operation: str) -> float:
+    return sample("django_app_cognito_call_duration_seconds_count", operation=operation)
+
+
+def errors(operation: str, code: str) -> float:
+    return sample("django_app_cognito_call_errors_total", operation=operation, code=code)
+
+
+def in_flight(operation: str) -> float:
+    return sample("django_app_cognito_calls_in_flight", operation=operation)
+
+
+class TestInstrument:
+    def test_success(self):
+        @instrument("test_success")
+        def call():
+            return in_flight("test_success")
+
+        assert call() == 1
+        assert calls("test_success") == 1
+        assert in_flight("test_success") == 0
+
+    def test_error_codes(self):
+        @instrument("test_errors")
+        def call(error: Exception):
+            raise error
+
+        for e in (CognitoError(code="USER_EXISTS"), AuthError(code="INVALID_CREDENTIALS"), TimeoutError()):
+            with pytest.raises(type(e)):
+                call(e)
+
+        assert calls("test_errors") == 3  # noqa: PLR2004
+        assert errors("test_errors", "USER_EXISTS") == 1
+        assert errors("test_errors", "INVALID_CREDENTIALS") == 1
+        assert errors("test_errors", "TimeoutError") == 1
+        assert in_flight("test_errors") == 0
+
+    def test_async(self):
+        @instrument("test_async")
+        async def call():
+            await asyncio.sleep(0)
+            raise CognitoError(code="INTERNAL_ERROR")
+
+        with pytest.raises(CognitoError):
+            asyncio.run(call())
+
+        assert calls("test_async") == 1
+        assert errors("test_async", "INTERNAL_ERROR") == 1
+        assert in_flight("test_async") == 0
+
+
+class TestBackends:
+    def test_fake_cognito(self):
+        cognito = FakeCognito(latency=0, error_rate=0)
+        before = calls("admin_create_user"), errors("admin_create_user", "USER_EXISTS")
+
+        cognito.create_user("john@example.com")
+        with pytest.raises(CognitoError):
+            cognito.create_user("john@example.com")
+
+        assert calls("admin_create_user") - before[0] == 2  # noqa: PLR2004
+        assert errors("admin_create_user", "USER_EXISTS") - before[1] == 1
+
+    def test_async_cognito(self):
+        before = calls("admin_initiate_auth"), errors("admin_initiate_auth", "INVALID_CREDENTIALS")
+
+        with StubCognitoServer({"AdminInitiateAuth": error("NotAuthorizedException")}) as server:
+            cognito = make_cognito(server)
+            with pytest.raises(AuthError):
+                run(cognito, cognito.admin_login_user("john@example.com", "wrong"))
+
+        assert calls("admin_initiate_auth") - before[0] == 1
+        assert errors("admin_initiate_auth", "INVALID_CREDENTIALS") - before[1] == 1
@@ -0,0 +1,158 @@
+import json
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django_cognito_jwt.validator import TokenError
+
+from django_app.integrations.cognito.authentication import CognitoTokenValidator
+from django_app.integrations.cognito.jwks import JWKSStore
+
+from .utils import generate_rsa_key
+from .utils import make_token
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/pool"
+AUDIENCE = "client"
+
+
+@pytest.fixture()
+def signing_key():
+    return generate_rsa_key("kid-1")
+
+
+@pytest.fixture()
+def jwks_file(tmp_path, signing_key):
+    _, jwk = signing_key
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps({"keys": [jwk]}))
+    return path
+
+
+@pytest.fixture()
+def store(jwks_file):
+    cache.delete(JWKSStore.cache_key)
+    yield JWKSStore(file_path=str(jwks_file))
+    cache.delete(JWKSStore.cache_key)
+
+
+class TestJWKSStore:
+    def test_get_key_loads_file_once(self, store: JWKSStore):
+        with mock.patch.object(store, "_fetch", wraps=store._fetch) as fetch:  # noqa: SLF001
+            assert store.get_key("kid-1") is not None
+            assert store.get_key("kid-1") is not None
+
+        assert fetch.call_count == 1
+
+    def test_keys_are_shared_through_cache(self, store: JWKSStore, jwks_file):
+        store.get_key("kid-1")
+
+        other = JWKSStore(file_path=str(jwks_file))
+        with mock.patch.object(other, "_fetch") as fetch:
+            assert other.get_key("kid-1") is not None
+
+        fetch.assert_not_called()
+
+    def test_unknown_kid_schedules_refresh(self, store: JWKSStore):
+        store.get_key("kid-1")
+
+        with mock.patch.object(store, "request_refresh") as request_refresh:
+            assert store.get_key("kid-unknown") is None
+
+        request_refresh.assert_called_once()
+
+    def test_unknown_kid_is_negative_cached(self, store: JWKSStore):
+        store.get_key("kid-1")
+
+        with (
+            mock.patch.object(store, "_load_from_cache", wraps=store._load_from_cache) as load,  # noqa: SLF001
+            mock.patch.object(store, "request_refresh") as request_refresh,
+        ):
+            assert store.get_key("kid-forged") is None
+            assert store.get_key("kid-forged") is None
+
+        assert load.call_count == 1
+        request_refresh.assert_called_once()
+
+    def test_unknown_kids_are_bounded(self, store: JWKSStore):
+        store.get_key("kid-1")
+        store.max_unknown_kids = 2
+
+        with mock.patch.object(store, "request_refresh"):
+            for i in range(5):
+                store.get_key(f"kid-forged-{i}")
+
+        assert len(store._unknown_kids) <= 2  # noqa: PLR2004, SLF001
+
+    def test_unchanged_cache_entry_is_not_parsed_again(self, store: JWKSStore):
+        store.get_key("kid-1")
+
+        with (
+            mock.patch.object(store, "_set_document") as set_document,
+            mock.patch.object(store, "request_refresh"),
+        ):
+            store.get_key("kid-unknown")
+
+        set_document.assert_not_called()
+
+    def test_refresh_reuses_document_fetched_by_another_worker(self, store: JWKSStore, jwks_file):
+        store.get_key("kid-1")
+        other = JWKSStore(file_path=str(jwks_file))
+        other.get_key("kid-1")
+
+        # The other worker's keys are due, but the shared copy was fetched moments ago.
+        other._expires_at = 0  # noqa: SLF001
+        with mock.patch.object(other, "_fetch") as fetch:
+            other._refresh_shared(triggered=False)  # noqa: SLF001
+
+        fetch.assert_not_called()
+
+    def test_refresh_fetches_when_shared_copy_is_stale(self, store: JWKSStore):
+        store.get_key("kid-1")
+        entry = cache.get(JWKSStore.cache_key)
+        entry["fetched_at"] -= store.ttl
+        cache.set(JWKSStore.cache_key, entry)
+        store._last_fetch_at = -store.min_refetch_interval  # noqa: SLF001
+
+        with mock.patch.object(store, "_fetch", wraps=store._fetch) as fetch:  # noqa: SLF001
+            store._refresh_shared(triggered=False)  # noqa: SLF001
+
+        fetch.assert_called_once()
+
+    def test_failed_cold_fetch_is_not_retried_per_request(self, store: JWKSStore):
+        with (
+            mock.patch.object(store, "_fetch", side_effect=OSError("down")) as fetch,
+            mock.patch.object(store, "_ensure_thread"),
+        ):
+            assert store.get_key("kid-1") is None
+            assert store.get_key("kid-1") is None
+
+        fetch.assert_called_once()
+
+    def test_refresh_is_rate_limited(self, store: JWKSStore):
+        store.get_key("kid-1")
+
+        assert store.refresh() is False
+
+
+class TestCognitoTokenValidator:
+    def test_validate(self, settings, store: JWKSStore, signing_key):
+        private_key, _ = signing_key
+        token = make_token(private_key, "kid-1", ISSUER, AUDIENCE, **{"cognito:username": "sub"})
+        validator = CognitoTokenValidator("us-east-1", "pool", AUDIENCE)
+
+        with mock.patch("django_app.integrations.cognito.authentication.get_jwks_store", return_value=store):
+            payload = validator.validate(token)
+
+        assert payload["cognito:username"] == "sub"
+
+    def test_validate_unknown_kid(self, store: JWKSStore):
+        private_key, _ = generate_rsa_key("kid-2")
+        token = make_token(private_key, "kid-2", ISSUER, AUDIENCE)
+        validator = CognitoTokenValidator("us-east-1", "pool", AUDIENCE)
+
+        with (
+            mock.patch("django_app.integrations.cognito.authentication.get_jwks_store", return_value=store),
+            mock.patch.object(store, "request_refresh"),
+            pytest.raises(TokenError),
+        ):
+            validator.validate(token)
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+
+from django_app.integrations.cognito.fake_cognito import FakeCognito
+from django_app.integrations.cognito.provider import get_cognito
+from django_app.integrations.cognito.provider import reset_cognito
+
+
+@pytest.fixture(autouse=True)
+def _reset_cognito():
+    reset_cognito()
+    yield
+    reset_cognito()
+
+
+class TestProvider:
+    def test_backend_from_settings(self, settings):
+        settings.COGNITO_BACKEND = "django_app.integrations.cognito.fake_cognito.FakeCognito"
+
+        assert isinstance(get_cognito(), FakeCognito)
+
+    def test_backend_is_built_once(self):
+        assert get_cognito() is get_cognito()
+
+    def test_backend_is_rebuilt_after_fork(self):
+        cognito = get_cognito()
+
+        with mock.patch("django_app.integrations.cognito.provider.os.getpid", return_value=os.getpid() + 1):
+            assert get_cognito() is not cognito
+
+    def test_urlconf_does_not_load_boto3(self):
+        code = (
+            "import sys, django; django.setup(); import config.urls; "
+            "from django.urls import resolve; resolve('/api/auth/sign-up/'); "
+            "print('botocore' in sys.modules)"
+        )
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings.test"},
+            text=True,
+        )
+
+        assert result.stdout.strip() == "False"
+
+
+class TestFakeCognito:
+    def test_signup_and_login(self):
+        cognito = FakeCognito()
+        sub = cognito.signup_user("john@example.com", "P@ssw0rd!")
+
+        assert cognito.get_user("john@example.com")["UserAttributes"][0]["Value"] == sub
+        assert cognito.admin_login_user("john@example.com", "P@ssw0rd!")["access_token"]
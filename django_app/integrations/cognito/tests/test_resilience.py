@@ -0,0 +1,118 @@
+import socket
+import threading
+import time
+
+import pytest
+from botocore.credentials import Credentials
+
+from django_app.core.exceptions import CognitoError
+from django_app.core.resilience import CircuitBreaker
+from django_app.core.tests.test_ratelimit import FakeClock
+from django_app.integrations.cognito import client as cognito_client
+from django_app.integrations.cognito.async_cognito import AsyncCognito
+from django_app.integrations.cognito.real_cognito import RealCognito
+
+from .stub_server import StubCognitoServer
+from .stub_server import error
+from .test_async_cognito import run
+
+FAILURE = (500, {"__type": "InternalErrorException", "message": "Cognito is down"})
+
+
+@pytest.fixture()
+def server(settings, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "key")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    # No botocore retries, every call reaches the stub once.
+    settings.COGNITO_CLIENT_MAX_ATTEMPTS = 0
+    settings.COGNITO_SINGLE_FLIGHT_ENABLED = False
+    settings.COGNITO_BREAKER_FAILURE_THRESHOLD = 2
+    settings.COGNITO_BREAKER_RESET_TIMEOUT = 30
+
+    with StubCognitoServer() as server:
+        settings.COGNITO_ENDPOINT_URL = server.url
+        cognito_client.reset_client()
+        yield server
+    cognito_client.reset_client()
+
+
+def get_user(cognito: RealCognito) -> CognitoError | None:
+    try:
+        cognito.get_user("john")
+    except CognitoError as e:
+        return e
+    return None
+
+
+class TestCircuitBreaker:
+    def test_failures_shed_calls_until_a_probe_succeeds(self, server: StubCognitoServer):
+        cognito = RealCognito()
+        cognito.breaker.clock = clock = FakeClock()
+        server.responses["AdminGetUser"] = FAILURE
+
+        assert [get_user(cognito).code for _ in range(4)] == ["INTERNAL_ERROR"] * 4
+        # The breaker opened after 2 failures, the next calls never left the process.
+        assert len(server.calls) == 2  # noqa: PLR2004
+
+        clock.now += 30
+        server.responses["AdminGetUser"] = (200, {"Username": "john"})
+        assert get_user(cognito) is None
+        assert cognito.breaker.state == CircuitBreaker.CLOSED
+        assert len(server.calls) == 3  # noqa: PLR2004
+
+    def test_rejections_are_not_failures(self, server: StubCognitoServer):
+        cognito = RealCognito()
+        server.responses["AdminCreateUser"] = error("UsernameExistsException")
+
+        for _ in range(3):
+            with pytest.raises(CognitoError):
+                cognito.create_user("john@example.com")
+
+        assert cognito.breaker.state == CircuitBreaker.CLOSED
+
+    def test_async_backend(self, server: StubCognitoServer):
+        cognito = AsyncCognito(endpoint_url=server.url, credentials=Credentials("key", "secret"))
+        server.responses["AdminGetUser"] = FAILURE
+
+        for _ in range(4):
+            with pytest.raises(CognitoError) as e:
+                run(cognito, cognito.get_user("john"))
+            assert e.value.code == "INTERNAL_ERROR"
+
+        assert len(server.calls) == 2  # noqa: PLR2004
+        assert cognito.breaker.state == CircuitBreaker.OPEN
+
+
+def test_transport_errors_are_cognito_errors(server: StubCognitoServer, settings):
+    # A port nothing listens on.
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    settings.COGNITO_ENDPOINT_URL = f"http://127.0.0.1:{port}"
+    cognito_client.reset_client()
+    cognito = RealCognito()
+
+    error = get_user(cognito)
+
+    assert error.code == "INTERNAL_ERROR"
+    assert "EndpointConnectionError" in repr(error.__cause__)
+    assert cognito.breaker._failures == 1  # noqa: SLF001
+
+
+def test_bulkhead_sheds_calls_over_the_limit(server: StubCognitoServer, settings):
+    settings.COGNITO_BULKHEAD_SIZE = 1
+    settings.COGNITO_BULKHEAD_TIMEOUT = 0
+    server.latency = 0.2
+    server.responses["AdminGetUser"] = (200, {"Username": "john"})
+    cognito = RealCognito()
+
+    slow = threading.Thread(target=get_user, args=(cognito,))
+    slow.start()
+    while not server.calls:
+        time.sleep(0.001)
+    shed = get_user(cognito)
+    slow.join()
+
+    assert shed.code == "INTERNAL_ERROR"
+    assert len(server.calls) == 1
+    assert get_user(cognito) is None
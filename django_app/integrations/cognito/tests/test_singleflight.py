@@ -0,0 +1,160 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from django_app.core.exceptions import AuthError
+from django_app.core.tests.test_ratelimit import FakeClock
+from django_app.integrations.cognito.singleflight import SingleFlight
+from django_app.integrations.cognito.singleflight import get_single_flight
+from django_app.integrations.cognito.singleflight import single_flight
+
+WAITERS = 4
+
+
+@pytest.fixture()
+def flight():
+    cache.clear()
+    yield SingleFlight(timeout=5, poll_interval=0.001)
+    cache.clear()
+
+
+class SlowCall:
+    def __init__(self, result=None, error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def run_together(flight: SingleFlight, call: SlowCall) -> list:
+    barrier = threading.Barrier(WAITERS)
+
+    def run():
+        barrier.wait(5)
+        try:
+            return flight.do("get_user:jane", call)
+        except AuthError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=WAITERS) as executor:
+        futures = [executor.submit(run) for _ in range(WAITERS)]
+        call.started.wait(5)
+        # The other threads join the call in flight before it completes.
+        threading.Timer(0.05, call.release.set).start()
+        return [future.result() for future in futures]
+
+
+class TestSingleFlight:
+    def test_threads_share_the_result(self, flight: SingleFlight):
+        call = SlowCall(result={"Username": "jane"})
+
+        results = run_together(flight, call)
+
+        assert call.calls == 1
+        assert all(result is results[0] for result in results)
+
+    def test_threads_share_the_error(self, flight: SingleFlight):
+        call = SlowCall(error=AuthError(code="INVALID_CREDENTIALS"))
+
+        results = run_together(flight, call)
+
+        assert call.calls == 1
+        assert all(result is call.error for result in results)
+
+    def test_completed_calls_are_made_again(self, flight: SingleFlight):
+        call = SlowCall(result=1)
+        call.release.set()
+
+        flight.do("key", call)
+        flight.do("key", call)
+
+        assert call.calls == 2  # noqa: PLR2004
+        assert not cache.get("cognito:flight:key")
+
+    def test_processes_share_the_result(self, flight: SingleFlight):
+        # Another process leads the call, with its own in-process state.
+        leader = SingleFlight(timeout=5)
+        call = SlowCall(result={"Username": "jane"})
+        follower_call = SlowCall()
+
+        thread = threading.Thread(target=leader.do, args=("key", call))
+        thread.start()
+        call.started.wait(5)
+        threading.Timer(0.05, call.release.set).start()
+
+        assert flight.do("key", follower_call) == {"Username": "jane"}
+        assert follower_call.calls == 0
+        thread.join()
+
+    def test_processes_share_the_error(self, flight: SingleFlight):
+        leader = SingleFlight(timeout=5)
+        call = SlowCall(error=AuthError(code="INVALID_CREDENTIALS"))
+
+        def lead():
+            with pytest.raises(AuthError):
+                leader.do("key", call)
+
+        thread = threading.Thread(target=lead)
+        thread.start()
+        call.started.wait(5)
+        threading.Timer(0.05, call.release.set).start()
+
+        with pytest.raises(AuthError) as e:
+            flight.do("key", SlowCall())
+        assert e.value.code == "INVALID_CREDENTIALS"
+        thread.join()
+
+    def test_leader_gone(self, flight: SingleFlight):
+        cache.set("cognito:flight:key", "dead-leader", timeout=5)
+        call = SlowCall(result=1)
+        call.release.set()
+        threading.Timer(0.05, cache.delete, args=("cognito:flight:key",)).start()
+
+        assert flight.do("key", call) == 1
+        assert call.calls == 1
+
+    def test_wait_is_bounded(self):
+        # The leader of another process is alive but slow.
+        cache.set("cognito:flight:key", "slow-leader", timeout=5)
+        clock = FakeClock()
+        flight = SingleFlight(timeout=10, wait=1, clock=clock, sleep=clock.sleep)
+        call = SlowCall(result=1)
+        call.release.set()
+
+        assert flight.do("key", call) == 1
+        assert call.calls == 1
+        assert clock.sleeps[:3] == [0.01, 0.02, 0.04]
+        assert max(clock.sleeps) == 0.2  # noqa: PLR2004
+        assert sum(clock.sleeps) == pytest.approx(1)
+        cache.delete("cognito:flight:key")
+
+    def test_not_shared(self, flight: SingleFlight):
+        call = SlowCall(result=1)
+        call.release.set()
+
+        with mock.patch.object(cache, "add") as add:
+            assert flight.do("key", call, shared=False) == 1
+        add.assert_not_called()
+
+
+def test_decorator_keeps_credentials_out_of_the_cache():
+    class Backend:
+        @single_flight("admin_login_user", shared=False)
+        def admin_login_user(self, username: str, password: str) -> dict:
+            return {"id_token": "token"}
+
+    with mock.patch.object(get_single_flight(), "_do_shared") as do_shared:
+        assert Backend().admin_login_user("jane@example.com", "P@ssw0rd!") == {"id_token": "token"}
+    do_shared.assert_not_called()
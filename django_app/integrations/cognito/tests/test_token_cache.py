@@ -0,0 +1,167 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+import pytest
+from django.core.cache import cache
+
+from django_app.integrations.cognito.token_cache import RefreshedTokenCache
+from django_app.integrations.cognito.token_cache import VerifiedTokenCache
+from django_app.integrations.cognito.token_cache import get_token_cache
+
+MAX_SIZE = 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def token_cache(clock):
+    cache.clear()
+    yield VerifiedTokenCache(max_size=MAX_SIZE, local_ttl=30, clock=clock)
+    cache.clear()
+
+
+def claims_for(clock, username="sub", ttl=3600):
+    return {"cognito:username": username, "iat": clock.now - 1, "exp": clock.now + ttl}
+
+
+class TestVerifiedTokenCache:
+    def test_get_miss(self, token_cache: VerifiedTokenCache):
+        assert token_cache.get("token") is None
+
+    def test_set_and_get(self, token_cache: VerifiedTokenCache, clock):
+        claims = claims_for(clock)
+        token_cache.set("token", claims)
+
+        assert token_cache.get("token") == claims
+
+    def test_shared_across_processes(self, token_cache: VerifiedTokenCache, clock):
+        claims = claims_for(clock)
+        token_cache.set("token", claims)
+
+        other = VerifiedTokenCache(clock=clock)
+        assert other.get("token") == claims
+
+    def test_expired_token_is_not_returned(self, token_cache: VerifiedTokenCache, clock):
+        token_cache.set("token", claims_for(clock, ttl=10))
+        clock.now += 11
+
+        assert token_cache.get("token") is None
+
+    def test_lru_is_bounded(self, token_cache: VerifiedTokenCache, clock):
+        for token in ("a", "b", "c"):
+            token_cache.set(token, claims_for(clock))
+
+        assert len(token_cache._entries) == MAX_SIZE  # noqa: SLF001
+
+    def test_revoke(self, token_cache: VerifiedTokenCache, clock):
+        claims = claims_for(clock)
+        token_cache.set("token", claims)
+        token_cache.revoke("token")
+
+        assert token_cache.get("token") is None
+        assert token_cache.is_revoked("token", claims)
+
+    def test_revoke_user(self, token_cache: VerifiedTokenCache, clock):
+        claims = claims_for(clock)
+        token_cache.set("token", claims)
+
+        other = VerifiedTokenCache(clock=clock)
+        other.revoke_user("sub")
+
+        # The local copy is trusted until `local_ttl` elapses.
+        clock.now += 31
+        assert token_cache.get("token") is None
+        assert token_cache.is_revoked("token", claims)
+
+    def test_revoke_user_keeps_newer_tokens(self, token_cache: VerifiedTokenCache, clock):
+        token_cache.revoke_user("sub")
+        clock.now += 5
+
+        assert not token_cache.is_revoked("token", claims_for(clock))
+
+
+class FakeRefresh:
+    def __init__(self, expires_in: int = 3600):
+        self.expires_in = expires_in
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, refresh_token: str) -> dict:
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        claims = {"cognito:username": "sub", "iat": int(time.time()), "n": self.calls}
+        return {
+            "id_token": jwt.encode(claims, "secret" * 8, algorithm="HS256"),
+            "access_token": f"access-{self.calls}",
+            "expires_in": self.expires_in,
+        }
+
+
+@pytest.fixture()
+def refreshed_cache(clock):
+    cache.clear()
+    yield RefreshedTokenCache(margin=60, clock=clock)
+    cache.clear()
+
+
+class TestRefreshedTokenCache:
+    def test_cached_until_margin(self, refreshed_cache: RefreshedTokenCache, clock):
+        refresh = FakeRefresh(expires_in=600)
+
+        first = refreshed_cache.get_or_refresh("refresh", refresh)
+        clock.now += 500
+        second = refreshed_cache.get_or_refresh("refresh", refresh)
+        clock.now += 50
+        third = refreshed_cache.get_or_refresh("refresh", refresh)
+
+        assert second["access_token"] == first["access_token"]
+        assert second["expires_in"] == 100  # noqa: PLR2004
+        assert third["access_token"] != first["access_token"]
+        assert refresh.calls == 2  # noqa: PLR2004
+
+    def test_concurrent_refreshes_make_one_call(self, refreshed_cache: RefreshedTokenCache):
+        refresh = FakeRefresh()
+        refresh.release.clear()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(refreshed_cache.get_or_refresh, "refresh", refresh) for _ in range(4)]
+            refresh.started.wait(5)
+            refresh.release.set()
+            results = [future.result() for future in futures]
+
+        assert refresh.calls == 1
+        assert all(result == results[0] for result in results)
+        assert not refreshed_cache._flights  # noqa: SLF001
+
+    def test_short_lived_tokens_are_not_cached(self, refreshed_cache: RefreshedTokenCache):
+        refresh = FakeRefresh(expires_in=30)
+
+        refreshed_cache.get_or_refresh("refresh", refresh)
+        refreshed_cache.get_or_refresh("refresh", refresh)
+
+        assert refresh.calls == 2  # noqa: PLR2004
+
+    def test_revoked_user(self, refreshed_cache: RefreshedTokenCache):
+        refresh = FakeRefresh()
+        refreshed_cache.get_or_refresh("refresh", refresh)
+
+        get_token_cache().revoke_user("sub")
+        refreshed_cache.get_or_refresh("refresh", refresh)
+
+        assert refresh.calls == 2  # noqa: PLR2004
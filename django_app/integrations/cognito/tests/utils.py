@@ -0,0 +1,32 @@
+import json
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+
+def generate_rsa_key(kid: str) -> tuple:
+    """
+    Generate a RSA private key and its public JWK
+    """
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk
+
+
+def make_token(private_key, kid: str, issuer: str, audience: str, **claims) -> str:
+    """
+    Sign an id token the way Cognito does
+    """
+    now = int(time.time())
+    payload = {
+        "iss": issuer,
+        "aud": audience,
+        "iat": now,
+        "exp": now + 3600,
+        "token_use": "id",
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
@@ -0,0 +1,313 @@
+"""Define the token caches, this file avoids re-verifying the same Cognito token and re-refreshing the same session."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import jwt
+from django.conf import settings
+from django.core.cache import caches
+
+
+class VerifiedTokenCache:
+    """
+    Cache of verified token claims keyed by the token digest
+
+    - A bounded in-process LRU answers repeated tokens without any I/O
+    - The Django cache (Redis in production) shares claims across workers
+    - Entries never outlive the token `exp` claim
+    - Local entries are kept at most `local_ttl` seconds so revocations made
+      by another worker are picked up quickly
+    - Revocations are recorded in the Django cache for every worker to see
+    """
+
+    key_prefix = "cognito:token"
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        local_ttl: int = 30,
+        cache_alias: str = "default",
+        clock=time.time,
+    ):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.cache_alias = cache_alias
+        self.clock = clock
+
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "VerifiedTokenCache":
+        """
+        Build the cache from the `COGNITO_TOKEN_CACHE_*` settings
+        """
+        return cls(
+            max_size=settings.COGNITO_TOKEN_CACHE_MAX_SIZE,
+            local_ttl=settings.COGNITO_TOKEN_CACHE_LOCAL_TTL,
+            cache_alias=settings.COGNITO_TOKEN_CACHE_ALIAS,
+        )
+
+    @staticmethod
+    def digest(token: str | bytes) -> str:
+        """
+        Get the digest used as cache key for a token
+        """
+        if isinstance(token, str):
+            token = token.encode()
+        return hashlib.sha256(token).hexdigest()
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def get(self, token: str | bytes) -> dict | None:
+        """
+        Get the verified claims of a token
+
+        Returns:
+            dict | None: The claims or None if the token has to be verified
+        """
+        digest = self.digest(token)
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                claims, expires_at = entry
+                if now < expires_at:
+                    self._entries.move_to_end(digest)
+                    return claims
+                del self._entries[digest]
+
+        claims = self.shared.get(self._key(digest))
+        if claims is None or claims.get("exp", 0) <= now or self.is_revoked(token, claims):
+            return None
+
+        self._remember(digest, claims, now)
+        return claims
+
+    def set(self, token: str | bytes, claims: dict):
+        """
+        Store the verified claims of a token until it expires
+        """
+        now = self.clock()
+        timeout = int(claims.get("exp", 0) - now)
+        if timeout <= 0:
+            return
+
+        digest = self.digest(token)
+        self.shared.set(self._key(digest), claims, timeout=timeout)
+        self._remember(digest, claims, now)
+
+    def is_revoked(self, token: str | bytes, claims: dict) -> bool:
+        """
+        Check if a token was revoked, by itself or through its user
+        """
+        keys = [self._revoked_key(self.digest(token))]
+        username = claims.get("cognito:username")
+        if username:
+            keys.append(self._user_key(username))
+
+        revoked = self.shared.get_many(keys)
+        if keys[0] in revoked:
+            return True
+        revoked_at = revoked.get(keys[-1]) if username else None
+        return revoked_at is not None and claims.get("iat", 0) <= revoked_at
+
+    def revoke(self, token: str | bytes):
+        """
+        Revoke one token, it will be rejected until it expires
+        """
+        digest = self.digest(token)
+        with self._lock:
+            self._entries.pop(digest, None)
+        self.shared.delete(self._key(digest))
+        self.shared.set(
+            self._revoked_key(digest),
+            True,  # noqa: FBT003
+            timeout=settings.COGNITO_TOKEN_CACHE_REVOCATION_TTL,
+        )
+
+    def revoke_user(self, username: str):
+        """
+        Revoke every token issued to a user until now
+        """
+        self.shared.set(
+            self._user_key(username),
+            self.clock(),
+            timeout=settings.COGNITO_TOKEN_CACHE_REVOCATION_TTL,
+        )
+        with self._lock:
+            for digest, (claims, _) in list(self._entries.items()):
+                if claims.get("cognito:username") == username:
+                    del self._entries[digest]
+
+    def clear(self):
+        """
+        Drop the in-process entries
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, digest: str, claims: dict, now: float):
+        expires_at = min(claims.get("exp", now), now + self.local_ttl)
+        with self._lock:
+            self._entries[digest] = (claims, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _key(self, digest: str) -> str:
+        return f"{self.key_prefix}:{digest}"
+
+    def _revoked_key(self, digest: str) -> str:
+        return f"{self.key_prefix}:revoked:{digest}"
+
+    def _user_key(self, username: str) -> str:
+        return f"{self.key_prefix}:revoked-user:{username}"
+
+
+class RefreshedTokenCache:
+    """
+    Cache of the id and access tokens issued for a refresh token
+
+    - The Django cache (Redis in production) shares the tokens across
+      workers until `margin` seconds before they expire
+    - Concurrent refreshes of the same refresh token in a process wait for
+      the first one and get its tokens, a device sending its refresh twice
+      makes a single Cognito call
+    - Tokens of a user revoked since they were issued are not handed out
+    """
+
+    key_prefix = "cognito:refresh"
+
+    def __init__(self, margin: int = 60, cache_alias: str = "default", clock=time.time):
+        self.margin = margin
+        self.cache_alias = cache_alias
+        self.clock = clock
+
+        # Refresh token digest -> [lock, waiters]
+        self._flights: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "RefreshedTokenCache":
+        """
+        Build the cache from the `COGNITO_REFRESH_CACHE_*` settings
+        """
+        return cls(margin=settings.COGNITO_REFRESH_CACHE_MARGIN, cache_alias=settings.COGNITO_REFRESH_CACHE_ALIAS)
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def get_or_refresh(self, refresh_token: str, refresh: Callable[[str], dict]) -> dict:
+        """
+        Get the tokens of a refresh token, from the cache or from `refresh`
+
+        Args:
+            refresh_token (str): The refresh token
+            refresh (Callable): Exchanges the refresh token, e.g. `CognitoInterface.admin_refresh_tokens`
+
+        Returns:
+            dict: `id_token`, `access_token` and their remaining validity in seconds `expires_in`
+        """
+        digest = VerifiedTokenCache.digest(refresh_token)
+        tokens = self.get(digest)
+        if tokens is not None:
+            return tokens
+
+        with self._flight(digest):
+            # The refresh this one waited for has stored its tokens.
+            tokens = self.get(digest)
+            if tokens is not None:
+                return tokens
+            tokens = refresh(refresh_token)
+            self.set(digest, tokens)
+        return tokens
+
+    def get(self, digest: str) -> dict | None:
+        """
+        Get the cached tokens of a refresh token digest, None once near expiry or revoked
+        """
+        entry = self.shared.get(self._key(digest))
+        if entry is None:
+            return None
+
+        expires_in = int(entry["expires_at"] - self.clock())
+        if expires_in <= self.margin or get_token_cache().is_revoked(entry["id_token"], entry["claims"]):
+            return None
+        return {"id_token": entry["id_token"], "access_token": entry["access_token"], "expires_in": expires_in}
+
+    def set(self, digest: str, tokens: dict):
+        """
+        Store the tokens of a refresh token digest until `margin` seconds before they expire
+        """
+        timeout = tokens["expires_in"] - self.margin
+        if timeout <= 0:
+            return
+
+        # Straight from Cognito, the claims are read for the revocation checks only.
+        claims = jwt.decode(tokens["id_token"], options={"verify_signature": False})
+        entry = {
+            "id_token": tokens["id_token"],
+            "access_token": tokens["access_token"],
+            "expires_at": self.clock() + tokens["expires_in"],
+            "claims": {name: claims[name] for name in ("cognito:username", "iat") if name in claims},
+        }
+        self.shared.set(self._key(digest), entry, timeout=timeout)
+
+    @contextmanager
+    def _flight(self, digest: str) -> Iterator[None]:
+        # One lock per refresh token in flight, dropped with its last waiter.
+        with self._lock:
+            flight = self._flights.setdefault(digest, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[digest]
+
+    def _key(self, digest: str) -> str:
+        return f"{self.key_prefix}:{digest}"
+
+
+_token_cache: VerifiedTokenCache | None = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> VerifiedTokenCache:
+    """
+    Get the verified token cache of the current process
+    """
+    global _token_cache  # noqa: PLW0603
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = VerifiedTokenCache.from_settings()
+    return _token_cache
+
+
+_refreshed_token_cache: RefreshedTokenCache | None = None
+
+
+def get_refreshed_token_cache() -> RefreshedTokenCache:
+    """
+    Get the refreshed token cache of the current process
+    """
+    global _refreshed_token_cache  # noqa: PLW0603
+    if _refreshed_token_cache is None:
+        with _token_cache_lock:
+            if _refreshed_token_cache is None:
+                _refreshed_token_cache = RefreshedTokenCache.from_settings()
+    return _refreshed_token_cache
@@ -0,0 +1,21 @@
+"""Define the Cognito URLs, this file only routes the JWKS of the in-memory backend."""
+
+from django.conf import settings
+from django.urls import path
+
+from .views import jwks
+
+FAKE_BACKEND = "django_app.integrations.cognito.fake_cognito.FakeCognito"
+
+
+def get_urlpatterns() -> list:
+    """
+    Get the Cognito routes of the configured backend
+
+    Only the fake backend (test settings, or `COGNITO_BACKEND` in local
+    development) signs its own tokens and serves their JWKS, with the real
+    backend the user pool publishes it and nothing is routed.
+    """
+    if settings.COGNITO_BACKEND != FAKE_BACKEND:
+        return []
+    return [path("cognito/.well-known/jwks.json", jwks, name="cognito-jwks")]
@@ -0,0 +1,17 @@
+from django.http import Http404
+from django.http import HttpRequest
+from django.http import JsonResponse
+
+from .provider import get_cognito
+
+
+def jwks(request: HttpRequest) -> JsonResponse:
+    """
+    Serve the JWKS of the configured backend, only backends signing
+    their own tokens (the fake backend) have one, see `urls.get_urlpatterns`
+    """
+    cognito = get_cognito()
+    if not hasattr(cognito, "jwks"):
+        raise Http404
+
+    return JsonResponse(cognito.jwks())
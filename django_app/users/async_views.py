@@ -0,0 +1,135 @@
+"""Async auth views, served without holding a worker thread while Cognito answers."""
+
+import json
+import math
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import Throttled
+
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import BaseError
+from django_app.integrations.cognito.provider import get_async_cognito
+
+from .models import SignupOutbox
+from .outbox import create_signup
+from .outbox import sign_signup_id
+from .serializers import SignupRequestSerializer
+from .serializers import SignupSerializer
+from .tasks import send_signup
+from .throttling import AuthThrottle
+
+
+def error_response(exception: BaseError) -> JsonResponse:
+    """
+    Render an error the same way `process_exception` does for DRF views
+    """
+    return JsonResponse(exception.to_dict(), status=exception.status_code)
+
+
+def validation_error_response(errors: dict) -> JsonResponse:
+    """
+    Render serializer errors the same way `process_exception` does for DRF views
+    """
+    data = {"errors": [{"field": key, "message": value} for key, value in errors.items()]}
+    return JsonResponse(data, status=status.HTTP_400_BAD_REQUEST)
+
+
+async def throttled_response(request: HttpRequest, action: str, data: dict) -> JsonResponse | None:
+    """
+    Check the request against the `AuthThrottle` buckets of the DRF action
+
+    Returns:
+        JsonResponse: 429 rendered like DRF does, None when the request is allowed
+    """
+    throttle = AuthThrottle()
+    if await sync_to_async(throttle.allow_plain_request)(request, action, data):
+        return None
+
+    wait = throttle.wait()
+    exception = Throttled(wait)
+    response = validation_error_response({"detail": exception.detail})
+    response.status_code = exception.status_code
+    if wait is not None:
+        response.headers["Retry-After"] = str(math.ceil(wait))
+    return response
+
+
+def parse_json(request: HttpRequest) -> dict:
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def write_signup(email: str, password: str, idempotency_key: str | None) -> SignupOutbox:
+    """
+    Write a signup to the outbox and queue it once committed, like `AuthViewSet.signup`
+    """
+    with transaction.atomic():
+        signup, created = create_signup(email, password, idempotency_key)
+        if created:
+            transaction.on_commit(partial(send_signup.delay, str(signup.pk)))
+    return signup
+
+
+@csrf_exempt
+@require_POST
+@transaction.non_atomic_requests
+async def signup(request: HttpRequest) -> HttpResponse:
+    """
+    The Signup API accepts a new user account, created in the background
+
+    The signup goes through the outbox like `AuthViewSet.signup`: a failure
+    after the Cognito call can not leave a Cognito user without row. Poll
+    the `Location` until the status is not pending.
+    """
+    data = parse_json(request)
+    response = await throttled_response(request, "signup", data)
+    if response is not None:
+        return response
+
+    serializer = SignupRequestSerializer(data=data)
+    if not serializer.is_valid():
+        return validation_error_response(serializer.errors)
+    email, password = serializer.data["email"], serializer.data["password"]
+
+    try:
+        signup = await sync_to_async(write_signup)(email, password, request.headers.get("Idempotency-Key"))
+    except AuthError as e:
+        return error_response(e)
+
+    location = reverse("api:auth-signup-status", kwargs={"token": sign_signup_id(signup.pk)})
+    response = JsonResponse(SignupSerializer(signup).data, status=status.HTTP_202_ACCEPTED)
+    response["Location"] = request.build_absolute_uri(location)
+    return response
+
+
+@csrf_exempt
+@require_POST
+@transaction.non_atomic_requests
+async def login(request: HttpRequest) -> JsonResponse:
+    """
+    Login user
+    Note: This API is for admin test login user only
+    """
+    data = parse_json(request)
+    response = await throttled_response(request, "login", data)
+    if response is not None:
+        return response
+
+    try:
+        tokens = await get_async_cognito().admin_login_user(data.get("email", ""), data.get("password", ""))
+    except BaseError as e:
+        return error_response(e)
+
+    return JsonResponse(tokens, status=status.HTTP_200_OK)
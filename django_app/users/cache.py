@@ -0,0 +1,53 @@
+"""Define the /users/me response cache, this file stores the serialized user per user uuid."""
+
+from django.conf import settings
+from django.core.cache import caches
+
+from django_app.core.metrics import CACHE_REQUESTS
+
+from .models import User
+from .serializers import UserSerializer
+
+CACHE_NAME = "users_me"
+
+
+def me_cache_key(user_pk) -> str:
+    """
+    Get the cache key of the serialized user, bumping `UserSerializer.cache_version`
+    ignores the entries of the previous output
+    """
+    return f"users:me:v{UserSerializer.cache_version}:{user_pk}"
+
+
+def get_me_data(user: User) -> dict | None:
+    """
+    Get the cached `UserSerializer` output of the user
+
+    Entries are dropped on save, an entry of an older version of the user
+    (stored by a request racing the save) is also treated as a miss.
+    """
+    entry = caches[settings.USERS_ME_CACHE_ALIAS].get(me_cache_key(user.pk))
+    if entry is None or entry[0] != user.modified:
+        CACHE_REQUESTS.labels(CACHE_NAME, "miss").inc()
+        return None
+
+    CACHE_REQUESTS.labels(CACHE_NAME, "hit").inc()
+    return entry[1]
+
+
+def set_me_data(user: User, data: dict):
+    """
+    Cache the `UserSerializer` output of the user
+    """
+    caches[settings.USERS_ME_CACHE_ALIAS].set(
+        me_cache_key(user.pk),
+        (user.modified, dict(data)),
+        timeout=settings.USERS_ME_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_me_data(user_pk):
+    """
+    Drop the cached `UserSerializer` output of the user
+    """
+    caches[settings.USERS_ME_CACHE_ALIAS].delete(me_cache_key(user_pk))
@@ -45,3 +45,24 @@ class Race(BaseChoiceEnum):
     WHITE = "White"
     OTHER = "Other"
     DECLINEDTOANSWER = "Declined To Answer"
+
+
+class ImportStatus(BaseChoiceEnum):
+    """
+    The enumeration of bulk user import status
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class SignupStatus(BaseChoiceEnum):
+    """
+    The enumeration of signup outbox status
+    """
+
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
@@ -0,0 +1,262 @@
+"""Define the bulk user import, this file validates uploaded rows and creates their users chunk by chunk."""
+
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.exceptions import ValidationError
+
+from django_app.core.exceptions import CognitoError
+from django_app.core.ratelimit import RateLimiter
+from django_app.integrations.cognito.cognito_interface import CognitoInterface
+from django_app.integrations.cognito.provider import get_cognito
+
+from .constants import ImportStatus
+from .models import User
+from .models import UserImport
+from .serializers import UserImportRowSerializer
+
+# Rows of a chunk task: (row number in the upload, row data)
+Chunk = list[tuple[int, dict]]
+
+
+def read_import(user_import: UserImport, rows: Iterable) -> Iterator[Chunk]:
+    """
+    Validate the rows of an upload and group the valid ones in chunks
+
+    Rows are consumed one at a time, so a streamed upload is never held
+    whole. Invalid and duplicated rows are counted as failed, the total is
+    recorded once the upload is read.
+
+    Args:
+        user_import (UserImport): The job of the upload
+        rows (Iterable): The rows, dicts of `UserImportRowSerializer` fields
+
+    Raises:
+        ValidationError: If the upload is not a list of rows or has more than `USERS_IMPORT_MAX_ROWS`
+        ParseError: If the upload is malformed
+
+    Yields:
+        Chunk: Up to `USERS_IMPORT_CHUNK_SIZE` valid rows, in their representation
+    """
+    serializer = UserImportRowSerializer()
+    seen = set()
+    chunk = []
+    total = failed = 0
+    errors = []
+    try:
+        if not isinstance(rows, Iterable) or isinstance(rows, dict | str | bytes):
+            raise ValidationError({"non_field_errors": ["Expected a list of users."]})
+
+        for number, raw_row in enumerate(rows, start=1):
+            if number > settings.USERS_IMPORT_MAX_ROWS:
+                raise ValidationError(
+                    {"non_field_errors": [f"Imports are limited to {settings.USERS_IMPORT_MAX_ROWS} users."]},
+                )
+            total = number
+
+            row = raw_row
+            if isinstance(row, dict):
+                # CSV cells are empty strings and extra cells are keyed by None.
+                row = {key: value for key, value in row.items() if key is not None and value not in ("", None)}
+            try:
+                data = serializer.run_validation(row)
+            except ValidationError as e:
+                failed += 1
+                add_error(errors, number, row.get("email") if isinstance(row, dict) else None, e.detail)
+                continue
+
+            data["email"] = User.objects.normalize_email(data["email"])
+            if data["email"].lower() in seen:
+                failed += 1
+                add_error(errors, number, data["email"], "Duplicated email.")
+                continue
+            seen.add(data["email"].lower())
+
+            chunk.append((number, serializer.to_representation(data)))
+            if len(chunk) >= settings.USERS_IMPORT_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+    except APIException as e:
+        # The valid rows not sent in a chunk yet are dropped with the upload.
+        update_progress(
+            user_import.pk,
+            total=total - len(chunk),
+            processed=failed,
+            failed=failed,
+            errors=[*errors, {"row": None, "email": None, "message": format_error(e.detail)}],
+            status=ImportStatus.FAILED,
+        )
+        raise
+
+    if chunk:
+        yield chunk
+    update_progress(user_import.pk, total=total, processed=failed, failed=failed, errors=errors)
+
+
+def import_chunk(user_import: UserImport, rows: Chunk):
+    """
+    Create the users of a chunk in Cognito then in the database, and record its progress
+
+    - Users already in the database are skipped
+    - Cognito calls run on `USERS_IMPORT_CONCURRENCY` threads, all workers
+      together make at most `USERS_IMPORT_COGNITO_RATE` calls per second
+    - A Cognito user left by an earlier attempt is adopted, so a retried chunk
+      does not fail its rows. Users that existed before the import are only
+      adopted with `adopt_existing`, otherwise their rows fail as conflicts
+    - The rows are inserted with one `bulk_create`, in the transaction recording
+      the progress: a chunk is counted once however often its task runs
+    """
+    chunk_id = rows[0][0]
+    if chunk_id in user_import.applied_chunks:
+        return
+
+    existing = set(
+        User.objects.filter(email__in=[data["email"] for _, data in rows]).values_list("email", flat=True),
+    )
+    pending = [(number, data) for number, data in rows if data["email"] not in existing]
+
+    cognito = get_cognito()
+    limiter = RateLimiter(
+        "users:import:cognito",
+        settings.USERS_IMPORT_COGNITO_RATE,
+        cache_alias=settings.USERS_IMPORT_CACHE_ALIAS,
+    )
+
+    def create(item: tuple[int, dict]) -> tuple[int, dict, str | None, str | None]:
+        number, data = item
+        return number, data, *create_cognito_user(cognito, limiter, user_import, data["email"])
+
+    results = []
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(settings.USERS_IMPORT_CONCURRENCY, len(pending))) as executor:
+            results = list(executor.map(create, pending))
+
+    users = []
+    errors = []
+    for number, data, cognito_sub, error in results:
+        if cognito_sub is None:
+            add_error(errors, number, data["email"], error or "Cognito user not found.")
+        else:
+            users.append(User(cognito_sub=cognito_sub, **data))
+
+    with transaction.atomic():
+        # Rows inserted meanwhile by a signup or another chunk are skipped by the conflict.
+        User.objects.bulk_create(users, ignore_conflicts=True)
+        created = User.objects.filter(cognito_sub__in=[user.cognito_sub for user in users]).count()
+        update_progress(
+            user_import.pk,
+            chunk=chunk_id,
+            processed=len(rows),
+            created=created,
+            skipped=len(rows) - created - len(errors),
+            failed=len(errors),
+            errors=errors,
+        )
+
+
+def create_cognito_user(cognito: CognitoInterface, limiter: RateLimiter, user_import: UserImport, email: str) -> tuple:
+    """
+    Create the Cognito user of a row, or adopt the existing one when the import may
+
+    Returns:
+        tuple: The cognito sub, or None and the error of the row
+    """
+    limiter.acquire()
+    try:
+        return cognito.create_user(email), None
+    except CognitoError as e:
+        if e.code != "USER_EXISTS":
+            return None, e.developer_message
+
+    limiter.acquire()
+    try:
+        user = cognito.get_user(email)
+    except CognitoError as e:
+        return None, e.developer_message
+    if user is None:
+        return None, None
+    if not user_import.adopt_existing and not created_by_import(user, user_import):
+        return None, "Cognito user already exists."
+    attributes = {attribute["Name"]: attribute["Value"] for attribute in user.get("UserAttributes", [])}
+    return attributes.get("sub"), None
+
+
+def created_by_import(user: dict, user_import: UserImport) -> bool:
+    """
+    Check a Cognito user was created by the import, e.g. by an earlier attempt of its chunk
+
+    Without a marker of its own, a user still waiting for its first login and
+    created after the import started can only come from the import.
+    """
+    created = user.get("UserCreateDate")
+    return user.get("UserStatus") == "FORCE_CHANGE_PASSWORD" and created is not None and created >= user_import.created
+
+
+def update_progress(  # noqa: PLR0913
+    import_id,
+    *,
+    chunk: int | None = None,
+    total: int | None = None,
+    processed: int = 0,
+    created: int = 0,
+    skipped: int = 0,
+    failed: int = 0,
+    errors: Iterable[dict] = (),
+    status: ImportStatus | None = None,
+):
+    """
+    Add the progress of a chunk to an import job
+
+    The row is locked, so chunks finishing together do not lose counts, and
+    the progress of a `chunk` (its first row number) already recorded is ignored.
+    The job is completed once the total is known and every row is processed.
+    """
+    with transaction.atomic():
+        user_import = UserImport.objects.select_for_update().get(pk=import_id)
+        if chunk is not None:
+            if chunk in user_import.applied_chunks:
+                return
+            user_import.applied_chunks = [*user_import.applied_chunks, chunk]
+        if total is not None:
+            user_import.total = total
+        user_import.processed += processed
+        user_import.created_count += created
+        user_import.skipped_count += skipped
+        user_import.failed_count += failed
+        user_import.errors = [*user_import.errors, *errors][: settings.USERS_IMPORT_MAX_ERRORS]
+
+        if status is not None:
+            user_import.status = status.value
+        elif user_import.status != ImportStatus.FAILED.value:
+            done = user_import.total is not None and user_import.processed >= user_import.total
+            user_import.status = ImportStatus.COMPLETED.value if done else ImportStatus.RUNNING.value
+        if user_import.status in {ImportStatus.COMPLETED.value, ImportStatus.FAILED.value}:
+            user_import.finished_at = user_import.finished_at or timezone.now()
+        user_import.save()
+
+
+def add_error(errors: list[dict], row: int, email: str | None, detail):
+    """
+    Record the error of a row, up to `USERS_IMPORT_MAX_ERRORS`
+    """
+    if len(errors) < settings.USERS_IMPORT_MAX_ERRORS:
+        errors.append({"row": row, "email": email, "message": format_error(detail)})
+
+
+def format_error(detail) -> str:
+    """
+    Flatten the detail of a DRF error to one message
+    """
+    if isinstance(detail, dict):
+        return "; ".join(
+            f"{format_error(messages)}" if field == "non_field_errors" else f"{field}: {format_error(messages)}"
+            for field, messages in detail.items()
+        )
+    if isinstance(detail, list | tuple):
+        return " ".join(format_error(message) for message in detail)
+    return str(detail)
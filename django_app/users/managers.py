@@ -1,23 +1,181 @@
+from collections.abc import Iterable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import islice
 from typing import TYPE_CHECKING
 from typing import Any
 
+from django.conf import settings
 from django.contrib.auth.models import UserManager as DjangoUserManager
+from django.core.cache import caches
+from django.db import NotSupportedError
+from django.db import connections
+from django.db.models.constants import OnConflict
 
 from django_app.core.exceptions import UnauthorizedError
 
 if TYPE_CHECKING:
-    from .models import User  # noqa: F401
+    from .models import User
+
+
+@dataclass(frozen=True)
+class UpsertResult:
+    """
+    Rows written by `UserManager.bulk_upsert`
+    """
+
+    created: int = 0
+    updated: int = 0
 
 
 class UserManager(DjangoUserManager["User"]):
     """Custom manager for the User model."""
 
+    # Bump when the cached row layout changes so stale entries are ignored.
+    cognito_cache_version = 1
+
+    # Unique columns `bulk_upsert` can match existing users on
+    upsert_unique_fields = ("cognito_sub", "email")
+
     def get_or_create_for_cognito(self, payload: dict[str, Any]):  # typing: ignore
         """
         Get user with cognito id
+
+        The user row is read through the cache shared by all workers,
+        entries are dropped by the `User` signals on save and delete.
         """
         cognito_id: str = payload["cognito:username"]
+        cache = caches[settings.COGNITO_USER_CACHE_ALIAS]
+        cache_key = self.cognito_cache_key(cognito_id)
+
+        row = cache.get(cache_key)
+        if row is not None:
+            return self._from_cached_row(row)
+
         try:
-            return self.get(cognito_sub=cognito_id)
+            user = self.get(cognito_sub=cognito_id)
         except self.model.DoesNotExist as e:
             raise UnauthorizedError(code="INVALID_CREDENTIALS") from e
+
+        cache.set(cache_key, self._to_cached_row(user), timeout=settings.COGNITO_USER_CACHE_TIMEOUT)
+        return user
+
+    def bulk_upsert(
+        self,
+        users: Iterable["User"],
+        *,
+        update_fields: Sequence[str],
+        unique_field: str = "cognito_sub",
+        batch_size: int | None = None,
+    ) -> UpsertResult:
+        """
+        Insert users, or update the existing users with the same `unique_field`
+
+        One `INSERT ... ON CONFLICT (<unique_field>) DO UPDATE ... RETURNING`
+        statement per batch, the returned primary keys tell the inserted rows
+        (the uuid of the instance) from the updated ones (the uuid of the row).
+
+        - `modified` is always updated, `save()` and the signals are bypassed
+        - Each batch is committed on its own outside of a transaction, an
+          interrupted upsert can be run again
+        - Within a batch, the last user of a key wins
+
+        Args:
+            users (Iterable): Unsaved `User` instances, consumed one batch at a time
+            update_fields (Sequence): Fields written to the existing users
+            unique_field (str): `cognito_sub` or `email`
+            batch_size (int, optional): Rows per statement, `USERS_BULK_UPSERT_BATCH_SIZE` by default
+
+        Raises:
+            ValueError: If a field can not be upserted on
+            NotSupportedError: If the database has no `ON CONFLICT ... RETURNING`
+
+        Returns:
+            UpsertResult: The number of created and updated users
+        """
+        opts = self.model._meta  # noqa: SLF001
+        if unique_field not in self.upsert_unique_fields:
+            msg = f"bulk_upsert matches users on one of {', '.join(self.upsert_unique_fields)}, not {unique_field}."
+            raise ValueError(msg)
+        update_fields = list(dict.fromkeys([*update_fields, "modified"]))
+        if {unique_field, opts.pk.name, "created"} & set(update_fields):
+            msg = f"bulk_upsert can not update {unique_field}, {opts.pk.name} or created."
+            raise ValueError(msg)
+
+        connection = connections[self.db]
+        if not (
+            connection.features.supports_update_conflicts_with_target
+            and connection.features.can_return_rows_from_bulk_insert
+        ):
+            msg = f"bulk_upsert is not supported on {connection.vendor}."
+            raise NotSupportedError(msg)
+
+        fields = [field for field in opts.concrete_fields if not field.generated]
+        returning_fields = [opts.pk, opts.get_field("cognito_sub"), opts.get_field("is_active")]
+        batch_size = batch_size or settings.USERS_BULK_UPSERT_BATCH_SIZE
+        # SQLite caps the parameters of a statement.
+        batch_size = min(batch_size, connection.ops.bulk_batch_size(fields, range(batch_size)))
+
+        created = updated = 0
+        users = iter(users)
+        while batch := list(islice(users, batch_size)):
+            # ON CONFLICT DO UPDATE can not touch a row twice in one statement.
+            batch = list({getattr(user, unique_field): user for user in batch}.values())
+            for user in batch:
+                if user.pk is None:
+                    user.pk = opts.pk.get_default()
+
+            rows = self.get_queryset()._insert(  # noqa: SLF001
+                batch,
+                fields=fields,
+                returning_fields=returning_fields,
+                on_conflict=OnConflict.UPDATE,
+                update_fields=[opts.get_field(name) for name in update_fields],
+                unique_fields=[opts.get_field(unique_field)],
+            )
+            inserted = {user.pk for user in batch}
+            updated_rows = [row for row in rows if row[0] not in inserted]
+            created += len(rows) - len(updated_rows)
+            updated += len(updated_rows)
+            self._invalidate_upserted(updated_rows)
+
+        return UpsertResult(created=created, updated=updated)
+
+    def _invalidate_upserted(self, rows: list[tuple]):
+        """
+        Do the work of the `User` signals for rows updated by `bulk_upsert`
+        """
+        from django_app.integrations.cognito.token_cache import get_token_cache
+
+        from .cache import me_cache_key
+
+        if not rows:
+            return
+        caches[settings.COGNITO_USER_CACHE_ALIAS].delete_many(
+            [self.cognito_cache_key(cognito_sub) for _, cognito_sub, _ in rows],
+        )
+        caches[settings.USERS_ME_CACHE_ALIAS].delete_many([me_cache_key(pk) for pk, _, _ in rows])
+
+        token_cache = get_token_cache()
+        for _, cognito_sub, is_active in rows:
+            if not is_active:
+                token_cache.revoke_user(str(cognito_sub))
+
+    def cognito_cache_key(self, cognito_id) -> str:
+        """
+        Get the cache key of the user row for a cognito id
+        """
+        return f"users:cognito:v{self.cognito_cache_version}:{str(cognito_id).lower()}"
+
+    def invalidate_cognito_cache(self, cognito_id):
+        """
+        Drop the cached user row for a cognito id
+        """
+        caches[settings.COGNITO_USER_CACHE_ALIAS].delete(self.cognito_cache_key(cognito_id))
+
+    def _to_cached_row(self, user) -> tuple:
+        return tuple(getattr(user, field.attname) for field in self.model._meta.concrete_fields)  # noqa: SLF001
+
+    def _from_cached_row(self, row: tuple):
+        field_names = [field.attname for field in self.model._meta.concrete_fields]  # noqa: SLF001
+        return self.model.from_db(self.db, field_names, row)
@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name="user",
+                    constraint=models.UniqueConstraint(fields=("cognito_sub",), name="users_user_cognito_sub_uniq"),
+                ),
+            ],
+            database_operations=[
+                # Build the index without locking writes on the users table.
+                migrations.RunSQL(
+                    sql=(
+                        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS users_user_cognito_sub_uniq "
+                        "ON users_user (cognito_sub);"
+                    ),
+                    reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS users_user_cognito_sub_uniq;",
+                ),
+                # Promote the index to a constraint, this only updates the catalog.
+                migrations.RunSQL(
+                    sql=(
+                        "ALTER TABLE users_user ADD CONSTRAINT users_user_cognito_sub_uniq "
+                        "UNIQUE USING INDEX users_user_cognito_sub_uniq;"
+                    ),
+                    reverse_sql="ALTER TABLE users_user DROP CONSTRAINT IF EXISTS users_user_cognito_sub_uniq;",
+                ),
+            ],
+        ),
+    ]
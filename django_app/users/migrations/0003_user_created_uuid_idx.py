@@ -0,0 +1,19 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("users", "0002_user_cognito_sub_uniq"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="user",
+            index=models.Index(fields=["created", "uuid"], name="users_user_created_uuid_idx"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("users", "0003_user_created_uuid_idx"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="user",
+            index=models.Index(fields=["country", "state", "created"], name="users_user_country_state_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="user",
+            index=models.Index(fields=["gender", "race", "created"], name="users_user_gender_race_idx"),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0.8 on 2026-10-18 13:42
+
+import uuid
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0004_user_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserImport",
+            fields=[
+                (
+                    "created",
+                    django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name="created"),
+                ),
+                (
+                    "modified",
+                    django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name="modified"),
+                ),
+                ("uuid", models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False, unique=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "PENDING"),
+                            ("running", "RUNNING"),
+                            ("completed", "COMPLETED"),
+                            ("failed", "FAILED"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "total",
+                    models.PositiveIntegerField(help_text="Number of rows, set once the upload is read", null=True),
+                ),
+                ("processed", models.PositiveIntegerField(default=0)),
+                ("created_count", models.PositiveIntegerField(default=0)),
+                ("skipped_count", models.PositiveIntegerField(default=0, help_text="Rows of users who already exist")),
+                ("failed_count", models.PositiveIntegerField(default=0)),
+                (
+                    "errors",
+                    models.JSONField(default=list, help_text="First errors by row, up to USERS_IMPORT_MAX_ERRORS"),
+                ),
+                ("finished_at", models.DateTimeField(null=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        help_text="User who uploaded the import",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.0.8 on 2026-10-18 13:52
+
+import uuid
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0006_reconcile_cognito_users_schedule"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SignupOutbox",
+            fields=[
+                (
+                    "created",
+                    django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name="created"),
+                ),
+                (
+                    "modified",
+                    django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name="modified"),
+                ),
+                ("uuid", models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False, unique=True)),
+                ("email", models.EmailField(max_length=254)),
+                (
+                    "password",
+                    models.TextField(blank=True, help_text="Encrypted password, cleared once the signup is done"),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(
+                        help_text="Idempotency-Key header of the signup request",
+                        max_length=255,
+                        null=True,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "PENDING"), ("completed", "COMPLETED"), ("failed", "FAILED")],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "claimed_until",
+                    models.DateTimeField(help_text="A worker is sending the signup until then", null=True),
+                ),
+                ("cognito_sub", models.UUIDField(help_text="Set once the Cognito user is created", null=True)),
+                ("error_code", models.CharField(blank=True, max_length=50)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "pending")),
+                        fields=["created"],
+                        name="users_signupoutbox_pending_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="signupoutbox",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "pending")),
+                fields=("email",),
+                name="users_signupoutbox_pending_email_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:19
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0008_relay_signups_schedule"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="signupoutbox",
+            name="idempotency_key",
+            field=models.CharField(
+                help_text="Idempotency-Key header of the signup request, unique per email",
+                max_length=255,
+                null=True,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="signupoutbox",
+            constraint=models.UniqueConstraint(
+                fields=("email", "idempotency_key"),
+                name="users_signupoutbox_email_idempotency_key_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:44
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0009_signupoutbox_email_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userimport",
+            name="adopt_existing",
+            field=models.BooleanField(
+                default=False,
+                help_text="Link the rows to Cognito users that existed before the import",
+            ),
+        ),
+        migrations.AddField(
+            model_name="userimport",
+            name="applied_chunks",
+            field=models.JSONField(
+                default=list,
+                help_text="First row number of the chunks whose progress is recorded",
+            ),
+        ),
+    ]
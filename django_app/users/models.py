@@ -1,6 +1,7 @@
 from typing import ClassVar
 
 from core.models import AbstractBaseModel
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
@@ -8,7 +9,9 @@ from django.urls import reverse
 
 from .constants import AssignedSex
 from .constants import Gender
+from .constants import ImportStatus
 from .constants import Race
+from .constants import SignupStatus
 from .managers import UserManager
 
 
@@ -103,6 +106,19 @@ class User(AbstractUser, AbstractBaseModel):
 
     objects: ClassVar[UserManager] = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Lookup key of every JWT authenticated request.
+            models.UniqueConstraint(fields=["cognito_sub"], name="users_user_cognito_sub_uniq"),
+        ]
+        indexes = [
+            # Keyset of the cursor paginated user list.
+            models.Index(fields=["created", "uuid"], name="users_user_created_uuid_idx"),
+            # Filters of the user list, `created` last to serve the list order.
+            models.Index(fields=["country", "state", "created"], name="users_user_country_state_idx"),
+            models.Index(fields=["gender", "race", "created"], name="users_user_gender_race_idx"),
+        ]
+
     def get_absolute_url(self) -> str:
         """Get URL for user's detail view.
 
@@ -118,3 +134,110 @@ class User(AbstractUser, AbstractBaseModel):
         Get full name of the user
         """
         return f"{self.first_name} {self.last_name}".strip()
+
+
+class UserImport(AbstractBaseModel):
+    """
+    Bulk user import job, its progress is updated by the chunk tasks
+    """
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        help_text="User who uploaded the import",
+    )
+    status = models.CharField(
+        choices=ImportStatus.choices(),
+        default=ImportStatus.PENDING.value,
+        max_length=20,
+    )
+    total = models.PositiveIntegerField(
+        null=True,
+        help_text="Number of rows, set once the upload is read",
+    )
+    processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Rows of users who already exist",
+    )
+    failed_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(
+        default=list,
+        help_text="First errors by row, up to USERS_IMPORT_MAX_ERRORS",
+    )
+    adopt_existing = models.BooleanField(
+        default=False,
+        help_text="Link the rows to Cognito users that existed before the import",
+    )
+    applied_chunks = models.JSONField(
+        default=list,
+        help_text="First row number of the chunks whose progress is recorded",
+    )
+    finished_at = models.DateTimeField(null=True)
+
+
+class SignupOutbox(AbstractBaseModel):
+    """
+    Signup written by the signup request, sent to Cognito by a worker
+
+    The uuid is the id clients poll and the idempotency key of the worker.
+    """
+
+    email = models.EmailField()
+    password = models.TextField(
+        blank=True,
+        help_text="Encrypted password, cleared once the signup is done",
+    )
+    # NULL rather than "" for signups without key, the unique index ignores NULLs.
+    idempotency_key = models.CharField(  # noqa: DJ001
+        max_length=255,
+        null=True,
+        help_text="Idempotency-Key header of the signup request, unique per email",
+    )
+    status = models.CharField(
+        choices=SignupStatus.choices(),
+        default=SignupStatus.PENDING.value,
+        max_length=20,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    claimed_until = models.DateTimeField(
+        null=True,
+        help_text="A worker is sending the signup until then",
+    )
+    cognito_sub = models.UUIDField(
+        null=True,
+        help_text="Set once the Cognito user is created",
+    )
+    user = models.OneToOneField(
+        User,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    error_code = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        constraints = [
+            # One signup in flight per email.
+            models.UniqueConstraint(
+                fields=["email"],
+                condition=models.Q(status=SignupStatus.PENDING.value),
+                name="users_signupoutbox_pending_email_uniq",
+            ),
+            # Idempotency keys are scoped to the email, another client may use the same key.
+            models.UniqueConstraint(
+                fields=["email", "idempotency_key"],
+                name="users_signupoutbox_email_idempotency_key_uniq",
+            ),
+        ]
+        indexes = [
+            # Pending signups swept by the relay task.
+            models.Index(
+                fields=["created"],
+                condition=models.Q(status=SignupStatus.PENDING.value),
+                name="users_signupoutbox_pending_idx",
+            ),
+        ]
@@ -0,0 +1,229 @@
+"""Define the signup outbox, this file sends the signups written by the requests to Cognito."""
+
+import base64
+import hashlib
+import logging
+from datetime import timedelta
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
+from django.utils import timezone
+
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import CognitoError
+from django_app.integrations.cognito.provider import get_cognito
+
+from .constants import SignupStatus
+from .models import SignupOutbox
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+def get_fernet() -> Fernet:
+    """
+    Get the cipher of the outbox passwords, keyed by `SIGNUP_OUTBOX_ENCRYPTION_KEY` or the secret key
+    """
+    key = settings.SIGNUP_OUTBOX_ENCRYPTION_KEY
+    if not key:
+        key = base64.urlsafe_b64encode(hashlib.sha256(f"signup-outbox:{settings.SECRET_KEY}".encode()).digest())
+    return Fernet(key)
+
+
+def sign_signup_id(signup_id) -> str:
+    """
+    Sign a signup id into the token of its status URL, only the client who made the signup knows it
+    """
+    return signing.Signer(salt="users.signup").sign(str(signup_id))
+
+
+def unsign_signup_id(token: str) -> str | None:
+    """
+    Get the signup id of a status URL token, None when it was not signed by `sign_signup_id`
+    """
+    try:
+        return signing.Signer(salt="users.signup").unsign(token)
+    except signing.BadSignature:
+        return None
+
+
+def create_signup(email: str, password: str, idempotency_key: str | None = None) -> tuple[SignupOutbox, bool]:
+    """
+    Write a signup to the outbox
+
+    A request repeated with the same idempotency key and email gets the signup
+    of the first one, keys are scoped to the email.
+
+    Raises:
+        AuthError: USER_EXISTS if a user or a pending signup has the email
+
+    Returns:
+        tuple: The signup and whether it was created, a created signup is
+            to be sent once the transaction commits
+    """
+    if idempotency_key:
+        signup = SignupOutbox.objects.filter(email=email, idempotency_key=idempotency_key).first()
+        if signup is not None:
+            return signup, False
+
+    if User.objects.filter(email=email).exists():
+        raise AuthError(code="USER_EXISTS")
+
+    try:
+        with transaction.atomic():
+            signup = SignupOutbox.objects.create(
+                email=email,
+                password=get_fernet().encrypt(password.encode()).decode(),
+                idempotency_key=idempotency_key or None,
+            )
+    except IntegrityError as e:
+        # A concurrent request with the same idempotency key, or another signup of the email.
+        signup = (
+            SignupOutbox.objects.filter(email=email, idempotency_key=idempotency_key).first()
+            if idempotency_key
+            else None
+        )
+        if signup is None:
+            raise AuthError(code="USER_EXISTS") from e
+        return signup, False
+    return signup, True
+
+
+def claim_signup(signup_id) -> SignupOutbox | None:
+    """
+    Lease a pending signup to the current worker for `SIGNUP_OUTBOX_LEASE` seconds
+
+    Returns:
+        SignupOutbox: The signup, None when it is done or leased by another worker
+    """
+    now = timezone.now()
+    claimed = (
+        SignupOutbox.objects.filter(pk=signup_id, status=SignupStatus.PENDING.value)
+        .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+        .update(claimed_until=now + timedelta(seconds=settings.SIGNUP_OUTBOX_LEASE), attempts=F("attempts") + 1)
+    )
+    return SignupOutbox.objects.get(pk=signup_id) if claimed else None
+
+
+def send_signup(signup_id) -> str | None:
+    """
+    Create the Cognito user of a signup, then its user row
+
+    Every step can be run again: the Cognito sub is saved once the user is
+    created, and a user created by an attempt that failed before saving it
+    (e.g. a timeout) is adopted by the next attempt, rather than rejected as
+    an existing user, see `create_cognito_user`.
+
+    Raises:
+        CognitoError: INTERNAL_ERROR, the lease is released for a retry
+
+    Returns:
+        str: The status of the signup, None when another worker has it or it is done
+    """
+    signup = claim_signup(signup_id)
+    if signup is None:
+        return None
+
+    cognito = get_cognito()
+    password = get_fernet().decrypt(signup.password.encode()).decode()
+    try:
+        if signup.cognito_sub is None:
+            signup.cognito_sub = create_cognito_user(signup, password)
+            SignupOutbox.objects.filter(pk=signup.pk).update(cognito_sub=signup.cognito_sub)
+        cognito.set_user_password(signup.email, password)
+    except CognitoError as e:
+        if e.code == "INTERNAL_ERROR":
+            SignupOutbox.objects.filter(pk=signup.pk).update(claimed_until=None)
+            raise
+        return fail_signup(signup, e.code)
+
+    try:
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(cognito_sub=signup.cognito_sub, defaults={"email": signup.email})
+            SignupOutbox.objects.filter(pk=signup.pk).update(
+                status=SignupStatus.COMPLETED.value,
+                user=user,
+                password="",
+                claimed_until=None,
+                error_code="",
+            )
+    except IntegrityError:
+        # Another user got the email meanwhile, e.g. from a bulk import.
+        return fail_signup(signup, "USER_EXISTS")
+    return SignupStatus.COMPLETED.value
+
+
+def create_cognito_user(signup: SignupOutbox, password: str) -> str:
+    """
+    Create the Cognito user of a signup, or adopt the one an earlier attempt created
+
+    The user is created with the signup id in `COGNITO_SIGNUP_ID_ATTRIBUTE`, only
+    a user holding it is adopted: any other existing user, e.g. one of a bulk
+    import waiting for its first login, belongs to someone else.
+
+    Raises:
+        CognitoError: USER_EXISTS if the user was not created by this signup
+    """
+    cognito = get_cognito()
+    marker = settings.COGNITO_SIGNUP_ID_ATTRIBUTE
+    try:
+        return cognito.create_user(signup.email, password, {marker: str(signup.pk)} if marker else None)
+    except CognitoError as e:
+        if e.code != "USER_EXISTS" or signup.attempts <= 1 or not marker:
+            raise
+
+        user = cognito.get_user(signup.email) or {}
+        attributes = {attribute["Name"]: attribute["Value"] for attribute in user.get("UserAttributes", [])}
+        if user.get("UserStatus") != "FORCE_CHANGE_PASSWORD" or attributes.get(marker) != str(signup.pk):
+            raise
+        return attributes["sub"]
+
+
+def fail_signup(signup: SignupOutbox, error_code: str) -> str:
+    """
+    Mark a signup failed, its password is dropped
+    """
+    logger.warning("Signup %s of %s failed: %s.", signup.pk, signup.email, error_code)
+    SignupOutbox.objects.filter(pk=signup.pk).update(
+        status=SignupStatus.FAILED.value,
+        password="",
+        claimed_until=None,
+        error_code=error_code,
+    )
+    return SignupStatus.FAILED.value
+
+
+def relay_signups() -> list[str]:
+    """
+    Find the pending signups whose task was lost or gave up
+
+    Signups pending for more than `SIGNUP_OUTBOX_RELAY_DELAY` seconds and not
+    leased are returned to be sent again, those past `SIGNUP_OUTBOX_MAX_ATTEMPTS`
+    are failed.
+
+    Returns:
+        list: The ids of the signups to send
+    """
+    now = timezone.now()
+    signups = (
+        SignupOutbox.objects.filter(
+            status=SignupStatus.PENDING.value,
+            created__lt=now - timedelta(seconds=settings.SIGNUP_OUTBOX_RELAY_DELAY),
+        )
+        .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+        .order_by("created")
+        .values_list("pk", "attempts")[: settings.SIGNUP_OUTBOX_RELAY_BATCH_SIZE]
+    )
+
+    signup_ids = []
+    for pk, attempts in signups:
+        if attempts >= settings.SIGNUP_OUTBOX_MAX_ATTEMPTS:
+            fail_signup(SignupOutbox.objects.get(pk=pk), "INTERNAL_ERROR")
+        else:
+            signup_ids.append(str(pk))
+    return signup_ids
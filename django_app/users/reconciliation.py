@@ -0,0 +1,187 @@
+"""Define the Cognito reconciliation, this file diffs the Cognito users with the user rows and repairs the drift."""
+
+import heapq
+import logging
+import tempfile
+from collections import Counter
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import ExitStack
+from itertools import islice
+from typing import IO
+
+import orjson
+from django.conf import settings
+
+from django_app.integrations.cognito.cognito_interface import CognitoInterface
+from django_app.integrations.cognito.provider import get_cognito
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+# (cognito sub, email, active), ordered by the sub as text like the DB orders the uuid column
+Account = tuple[str, str, bool]
+
+
+def iter_cognito_accounts(cognito: CognitoInterface) -> Iterator[Account]:
+    """
+    Iterate the users of the pool as accounts, in the order of `ListUsers`
+    """
+    for user in cognito.iter_users():
+        attributes = {attribute["Name"]: attribute["Value"] for attribute in user.get("Attributes", [])}
+        yield attributes["sub"].lower(), attributes.get("email", user["Username"]), user.get("Enabled", True)
+
+
+def iter_db_accounts(chunk_size: int) -> Iterator[Account]:
+    """
+    Iterate the user rows as accounts, ordered by the `cognito_sub` unique index
+    """
+    rows = User.objects.order_by("cognito_sub").values_list("cognito_sub", "email", "is_active")
+    for cognito_sub, email, is_active in rows.iterator(chunk_size=chunk_size):
+        yield str(cognito_sub), email, is_active
+
+
+def external_sort(accounts: Iterable[Account], chunk_size: int, stack: ExitStack) -> Iterator[Account]:
+    """
+    Sort accounts holding at most `chunk_size` of them in memory
+
+    The accounts are cut in sorted runs spilled to temporary files, the
+    runs are merged lazily. The files are closed with `stack`.
+    """
+    runs = []
+    accounts = iter(accounts)
+    while chunk := sorted(islice(accounts, chunk_size)):
+        run = stack.enter_context(tempfile.TemporaryFile())
+        run.writelines(orjson.dumps(account) + b"\n" for account in chunk)
+        run.seek(0)
+        runs.append(run)
+    return heapq.merge(*(_read_run(run) for run in runs))
+
+
+def _read_run(run: IO[bytes]) -> Iterator[Account]:
+    for line in run:
+        yield tuple(orjson.loads(line))
+
+
+def diff_accounts(
+    cognito_accounts: Iterable[Account],
+    db_accounts: Iterable[Account],
+) -> Iterator[tuple[Account | None, Account | None]]:
+    """
+    Merge-join two sorted account streams on the sub
+
+    Yields:
+        tuple: (cognito account, database account) of every sub whose
+            accounts differ, None for the side missing the sub
+    """
+    cognito_accounts, db_accounts = iter(cognito_accounts), iter(db_accounts)
+    cognito_account, db_account = next(cognito_accounts, None), next(db_accounts, None)
+    while cognito_account is not None or db_account is not None:
+        if db_account is None or (cognito_account is not None and cognito_account[0] < db_account[0]):
+            yield cognito_account, None
+            cognito_account = next(cognito_accounts, None)
+        elif cognito_account is None or db_account[0] < cognito_account[0]:
+            yield None, db_account
+            db_account = next(db_accounts, None)
+        else:
+            if cognito_account != db_account:
+                yield cognito_account, db_account
+            cognito_account, db_account = next(cognito_accounts, None), next(db_accounts, None)
+
+
+def reconcile_users(*, repair: bool = True, chunk_size: int | None = None) -> dict:
+    """
+    Diff the Cognito users with the user rows and repair the drift
+
+    Both sides are streamed: Cognito users are paged with `ListUsers` and
+    sorted in spilled runs, the rows are read in order of the `cognito_sub`
+    index. The drift is:
+
+    - `missing_in_db`: a Cognito user without row, e.g. a signup failing
+      after the Cognito call; the row is created
+    - `changed`: an email or enabled flag differing from Cognito, the
+      source of truth; the row is updated
+    - `missing_in_cognito`: a row without Cognito user, only reported since
+      the row may hold data to keep
+    - `conflicts`: a repair blocked by another row holding the email, reported
+
+    Repairs are spilled to a file during the scan and applied afterwards with
+    `UserManager.bulk_upsert`, so the rows being read are not the rows being written.
+
+    Args:
+        repair (bool): Write the repairs, else only report the drift
+        chunk_size (int, optional): Accounts held in memory, `COGNITO_RECONCILE_CHUNK_SIZE` by default
+
+    Returns:
+        dict: The number of accounts and of discrepancies by kind
+    """
+    chunk_size = chunk_size or settings.COGNITO_RECONCILE_CHUNK_SIZE
+    counts = Counter(cognito_users=0, db_users=0, missing_in_db=0, changed=0, missing_in_cognito=0)
+
+    def count(accounts: Iterable[Account], name: str) -> Iterator[Account]:
+        for account in accounts:
+            counts[name] += 1
+            yield account
+
+    with ExitStack() as stack:
+        repairs = stack.enter_context(tempfile.TemporaryFile())
+        cognito_accounts = external_sort(
+            count(iter_cognito_accounts(get_cognito()), "cognito_users"),
+            chunk_size,
+            stack,
+        )
+        for cognito_account, db_account in diff_accounts(
+            cognito_accounts,
+            count(iter_db_accounts(chunk_size), "db_users"),
+        ):
+            if cognito_account is None:
+                counts["missing_in_cognito"] += 1
+                logger.warning("User %s (%s) has no Cognito user.", db_account[1], db_account[0])
+                continue
+
+            kind = "missing_in_db" if db_account is None else "changed"
+            counts[kind] += 1
+            logger.warning("Cognito user %s (%s) drifted: %s.", cognito_account[1], cognito_account[0], kind)
+            repairs.write(orjson.dumps(cognito_account) + b"\n")
+
+        if repair:
+            repairs.seek(0)
+            counts.update(apply_repairs(_read_run(repairs), chunk_size))
+
+    logger.info("Reconciled Cognito users: %s", dict(counts))
+    return dict(counts)
+
+
+def apply_repairs(accounts: Iterable[Account], chunk_size: int) -> Counter:
+    """
+    Write the Cognito accounts to the user rows, by chunk
+
+    Returns:
+        Counter: `created` and `updated` rows, `conflicts` of accounts whose
+            email belongs to another row
+    """
+    counts = Counter(created=0, updated=0, conflicts=0)
+    accounts = iter(accounts)
+    while chunk := list(islice(accounts, chunk_size)):
+        taken = set(
+            User.objects.filter(email__in=[email for _, email, _ in chunk])
+            .exclude(cognito_sub__in=[cognito_sub for cognito_sub, _, _ in chunk])
+            .values_list("email", flat=True),
+        )
+        for cognito_sub, email, _ in chunk:
+            if email in taken:
+                counts["conflicts"] += 1
+                logger.warning("Cognito user %s (%s) not repaired, another user has the email.", email, cognito_sub)
+
+        result = User.objects.bulk_upsert(
+            (
+                User(cognito_sub=cognito_sub, email=email, is_active=is_active)
+                for cognito_sub, email, is_active in chunk
+                if email not in taken
+            ),
+            update_fields=["email", "is_active"],
+        )
+        counts["created"] += result.created
+        counts["updated"] += result.updated
+    return counts
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 
+from django_app.core.serializers import SparseFieldsetSerializerMixin
+from django_app.users.models import SignupOutbox
 from django_app.users.models import User
+from django_app.users.models import UserImport
 
 from .validators import PasswordValidator
 
@@ -10,7 +13,73 @@ class SignupRequestSerializer(serializers.Serializer):
     password = serializers.CharField(validators=[PasswordValidator()])
 
 
-class UserSerializer(serializers.ModelSerializer[User]):
+class RefreshRequestSerializer(serializers.Serializer):
+    refresh_token = serializers.CharField()
+
+
+class UserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer[User]):
+    # Bump when the output changes, cached /users/me responses are keyed by it.
+    cache_version = 1
+
     class Meta:
         model = User
         fields = ["email", "cognito_sub"]
+
+
+class UserImportRowSerializer(serializers.ModelSerializer[User]):
+    """
+    One row of a bulk user import
+    """
+
+    class Meta:
+        model = User
+        fields = [
+            "email",
+            "first_name",
+            "last_name",
+            "dob",
+            "street_line_1",
+            "street_line_2",
+            "city",
+            "state",
+            "postal_code",
+            "country",
+            "phone_country_code",
+            "phone_number",
+            "gender",
+            "assigned_sex",
+            "race",
+        ]
+        # Existing users are skipped by the import, not rejected row by row.
+        extra_kwargs = {"email": {"validators": []}}
+
+
+class UserImportRequestSerializer(serializers.Serializer):
+    # Query parameters of an upload
+    adopt_existing = serializers.BooleanField(default=False)
+
+
+class UserImportSerializer(serializers.ModelSerializer[UserImport]):
+    class Meta:
+        model = UserImport
+        fields = [
+            "uuid",
+            "status",
+            "total",
+            "processed",
+            "created_count",
+            "skipped_count",
+            "failed_count",
+            "errors",
+            "adopt_existing",
+            "created",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class SignupSerializer(serializers.ModelSerializer[SignupOutbox]):
+    class Meta:
+        model = SignupOutbox
+        fields = ["uuid", "status", "error_code", "created"]
+        read_only_fields = fields
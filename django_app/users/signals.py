@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from django_app.integrations.cognito.token_cache import get_token_cache
+
+from .cache import invalidate_me_data
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_of_inactive_user(sender, instance: User, **kwargs):
+    """
+    Revoke the cached tokens of a deactivated user
+    """
+    if not instance.is_active and instance.cognito_sub:
+        get_token_cache().revoke_user(str(instance.cognito_sub))
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_of_deleted_user(sender, instance: User, **kwargs):
+    """
+    Revoke the cached tokens of a deleted user
+    """
+    if instance.cognito_sub:
+        get_token_cache().revoke_user(str(instance.cognito_sub))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cognito_user_cache(sender, instance: User, **kwargs):
+    """
+    Drop the cached row used by the Cognito authentication
+    """
+    if instance.cognito_sub:
+        User.objects.invalidate_cognito_cache(instance.cognito_sub)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_me_cache(sender, instance: User, **kwargs):
+    """
+    Drop the cached /users/me response
+    """
+    invalidate_me_data(instance.pk)
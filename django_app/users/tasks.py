@@ -1,9 +1,76 @@
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
 
+from django_app.core.exceptions import CognitoError
+
+from . import outbox
+from .imports import import_chunk
 from .models import User
+from .models import UserImport
+from .reconciliation import reconcile_users
 
 
 @shared_task()
 def get_users_count():
     """A pointless Celery task to demonstrate usage."""
     return User.objects.count()
+
+
+# Safe to run again: a chunk is recorded once and Cognito users of a previous attempt adopted.
+@shared_task(acks_late=True, autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=3)
+def import_users_chunk(import_id: str, rows: list):
+    """
+    Import a chunk of a bulk user import, see `django_app/users/imports.py`
+    """
+    # The (row number, data) pairs of the chunk arrive as JSON lists.
+    import_chunk(UserImport.objects.get(pk=import_id), rows)
+
+
+@shared_task(
+    soft_time_limit=settings.COGNITO_RECONCILE_TIME_LIMIT,
+    time_limit=settings.COGNITO_RECONCILE_TIME_LIMIT + 60,
+)
+def reconcile_cognito_users(repair: bool = True):  # noqa: FBT001, FBT002
+    """
+    Diff the Cognito users with the user rows, see `django_app/users/reconciliation.py`
+
+    Scheduled by the `django_celery_beat` periodic task of the users migrations,
+    a run starting while another one is in progress is skipped.
+    """
+    cache = caches[settings.COGNITO_RECONCILE_CACHE_ALIAS]
+    lock_key = "users:reconcile:lock"
+    if not cache.add(lock_key, 1, timeout=settings.COGNITO_RECONCILE_TIME_LIMIT + 60):
+        return None
+    try:
+        return reconcile_users(repair=repair)
+    finally:
+        cache.delete(lock_key)
+
+
+@shared_task(
+    acks_late=True,
+    autoretry_for=(CognitoError, DatabaseError),
+    retry_backoff=True,
+    retry_backoff_max=5 * 60,
+    max_retries=settings.SIGNUP_OUTBOX_MAX_ATTEMPTS,
+)
+def send_signup(signup_id: str):
+    """
+    Send a signup of the outbox to Cognito, see `django_app/users/outbox.py`
+    """
+    return outbox.send_signup(signup_id)
+
+
+@shared_task()
+def relay_signups():
+    """
+    Send again the signups whose task was lost or gave up
+
+    Scheduled every minute by the `django_celery_beat` periodic task of the users migrations.
+    """
+    signup_ids = outbox.relay_signups()
+    for signup_id in signup_ids:
+        send_signup.delay(signup_id)
+    return len(signup_ids)
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from django_app.integrations.cognito.provider import get_cognito
+from django_app.integrations.cognito.provider import reset_cognito
+from django_app.integrations.cognito.tests.stub_server import StubCognitoServer
+from django_app.users.constants import SignupStatus
+from django_app.users.models import SignupOutbox
+from django_app.users.models import User
+
+SUB = "9a8e6a4c-3a53-4c38-9d41-1d7c8e5f6f10"
+PASSWORD = "P@ssw0rd!"  # noqa: S105
+
+
+@pytest.fixture()
+def stub_server(settings, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "key")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    reset_cognito()
+
+    with StubCognitoServer() as server:
+        settings.COGNITO_ENDPOINT_URL = server.url
+        yield server
+
+    reset_cognito()
+
+
+@pytest.mark.django_db()
+class TestAsyncSignup:
+    @pytest.fixture(autouse=True)
+    def _eager_tasks(self, settings):
+        settings.CELERY_TASK_ALWAYS_EAGER = True
+        reset_cognito()
+        yield
+        reset_cognito()
+
+    def signup(self, client, password: str = PASSWORD):
+        return client.post(
+            reverse("api:auth-async-sign-up"),
+            {"email": "john@example.com", "password": password},
+            content_type="application/json",
+        )
+
+    def test_signup_goes_through_the_outbox(self, client, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.signup(client)
+
+        assert response.status_code == HTTPStatus.ACCEPTED
+        assert client.get(response.headers["Location"]).json()["status"] == SignupStatus.COMPLETED.value
+        user = User.objects.get(email="john@example.com")
+        assert str(user.cognito_sub) == get_cognito().get_user_sub("john@example.com")
+
+    def test_signup_user_exists(self, client):
+        User.objects.create(email="john@example.com", cognito_sub=SUB)
+
+        response = self.signup(client)
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()["errors"]["code"] == "ERR_AUTH_USER_EXISTS"
+        assert not SignupOutbox.objects.exists()
+
+    def test_signup_invalid_password(self, client):
+        response = self.signup(client, "short")
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()["errors"][0]["field"] == "password"
+        assert not SignupOutbox.objects.exists()
+
+
+class TestAsyncLogin:
+    def test_login(self, client, stub_server: StubCognitoServer):
+        stub_server.responses["AdminInitiateAuth"] = (
+            200,
+            {"AuthenticationResult": {"IdToken": "id", "AccessToken": "access", "RefreshToken": "refresh"}},
+        )
+
+        response = client.post(
+            reverse("api:auth-async-login"),
+            {"email": "john@example.com", "password": PASSWORD},
+            content_type="application/json",
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {"id_token": "id", "access_token": "access", "refresh_token": "refresh"}
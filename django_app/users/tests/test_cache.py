@@ -0,0 +1,64 @@
+import uuid
+
+import pytest
+from django.core.cache import cache
+from prometheus_client import REGISTRY
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+
+from django_app.users.cache import get_me_data
+from django_app.users.cache import me_cache_key
+from django_app.users.models import User
+from django_app.users.views import UserViewSet
+
+
+def cache_requests(result: str) -> float:
+    return REGISTRY.get_sample_value("django_app_cache_requests_total", {"cache": "users_me", "result": result}) or 0
+
+
+@pytest.mark.django_db()
+class TestMeCache:
+    @pytest.fixture()
+    def user(self) -> User:
+        cache.clear()
+        yield User.objects.create(cognito_sub=uuid.uuid4(), email="john@example.com")
+        cache.clear()
+
+    def me(self, user: User, **params):
+        request = APIRequestFactory().get("/api/users/me/", params)
+        force_authenticate(request, user)
+        return UserViewSet.as_view({"get": "me"})(request)
+
+    def test_hit(self, user: User):
+        hits, misses = cache_requests("hit"), cache_requests("miss")
+
+        first = self.me(user)
+        second = self.me(user)
+
+        assert second.data == first.data == {"email": user.email, "cognito_sub": str(user.cognito_sub)}
+        assert cache_requests("miss") == misses + 1
+        assert cache_requests("hit") == hits + 1
+
+    def test_fields_are_read_from_cache(self, user: User):
+        self.me(user)
+        hits = cache_requests("hit")
+
+        assert self.me(user, fields="email").data == {"email": user.email}
+        assert cache_requests("hit") == hits + 1
+
+    def test_invalidated_on_save(self, user: User):
+        self.me(user)
+        user.email = "jane@example.com"
+        user.save()
+
+        assert cache.get(me_cache_key(user.pk)) is None
+        assert self.me(user).data["email"] == "jane@example.com"
+
+    def test_entry_of_older_version_is_a_miss(self, user: User):
+        self.me(user)
+        stale = User.objects.get(pk=user.pk)
+        user.save()
+        # A request racing the save stores the previous version.
+        cache.set(me_cache_key(user.pk), (stale.modified, {"email": "stale@example.com"}))
+
+        assert get_me_data(user) is None
@@ -1,7 +1,29 @@
+import datetime
+import uuid
+from unittest import mock
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
 import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.permissions import BasePermission
+from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
 
+from django_app.core.filters import IndexedFilterBackend
+from django_app.core.filters import get_filters
+from django_app.core.pagination import CursorPagination
+from django_app.core.serializers import SparseFieldsetSerializerMixin
+from django_app.core.serializers import get_values_field_map
+from django_app.users.constants import Gender
 from django_app.users.models import User
+from django_app.users.serializers import UserSerializer
 from django_app.users.views import UserViewSet
 
 
@@ -32,3 +54,380 @@ class TestUserViewSet:
             "url": f"http://testserver/api/users/{user.pk}/",
             "name": user.name,
         }
+
+
+@pytest.mark.django_db()
+class TestUserViewSetList:
+    @pytest.fixture()
+    def users(self) -> list[User]:
+        return [User.objects.create(cognito_sub=uuid.uuid4(), email=f"user{i}@example.com") for i in range(5)]
+
+    def list_users(self, user: User, **params):
+        request = APIRequestFactory().get("/api/users/", params)
+        force_authenticate(request, user)
+        return UserViewSet.as_view({"get": "list"})(request)
+
+    def test_list_is_paginated(self, users: list[User]):
+        response = self.list_users(users[0], page_size=2)
+
+        assert [row["email"] for row in response.data["results"]] == ["user4@example.com", "user3@example.com"]
+        assert response.data["next"]
+        assert response.data["previous"] is None
+
+    def test_list_follows_cursor(self, users: list[User]):
+        emails = []
+        params = {"page_size": 2}
+        while True:
+            response = self.list_users(users[0], **params)
+            emails += [row["email"] for row in response.data["results"]]
+            if not response.data["next"]:
+                break
+            params = dict(parse_qsl(urlsplit(response.data["next"]).query))
+
+        assert emails == [user.email for user in reversed(users)]
+
+    def test_page_size_is_bounded(self, users: list[User]):
+        with mock.patch.object(CursorPagination, "max_page_size", 3):
+            response = self.list_users(users[0], page_size=100)
+
+        assert len(response.data["results"]) == 3  # noqa: PLR2004
+
+    def test_page_query_count(self, users: list[User], django_assert_num_queries):
+        with django_assert_num_queries(1):
+            self.list_users(users[0], page_size=2)
+
+
+def uses_index(queryset) -> bool:
+    """
+    Check the query plan of the queryset reads an index rather than scanning the table
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            # Small test tables are cheaper to scan, force the planner to consider the indexes.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        return "Seq Scan" not in plan
+
+    plan = queryset.explain()
+    return "USING INDEX" in plan or "USING COVERING INDEX" in plan
+
+
+@pytest.mark.django_db()
+class TestUserViewSetFilter:
+    @pytest.fixture()
+    def users(self) -> list[User]:
+        return [
+            User.objects.create(cognito_sub=uuid.uuid4(), email="john@example.com", country="US", state="CA"),
+            User.objects.create(cognito_sub=uuid.uuid4(), email="jane@example.com", country="US", state="NY"),
+            User.objects.create(
+                cognito_sub=uuid.uuid4(),
+                email="paul@example.com",
+                country="FR",
+                gender=Gender.CISMALE.value,
+            ),
+        ]
+
+    def list_users(self, user: User, **params):
+        request = APIRequestFactory().get("/api/users/", params)
+        force_authenticate(request, user)
+        with CaptureQueriesContext(connection) as context:
+            response = UserViewSet.as_view({"get": "list"})(request)
+        return response, context
+
+    def emails(self, response) -> set[str]:
+        return {row["email"] for row in response.data["results"]}
+
+    @pytest.mark.parametrize(
+        ("params", "expected"),
+        [
+            ({"email": "john@example.com"}, {"john@example.com"}),
+            ({"email__startswith": "ja"}, {"jane@example.com"}),
+            ({"country": "US"}, {"john@example.com", "jane@example.com"}),
+            ({"country": "US", "state": "NY"}, {"jane@example.com"}),
+            ({"gender": Gender.CISMALE.value}, {"paul@example.com"}),
+            ({"gender__in": f"{Gender.CISMALE.value},{Gender.CISFEMALE.value}"}, {"paul@example.com"}),
+            ({"created__gte": "2000-01-01T00:00:00Z", "state": "CA"}, {"john@example.com"}),
+        ],
+    )
+    def test_filter(self, users: list[User], params: dict, expected: set[str]):
+        response, context = self.list_users(users[0], **params)
+
+        assert self.emails(response) == expected
+        assert len(context.captured_queries) == 1
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            pytest.param(
+                {"email__startswith": "ja"},
+                marks=pytest.mark.skipif(connection.vendor != "postgresql", reason="SQLite LIKE does not use indexes"),
+            ),
+            {"country": "US", "state": "NY"},
+            {"gender": Gender.CISMALE.value},
+            {"created__gte": "2000-01-01T00:00:00Z"},
+        ],
+    )
+    def test_filter_uses_index(self, users: list[User], params: dict):
+        queryset = IndexedFilterBackend().filter_queryset(
+            Request(APIRequestFactory().get("/api/users/", params)),
+            User.objects.all(),
+            UserViewSet(),
+        )
+
+        assert uses_index(queryset)
+
+    def test_unindexed_combination_is_rejected(self, users: list[User]):
+        response, context = self.list_users(users[0], state="CA")
+
+        assert response.status_code == 400  # noqa: PLR2004
+        assert response.data["errors"]["code"] == "ERR_FILTER_UNINDEXED_FILTER"
+        assert context.captured_queries == []
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"created__gte": "yesterday"}, {"gender": "male"}, {"race__in": "none,other,invalid"}],
+    )
+    def test_invalid_value(self, users: list[User], params: dict):
+        response, _ = self.list_users(users[0], **params)
+
+        assert response.status_code == 400  # noqa: PLR2004
+        assert response.data["errors"][0]["field"] == next(iter(params))
+
+    def test_unindexed_field_is_improperly_configured(self):
+        view_class = type("View", (UserViewSet,), {"filterset_fields": {"city": ["exact"]}})
+
+        with pytest.raises(ImproperlyConfigured):
+            get_filters(view_class)
+
+    def test_pattern_lookup_needs_own_index(self):
+        view_class = type("View", (UserViewSet,), {"filterset_fields": {"state": ["startswith"]}})
+
+        with pytest.raises(ImproperlyConfigured):
+            get_filters(view_class)
+
+
+@pytest.mark.django_db()
+class TestUserViewSetFields:
+    @pytest.fixture()
+    def user(self) -> User:
+        return User.objects.create(cognito_sub=uuid.uuid4(), email="john@example.com", street_line_1="1 Main St")
+
+    def call(self, user: User, action: str, path: str = "/api/users/", **params):
+        request = APIRequestFactory().get(path, params)
+        force_authenticate(request, user)
+        kwargs = {"pk": user.pk} if action == "retrieve" else {}
+        with CaptureQueriesContext(connection) as context:
+            response = UserViewSet.as_view({"get": action})(request, **kwargs)
+        return response, context
+
+    def test_serializer_fields(self, user: User):
+        assert UserSerializer(user, fields=["email"]).data == {"email": "john@example.com"}
+
+    def test_list_selects_serializer_columns(self, user: User):
+        response, context = self.call(user, "list")
+
+        assert response.data["results"] == [{"email": user.email, "cognito_sub": str(user.cognito_sub)}]
+        assert "street_line_1" not in context.captured_queries[0]["sql"]
+
+    def test_list_fields(self, user: User):
+        response, context = self.call(user, "list", fields="email")
+
+        assert response.data["results"] == [{"email": user.email}]
+        assert "cognito_sub" not in context.captured_queries[0]["sql"]
+        assert len(context.captured_queries) == 1
+
+    def test_retrieve_fields(self, user: User):
+        response, context = self.call(user, "retrieve", path=f"/api/users/{user.pk}/", fields="cognito_sub")
+
+        assert response.data == {"cognito_sub": str(user.cognito_sub)}
+        assert '"email"' not in context.captured_queries[0]["sql"]
+
+    def test_me_fields(self, user: User):
+        response, _ = self.call(user, "me", path="/api/users/me/", fields="email")
+
+        assert response.data == {"email": user.email}
+
+    def test_unknown_field(self, user: User):
+        response, context = self.call(user, "list", fields="email,password")
+
+        assert response.status_code == 400  # noqa: PLR2004
+        assert response.data["errors"][0]["field"] == "fields"
+        assert context.captured_queries == []
+
+
+class WideUserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = [
+            "uuid",
+            "email",
+            "cognito_sub",
+            "created",
+            "last_login",
+            "dob",
+            "first_name",
+            "is_active",
+            "gender",
+            "phone_number",
+        ]
+
+
+@pytest.mark.django_db()
+class TestUserViewSetValuesList:
+    @pytest.fixture()
+    def users(self) -> list[User]:
+        return [
+            User.objects.create(
+                cognito_sub=uuid.uuid4(),
+                email=f"user{i}@example.com",
+                dob=datetime.date(1990, 1, i + 1),
+                first_name="John",
+                last_login=timezone.now() if i % 2 else None,
+            )
+            for i in range(3)
+        ]
+
+    def list_users(self, user: User, *, list_from_values: bool, **params):
+        request = APIRequestFactory().get("/api/users/", params)
+        force_authenticate(request, user)
+        view = UserViewSet.as_view(
+            {"get": "list"},
+            serializer_class=WideUserSerializer,
+            list_from_values=list_from_values,
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = view(request)
+        return response, context
+
+    @pytest.mark.parametrize("params", [{}, {"page_size": 2}, {"fields": "email,created,dob"}, {"country": "US"}])
+    def test_same_output_as_serializer(self, users: list[User], params: dict):
+        expected, _ = self.list_users(users[0], list_from_values=False, **params)
+        response, context = self.list_users(users[0], list_from_values=True, **params)
+
+        assert response.data == expected.data
+        assert len(context.captured_queries) == 1
+
+    def test_empty_fields(self, users: list[User]):
+        expected, _ = self.list_users(users[0], list_from_values=True)
+        response, _ = self.list_users(users[0], list_from_values=True, fields=",")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response.data == expected.data
+
+    def test_same_output_in_current_timezone(self, users: list[User]):
+        with timezone.override("Asia/Tokyo"):
+            expected, _ = self.list_users(users[0], list_from_values=False)
+            response, _ = self.list_users(users[0], list_from_values=True)
+
+        assert response.data == expected.data
+        assert response.data["results"][0]["created"].endswith("+09:00")
+
+    def test_next_page(self, users: list[User]):
+        first, _ = self.list_users(users[0], list_from_values=True, page_size=2)
+        cursor = dict(parse_qsl(urlsplit(first.data["next"]).query))["cursor"]
+        response, _ = self.list_users(users[0], list_from_values=True, page_size=2, cursor=cursor)
+
+        assert [row["email"] for row in response.data["results"]] == ["user0@example.com"]
+
+    def test_property_field_falls_back_to_serializer(self):
+        class Serializer(serializers.ModelSerializer):
+            full_name = serializers.CharField(source="full_name_value")
+
+            class Meta:
+                model = User
+                fields = ["email", "full_name"]
+
+        assert get_values_field_map(Serializer) is None
+
+
+@pytest.mark.django_db()
+class TestUserViewSetConditional:
+    @pytest.fixture()
+    def user(self) -> User:
+        return User.objects.create(cognito_sub=uuid.uuid4(), email="john@example.com")
+
+    def call(self, user: User, action: str, headers: dict | None = None, query: dict | None = None, **initkwargs):
+        request = APIRequestFactory().get(f"/api/users/{user.pk}/", query, headers=headers)
+        force_authenticate(request, user)
+        kwargs = {"pk": user.pk} if action == "retrieve" else {}
+        with CaptureQueriesContext(connection) as context:
+            response = UserViewSet.as_view({"get": action}, **initkwargs)(request, **kwargs)
+        return response, context
+
+    @pytest.mark.parametrize("action", ["retrieve", "me"])
+    def test_validators(self, user: User, action: str):
+        response, _ = self.call(user, action)
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response["ETag"]
+        assert response["Last-Modified"] == http_date(int(user.modified.timestamp()))
+
+    def test_retrieve_not_modified(self, user: User):
+        etag = self.call(user, "retrieve")[0]["ETag"]
+        response, context = self.call(user, "retrieve", {"If-None-Match": etag})
+
+        assert response.status_code == 304  # noqa: PLR2004
+        assert response["ETag"] == etag
+        # Only the validators are read.
+        assert len(context.captured_queries) == 1
+        assert '"email"' not in context.captured_queries[0]["sql"]
+
+    def test_retrieve_reads_validators_with_the_row(self, user: User):
+        response, context = self.call(user, "retrieve", query={"fields": "email"})
+
+        assert response.status_code == 200  # noqa: PLR2004
+        # The validators query and the row, `modified` is not deferred.
+        assert len(context.captured_queries) == 2  # noqa: PLR2004
+
+    def test_retrieve_invalid_pk(self, user: User):
+        request = APIRequestFactory().get("/api/users/not-a-uuid/")
+        force_authenticate(request, user)
+        response = UserViewSet.as_view({"get": "retrieve"})(request, pk="not-a-uuid")
+
+        assert response.status_code == 404  # noqa: PLR2004
+
+    def test_retrieve_if_modified_since(self, user: User):
+        last_modified = self.call(user, "retrieve")[0]["Last-Modified"]
+        response, _ = self.call(user, "retrieve", {"If-Modified-Since": last_modified})
+
+        assert response.status_code == 304  # noqa: PLR2004
+
+    def test_retrieve_modified(self, user: User):
+        etag = self.call(user, "retrieve")[0]["ETag"]
+        user.first_name = "John"
+        user.save()
+        response, _ = self.call(user, "retrieve", {"If-None-Match": etag})
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response["ETag"] != etag
+
+    @pytest.mark.parametrize("action", ["retrieve", "me"])
+    def test_sparse_fieldset_etag(self, user: User, action: str):
+        full = self.call(user, action)[0]["ETag"]
+        sparse = self.call(user, action, query={"fields": "email"})[0]["ETag"]
+
+        assert sparse != full
+        response, _ = self.call(user, action, {"If-None-Match": full}, query={"fields": "email"})
+        assert response.status_code == 200  # noqa: PLR2004
+        response, _ = self.call(user, action, {"If-None-Match": sparse})
+        assert response.status_code == 200  # noqa: PLR2004
+        # The field set is normalized.
+        response, _ = self.call(user, action, {"If-None-Match": sparse}, query={"fields": "email,email"})
+        assert response.status_code == 304  # noqa: PLR2004
+
+    def test_me_not_modified(self, user: User):
+        etag = self.call(user, "me")[0]["ETag"]
+        response, context = self.call(user, "me", {"If-None-Match": etag})
+
+        assert response.status_code == 304  # noqa: PLR2004
+        assert context.captured_queries == []
+
+    def test_object_permissions_are_checked(self, user: User):
+        class DenyObject(BasePermission):
+            def has_object_permission(self, request, view, obj):
+                return False
+
+        etag = self.call(user, "retrieve")[0]["ETag"]
+        response, _ = self.call(user, "retrieve", {"If-None-Match": etag}, permission_classes=[DenyObject])
+
+        assert response.status_code == 403  # noqa: PLR2004
@@ -0,0 +1,168 @@
+import uuid
+from unittest import mock
+
+import orjson
+import pytest
+from django.db import DatabaseError
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from django_app.integrations.cognito.provider import get_cognito
+from django_app.integrations.cognito.provider import reset_cognito
+from django_app.users.constants import ImportStatus
+from django_app.users.imports import import_chunk
+from django_app.users.models import User
+from django_app.users.models import UserImport
+from django_app.users.tasks import import_users_chunk
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _eager_tasks(settings):
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    settings.USERS_IMPORT_COGNITO_RATE = 0
+    reset_cognito()
+    yield
+    reset_cognito()
+
+
+@pytest.fixture()
+def client() -> APIClient:
+    admin = User.objects.create(cognito_sub=uuid.uuid4(), email="admin@example.com", is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def upload(client: APIClient, body: bytes, content_type: str, query: str = ""):
+    return client.post(reverse("api:user-import-list") + query, data=body, content_type=content_type)
+
+
+class TestUserImport:
+    def test_csv(self, client: APIClient):
+        body = b"email,first_name,gender\njane@example.com,Jane,cisFemale\njohn@example.com,,\nnot-an-email,,\n"
+
+        response = upload(client, body, "text/csv")
+
+        assert response.status_code == 202  # noqa: PLR2004
+        assert response.data["status"] == ImportStatus.COMPLETED.value
+        assert response.data["total"] == 3  # noqa: PLR2004
+        assert response.data["created_count"] == 2  # noqa: PLR2004
+        assert response.data["failed_count"] == 1
+        assert response.data["errors"] == [{"row": 3, "email": "not-an-email", "message": mock.ANY}]
+        assert response.headers["Location"].endswith(f"/api/user-imports/{response.data['uuid']}/")
+
+        jane = User.objects.get(email="jane@example.com")
+        assert (jane.first_name, jane.gender) == ("Jane", "cisFemale")
+        assert str(jane.cognito_sub) == get_cognito().get_user_sub("jane@example.com")
+
+    def test_ndjson_skips_existing_users(self, client: APIClient):
+        User.objects.create(cognito_sub=uuid.uuid4(), email="jane@example.com")
+        body = b'{"email": "jane@example.com"}\n\n{"email": "john@example.com"}\n{"email": "john@example.com"}\n'
+
+        response = upload(client, body, "application/x-ndjson")
+
+        assert response.data["status"] == ImportStatus.COMPLETED.value
+        assert (response.data["created_count"], response.data["skipped_count"]) == (1, 1)
+        assert response.data["errors"] == [{"row": 3, "email": "john@example.com", "message": "Duplicated email."}]
+
+    def test_existing_cognito_user_is_a_conflict(self, client: APIClient):
+        get_cognito().create_user("jane@example.com")
+
+        response = upload(client, orjson.dumps([{"email": "jane@example.com"}]), "application/json")
+
+        assert (response.data["created_count"], response.data["failed_count"]) == (0, 1)
+        assert response.data["errors"] == [
+            {"row": 1, "email": "jane@example.com", "message": "Cognito user already exists."},
+        ]
+        assert not User.objects.filter(email="jane@example.com").exists()
+
+    def test_json_adopts_existing_cognito_user(self, client: APIClient):
+        cognito_sub = get_cognito().create_user("jane@example.com")
+
+        response = upload(
+            client,
+            orjson.dumps([{"email": "jane@example.com"}]),
+            "application/json",
+            query="?adopt_existing=true",
+        )
+
+        assert response.data["adopt_existing"] is True
+        assert response.data["created_count"] == 1
+        assert str(User.objects.get(email="jane@example.com").cognito_sub) == cognito_sub
+
+    def test_rows_are_sent_in_chunks(self, client: APIClient, settings):
+        settings.USERS_IMPORT_CHUNK_SIZE = 2
+        body = b"".join(orjson.dumps({"email": f"user{i}@example.com"}) + b"\n" for i in range(5))
+
+        with mock.patch.object(import_users_chunk, "delay", wraps=import_users_chunk.delay) as delay:
+            response = upload(client, body, "application/x-ndjson")
+
+        assert [len(call.args[1]) for call in delay.call_args_list] == [2, 2, 1]
+        assert response.data["created_count"] == 5  # noqa: PLR2004
+
+    def test_chunk_is_counted_once(self):
+        user_import = UserImport.objects.create(total=1)
+        rows = [(1, {"email": "jane@example.com"})]
+
+        import_users_chunk(str(user_import.pk), rows)
+        import_users_chunk(str(user_import.pk), rows)
+
+        user_import.refresh_from_db()
+        assert (user_import.processed, user_import.created_count, user_import.skipped_count) == (1, 1, 0)
+        assert user_import.status == ImportStatus.COMPLETED.value
+
+    def test_retry_after_progress_failure(self):
+        user_import = UserImport.objects.create(total=1)
+        rows = [(1, {"email": "jane@example.com"})]
+
+        with (
+            mock.patch("django_app.users.imports.update_progress", side_effect=DatabaseError),
+            pytest.raises(DatabaseError),
+        ):
+            import_chunk(user_import, rows)
+        import_chunk(user_import, rows)
+
+        user_import.refresh_from_db()
+        assert (user_import.created_count, user_import.skipped_count, user_import.failed_count) == (1, 0, 0)
+        # The Cognito user of the first attempt was adopted.
+        assert str(User.objects.get(email="jane@example.com").cognito_sub) == get_cognito().get_user_sub(
+            "jane@example.com",
+        )
+
+    def test_retrieve(self, client: APIClient):
+        user_import = UserImport.objects.create(total=10, processed=4)
+
+        response = client.get(reverse("api:user-import-detail", kwargs={"pk": user_import.pk}))
+
+        assert (response.data["status"], response.data["processed"]) == (ImportStatus.PENDING.value, 4)
+
+
+# Error responses roll back the request transaction, a test transaction could not be used after them.
+@pytest.mark.django_db(transaction=True)
+class TestUserImportErrors:
+    def test_too_many_rows(self, client: APIClient, settings):
+        settings.USERS_IMPORT_MAX_ROWS = 1
+
+        response = upload(client, b'{"email": "a@example.com"}\n{"email": "b@example.com"}\n', "application/x-ndjson")
+
+        assert response.status_code == 400  # noqa: PLR2004
+        user_import = UserImport.objects.get()
+        assert user_import.status == ImportStatus.FAILED.value
+        assert user_import.finished_at is not None
+
+    def test_malformed_upload(self, client: APIClient):
+        response = upload(client, b'{"email": "a@example.com"}\n{"email"\n', "application/x-ndjson")
+
+        assert response.status_code == 400  # noqa: PLR2004
+        assert UserImport.objects.get().status == ImportStatus.FAILED.value
+
+    def test_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(cognito_sub=uuid.uuid4(), email="jane@example.com"))
+
+        response = upload(client, b"email\njohn@example.com\n", "text/csv")
+
+        assert response.status_code == 403  # noqa: PLR2004
+        assert not UserImport.objects.exists()
@@ -1,8 +1,14 @@
+import uuid
 from io import StringIO
 
 import pytest
+from django.core.cache import cache
 from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from django_app.core.exceptions import UnauthorizedError
+from django_app.users.managers import UpsertResult
 from django_app.users.models import User
 
 
@@ -53,3 +59,137 @@ def test_createsuperuser_command():
     assert out.getvalue() == "Superuser created successfully.\n"
     user = User.objects.get(email="henry@example.com")
     assert not user.has_usable_password()
+
+
+@pytest.mark.django_db()
+class TestGetOrCreateForCognito:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture()
+    def cognito_user(self) -> User:
+        return User.objects.create(email="cognito@example.com", cognito_sub=uuid.uuid4())
+
+    def test_reads_through_cache(self, cognito_user: User, django_assert_num_queries):
+        payload = {"cognito:username": str(cognito_user.cognito_sub)}
+
+        with django_assert_num_queries(1):
+            User.objects.get_or_create_for_cognito(payload)
+
+        with django_assert_num_queries(0):
+            user = User.objects.get_or_create_for_cognito(payload)
+
+        assert user == cognito_user
+        assert user.email == cognito_user.email
+        assert not user._state.adding  # noqa: SLF001
+
+    def test_save_invalidates_cache(self, cognito_user: User):
+        payload = {"cognito:username": str(cognito_user.cognito_sub)}
+        User.objects.get_or_create_for_cognito(payload)
+
+        cognito_user.first_name = "Jane"
+        cognito_user.save()
+
+        assert User.objects.get_or_create_for_cognito(payload).first_name == "Jane"
+
+    def test_delete_invalidates_cache(self, cognito_user: User):
+        payload = {"cognito:username": str(cognito_user.cognito_sub)}
+        User.objects.get_or_create_for_cognito(payload)
+
+        cognito_user.delete()
+
+        with pytest.raises(UnauthorizedError):
+            User.objects.get_or_create_for_cognito(payload)
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="EXPLAIN output is PostgreSQL specific")
+    def test_lookup_uses_cognito_sub_index(self, cognito_user: User):
+        payload = {"cognito:username": str(cognito_user.cognito_sub)}
+
+        with CaptureQueriesContext(connection) as context:
+            User.objects.get_or_create_for_cognito(payload)
+
+        with connection.cursor() as cursor:
+            # Small test tables are cheaper to scan, force the planner to consider the index only.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {context.captured_queries[0]['sql']}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        assert "users_user_cognito_sub_uniq" in plan
+
+
+@pytest.mark.django_db()
+class TestBulkUpsert:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_creates_and_updates(self):
+        existing = User.objects.create(email="jane@example.com", cognito_sub=uuid.uuid4(), first_name="Jane")
+        modified = existing.modified
+        users = [
+            User(email="jane@example.com", cognito_sub=existing.cognito_sub, first_name="Janet"),
+            User(email="john@example.com", cognito_sub=uuid.uuid4(), first_name="John"),
+        ]
+
+        result = User.objects.bulk_upsert(users, update_fields=["email", "first_name"])
+
+        assert result == UpsertResult(created=1, updated=1)
+        existing.refresh_from_db()
+        assert existing.first_name == "Janet"
+        assert existing.modified > modified
+        assert User.objects.get(email="john@example.com").first_name == "John"
+
+    def test_keyed_on_email(self):
+        existing = User.objects.create(email="jane@example.com", cognito_sub=uuid.uuid4())
+        cognito_sub = uuid.uuid4()
+
+        result = User.objects.bulk_upsert(
+            [User(email="jane@example.com", cognito_sub=cognito_sub)],
+            unique_field="email",
+            update_fields=["cognito_sub"],
+        )
+
+        assert result == UpsertResult(updated=1)
+        existing.refresh_from_db()
+        assert existing.cognito_sub == cognito_sub
+
+    def test_batches(self, django_assert_num_queries):
+        users = [User(email=f"user{i}@example.com", cognito_sub=uuid.uuid4()) for i in range(5)]
+
+        with django_assert_num_queries(3):
+            result = User.objects.bulk_upsert(iter(users), update_fields=["email"], batch_size=2)
+
+        assert result == UpsertResult(created=5)
+
+    def test_last_duplicate_wins(self):
+        cognito_sub = uuid.uuid4()
+        users = [
+            User(email="jane@example.com", cognito_sub=cognito_sub, first_name="Jane"),
+            User(email="jane@example.com", cognito_sub=cognito_sub, first_name="Janet"),
+        ]
+
+        result = User.objects.bulk_upsert(users, update_fields=["first_name"])
+
+        assert result == UpsertResult(created=1)
+        assert User.objects.get().first_name == "Janet"
+
+    def test_invalidates_cognito_cache(self):
+        existing = User.objects.create(email="jane@example.com", cognito_sub=uuid.uuid4(), first_name="Jane")
+        payload = {"cognito:username": str(existing.cognito_sub)}
+        User.objects.get_or_create_for_cognito(payload)
+
+        User.objects.bulk_upsert(
+            [User(email="jane@example.com", cognito_sub=existing.cognito_sub, first_name="Janet")],
+            update_fields=["first_name"],
+        )
+
+        assert User.objects.get_or_create_for_cognito(payload).first_name == "Janet"
+
+    def test_rejects_updating_the_key(self):
+        with pytest.raises(ValueError, match="can not update"):
+            User.objects.bulk_upsert([], unique_field="email", update_fields=["email"])
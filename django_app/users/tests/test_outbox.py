@@ -0,0 +1,178 @@
+import importlib
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.apps import apps
+from django_celery_beat.models import PeriodicTask
+
+from django_app.core.exceptions import AuthError
+from django_app.core.exceptions import CognitoError
+from django_app.integrations.cognito.provider import get_cognito
+from django_app.integrations.cognito.provider import reset_cognito
+from django_app.users.constants import SignupStatus
+from django_app.users.models import SignupOutbox
+from django_app.users.models import User
+from django_app.users.outbox import create_signup
+from django_app.users.outbox import relay_signups
+from django_app.users.outbox import send_signup
+from django_app.users.tasks import relay_signups as relay_signups_task
+
+pytestmark = pytest.mark.django_db
+
+PASSWORD = "P@ssw0rd!"  # noqa: S105
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    reset_cognito()
+    yield
+    reset_cognito()
+
+
+def timeout():
+    return CognitoError(code="INTERNAL_ERROR")
+
+
+class TestCreateSignup:
+    def test_password_is_encrypted(self):
+        signup, created = create_signup("jane@example.com", PASSWORD)
+
+        assert created
+        assert signup.status == SignupStatus.PENDING.value
+        assert PASSWORD not in signup.password
+
+    def test_idempotency_key(self):
+        first, _ = create_signup("jane@example.com", PASSWORD, "key")
+        second, created = create_signup("jane@example.com", PASSWORD, "key")
+
+        assert second.pk == first.pk
+        assert not created
+
+    def test_idempotency_key_of_another_email(self):
+        first, _ = create_signup("jane@example.com", PASSWORD, "key")
+        second, created = create_signup("john@example.com", PASSWORD, "key")
+
+        assert created
+        assert second.pk != first.pk
+
+    def test_pending_email(self):
+        create_signup("jane@example.com", PASSWORD)
+
+        with pytest.raises(AuthError) as e:
+            create_signup("jane@example.com", PASSWORD)
+        assert e.value.code == "USER_EXISTS"
+
+    def test_existing_user(self):
+        User.objects.create(email="jane@example.com", cognito_sub=uuid.uuid4())
+
+        with pytest.raises(AuthError):
+            create_signup("jane@example.com", PASSWORD)
+
+
+class TestSendSignup:
+    def test_completed(self):
+        signup, _ = create_signup("jane@example.com", PASSWORD)
+
+        assert send_signup(signup.pk) == SignupStatus.COMPLETED.value
+
+        signup.refresh_from_db()
+        assert signup.password == ""
+        assert signup.user.email == "jane@example.com"
+        assert str(signup.cognito_sub) == get_cognito().get_user_sub("jane@example.com")
+        assert get_cognito().users["jane@example.com"]["password"] == PASSWORD
+        assert send_signup(signup.pk) is None
+
+    def test_retry_after_password_timeout(self):
+        signup, _ = create_signup("jane@example.com", PASSWORD)
+        cognito = get_cognito()
+
+        with mock.patch.object(cognito, "set_user_password", side_effect=timeout()), pytest.raises(CognitoError):
+            send_signup(signup.pk)
+
+        signup.refresh_from_db()
+        assert (signup.status, signup.claimed_until) == (SignupStatus.PENDING.value, None)
+        assert send_signup(signup.pk) == SignupStatus.COMPLETED.value
+
+    def test_adopts_user_of_lost_attempt(self, settings):
+        settings.COGNITO_SIGNUP_ID_ATTRIBUTE = "custom:signup_id"
+        signup, _ = create_signup("jane@example.com", PASSWORD)
+        cognito = get_cognito()
+        create_user = cognito.create_user
+
+        # The user is created but the response is lost.
+        def lost(*args):
+            create_user(*args)
+            raise timeout()
+
+        with mock.patch.object(cognito, "create_user", side_effect=lost), pytest.raises(CognitoError):
+            send_signup(signup.pk)
+
+        assert send_signup(signup.pk) == SignupStatus.COMPLETED.value
+        assert str(User.objects.get(email="jane@example.com").cognito_sub) == cognito.get_user_sub("jane@example.com")
+
+    def test_no_attribute_without_signup_id_attribute(self):
+        signup, _ = create_signup("jane@example.com", PASSWORD)
+
+        with mock.patch.object(get_cognito(), "create_user", wraps=get_cognito().create_user) as create_user:
+            assert send_signup(signup.pk) == SignupStatus.COMPLETED.value
+
+        create_user.assert_called_once_with("jane@example.com", PASSWORD, None)
+
+    def test_retry_does_not_adopt_another_user(self):
+        # A bulk imported user waiting for its first login, Cognito fails the first attempt.
+        sub = get_cognito().create_user("jane@example.com")
+        signup, _ = create_signup("jane@example.com", PASSWORD)
+        SignupOutbox.objects.filter(pk=signup.pk).update(attempts=1)
+
+        assert send_signup(signup.pk) == SignupStatus.FAILED.value
+        assert get_cognito().users["jane@example.com"]["password"] != PASSWORD
+        assert get_cognito().get_user_sub("jane@example.com") == sub
+        assert not User.objects.filter(email="jane@example.com").exists()
+
+    def test_existing_cognito_user(self):
+        get_cognito().create_user("jane@example.com")
+        signup, _ = create_signup("jane@example.com", PASSWORD)
+
+        assert send_signup(signup.pk) == SignupStatus.FAILED.value
+
+        signup.refresh_from_db()
+        assert (signup.error_code, signup.password) == ("USER_EXISTS", "")
+        assert not User.objects.filter(email="jane@example.com").exists()
+
+    def test_leased_signup_is_skipped(self):
+        signup, _ = create_signup("jane@example.com", PASSWORD)
+        SignupOutbox.objects.filter(pk=signup.pk).update(claimed_until=signup.created + timedelta(days=1))
+
+        assert send_signup(signup.pk) is None
+        assert not get_cognito().users
+
+
+class TestRelaySignups:
+    def test_relay(self, settings):
+        settings.SIGNUP_OUTBOX_RELAY_DELAY = 0
+        settings.SIGNUP_OUTBOX_MAX_ATTEMPTS = 2
+        lost, _ = create_signup("jane@example.com", PASSWORD)
+        given_up, _ = create_signup("john@example.com", PASSWORD)
+        SignupOutbox.objects.filter(pk=given_up.pk).update(attempts=2)
+
+        assert relay_signups() == [str(lost.pk)]
+        assert SignupOutbox.objects.get(pk=given_up.pk).status == SignupStatus.FAILED.value
+
+    def test_task(self, settings):
+        settings.CELERY_TASK_ALWAYS_EAGER = True
+        settings.SIGNUP_OUTBOX_RELAY_DELAY = 0
+        create_signup("jane@example.com", PASSWORD)
+
+        assert relay_signups_task() == 1
+        assert User.objects.filter(email="jane@example.com").exists()
+
+
+def test_schedule_migration():
+    migration = importlib.import_module("django_app.users.migrations.0008_relay_signups_schedule")
+
+    migration.create_schedule(apps, None)
+    migration.create_schedule(apps, None)
+
+    assert PeriodicTask.objects.get(name=migration.TASK_NAME).task == relay_signups_task.name
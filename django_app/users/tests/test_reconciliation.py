@@ -0,0 +1,116 @@
+import importlib
+import uuid
+from contextlib import ExitStack
+
+import pytest
+from django.apps import apps
+from django.core.cache import cache
+from django_celery_beat.models import PeriodicTask
+
+from django_app.integrations.cognito.provider import get_cognito
+from django_app.integrations.cognito.provider import reset_cognito
+from django_app.users.models import User
+from django_app.users.reconciliation import diff_accounts
+from django_app.users.reconciliation import external_sort
+from django_app.users.reconciliation import reconcile_users
+from django_app.users.tasks import reconcile_cognito_users
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    reset_cognito()
+    cache.clear()
+    yield
+    reset_cognito()
+    cache.clear()
+
+
+def create_user(email: str, *, in_db: bool = True) -> User | None:
+    cognito_sub = get_cognito().create_user(email)
+    return User.objects.create(email=email, cognito_sub=cognito_sub) if in_db else None
+
+
+class TestReconcileUsers:
+    def test_in_sync(self):
+        for i in range(5):
+            create_user(f"user{i}@example.com")
+
+        counts = reconcile_users(chunk_size=2)
+
+        assert counts["cognito_users"] == counts["db_users"] == 5  # noqa: PLR2004
+        assert counts["missing_in_db"] == counts["changed"] == counts["missing_in_cognito"] == 0
+
+    def test_repairs_drift(self):
+        for i in range(5):
+            create_user(f"user{i}@example.com")
+        # A signup failing after the Cognito call.
+        create_user("orphan@example.com", in_db=False)
+        get_cognito().users["user1@example.com"]["enabled"] = False
+        User.objects.create(email="local@example.com", cognito_sub=uuid.uuid4())
+
+        counts = reconcile_users(chunk_size=2)
+
+        assert (counts["missing_in_db"], counts["changed"], counts["missing_in_cognito"]) == (1, 1, 1)
+        assert (counts["created"], counts["updated"], counts["conflicts"]) == (1, 1, 0)
+        assert str(User.objects.get(email="orphan@example.com").cognito_sub) == get_cognito().get_user_sub(
+            "orphan@example.com",
+        )
+        assert not User.objects.get(email="user1@example.com").is_active
+        assert User.objects.filter(email="local@example.com").exists()
+        assert reconcile_users(chunk_size=2)["missing_in_db"] == 0
+
+    def test_report_only(self):
+        create_user("orphan@example.com", in_db=False)
+
+        counts = reconcile_users(repair=False)
+
+        assert counts["missing_in_db"] == 1
+        assert "created" not in counts
+        assert not User.objects.filter(email="orphan@example.com").exists()
+
+    def test_email_conflict(self):
+        create_user("jane@example.com", in_db=False)
+        User.objects.create(email="jane@example.com", cognito_sub=uuid.uuid4())
+
+        counts = reconcile_users()
+
+        assert (counts["missing_in_db"], counts["missing_in_cognito"], counts["conflicts"]) == (1, 1, 1)
+        assert counts["created"] == 0
+
+    def test_task_skips_overlapping_runs(self):
+        create_user("orphan@example.com", in_db=False)
+        cache.add("users:reconcile:lock", 1)
+
+        assert reconcile_cognito_users() is None
+        assert not User.objects.filter(email="orphan@example.com").exists()
+
+
+def test_external_sort():
+    subs = [str(uuid.uuid4()) for _ in range(25)]
+    with ExitStack() as stack:
+        accounts = list(external_sort(((sub, "", True) for sub in subs), 4, stack))
+
+    assert [account[0] for account in accounts] == sorted(subs)
+
+
+def test_diff_accounts():
+    cognito = [("a", "a@example.com", True), ("b", "b@example.com", True), ("d", "d@example.com", False)]
+    db = [("b", "b@example.com", True), ("c", "c@example.com", True), ("d", "d@example.com", True)]
+
+    assert list(diff_accounts(cognito, db)) == [
+        (cognito[0], None),
+        (None, db[1]),
+        (cognito[2], db[2]),
+    ]
+
+
+def test_schedule_migration():
+    migration = importlib.import_module("django_app.users.migrations.0006_reconcile_cognito_users_schedule")
+
+    migration.create_schedule(apps, None)
+    migration.create_schedule(apps, None)
+
+    task = PeriodicTask.objects.get(name=migration.TASK_NAME)
+    assert task.task == reconcile_cognito_users.name
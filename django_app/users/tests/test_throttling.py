@@ -0,0 +1,104 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from django_app.core.tests.test_ratelimit import FakeClock
+from django_app.integrations.cognito.provider import get_cognito
+from django_app.integrations.cognito.provider import reset_cognito
+from django_app.users.throttling import AuthThrottle
+
+PASSWORD = "P@ssw0rd!"  # noqa: S105
+
+
+@pytest.fixture(autouse=True)
+def clock(settings, monkeypatch) -> FakeClock:
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"auth_ip": "3/min", "auth_email": "2/min", "auth": "5/min"},
+    }
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    clock = FakeClock(1000.0)
+    monkeypatch.setattr(AuthThrottle, "clock", clock)
+    cache.clear()
+    reset_cognito()
+    get_cognito().signup_user("jane@example.com", PASSWORD)
+    yield clock
+    cache.clear()
+    reset_cognito()
+
+
+def login(email: str, ip: str = "10.0.0.1", url_name: str = "api:auth-login", **headers):
+    return APIClient(REMOTE_ADDR=ip).post(
+        reverse(url_name),
+        {"email": email, "password": PASSWORD},
+        format="json",
+        **headers,
+    )
+
+
+# Error responses roll back the request transaction, a test transaction could not be used after them.
+@pytest.mark.django_db(transaction=True)
+class TestAuthThrottle:
+    def test_email_bucket_across_ips(self, clock: FakeClock):
+        assert login("jane@example.com", "10.0.0.1").status_code == 200  # noqa: PLR2004
+        assert login("jane@example.com", "10.0.0.2").status_code == 200  # noqa: PLR2004
+
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(get_cognito(), "admin_login_user", pytest.fail)
+            response = login("jane@example.com", "10.0.0.3")
+
+        assert response.status_code == 429  # noqa: PLR2004
+        assert int(response.headers["Retry-After"]) == 50  # noqa: PLR2004
+
+        clock.now += 50
+        assert login("jane@example.com", "10.0.0.3").status_code == 200  # noqa: PLR2004
+
+    def test_ip_bucket_across_emails(self):
+        for i in range(3):
+            login(f"user{i}@example.com")
+
+        assert login("user3@example.com").status_code == 429  # noqa: PLR2004
+        assert login("user3@example.com", "10.0.0.2").status_code != 429  # noqa: PLR2004
+
+    def test_global_bucket(self):
+        for i in range(5):
+            login(f"user{i}@example.com", f"10.0.0.{i}")
+
+        assert login("user5@example.com", "10.0.0.5").status_code == 429  # noqa: PLR2004
+
+    def test_actions_are_throttled_apart(self):
+        for _ in range(2):
+            login("jane@example.com")
+
+        response = APIClient(REMOTE_ADDR="10.0.0.1").post(
+            reverse("api:auth-signup"),
+            {"email": "jane@example.com", "password": PASSWORD},
+            format="json",
+        )
+
+        assert response.status_code != 429  # noqa: PLR2004
+
+    def test_forwarded_for_is_not_trusted(self):
+        for i in range(3):
+            login(f"user{i}@example.com", HTTP_X_FORWARDED_FOR=f"192.168.0.{i}")
+
+        assert login("user3@example.com", HTTP_X_FORWARDED_FOR="192.168.0.3").status_code == 429  # noqa: PLR2004
+
+    def test_forwarded_for_of_trusted_proxy(self, settings):
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        for i in range(3):
+            login(f"user{i}@example.com", HTTP_X_FORWARDED_FOR="192.168.0.1, 172.16.0.1")
+
+        response = login("user3@example.com", HTTP_X_FORWARDED_FOR="192.168.0.1, 172.16.0.2")
+        assert response.status_code != 429  # noqa: PLR2004
+
+    def test_async_login_shares_the_buckets(self):
+        for _ in range(2):
+            login("jane@example.com")
+
+        response = login("jane@example.com", "10.0.0.2", "api:auth-async-login")
+
+        assert response.status_code == 429  # noqa: PLR2004
+        assert int(response.headers["Retry-After"]) > 0
+        assert response.json()["errors"][0]["field"] == "detail"
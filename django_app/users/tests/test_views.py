@@ -0,0 +1,127 @@
+import time
+from http import HTTPStatus
+
+import jwt
+import pytest
+from botocore.stub import ANY
+from botocore.stub import Stubber
+from django.core.cache import cache
+from django.urls import reverse
+
+from django_app.integrations.cognito.real_cognito import RealCognito
+from django_app.users import outbox
+from django_app.users import views
+from django_app.users.constants import SignupStatus
+from django_app.users.models import User
+
+SUB = "9a8e6a4c-3a53-4c38-9d41-1d7c8e5f6f10"
+PASSWORD = "P@ssw0rd!"  # noqa: S105
+
+
+@pytest.fixture()
+def stubber(monkeypatch):
+    cognito = RealCognito()
+    monkeypatch.setattr(views, "get_cognito", lambda: cognito)
+    monkeypatch.setattr(outbox, "get_cognito", lambda: cognito)
+
+    with Stubber(cognito.client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+@pytest.mark.django_db()
+class TestSignup:
+    @pytest.fixture(autouse=True)
+    def _eager_tasks(self, settings):
+        settings.CELERY_TASK_ALWAYS_EAGER = True
+
+    def signup(self, client, django_capture_on_commit_callbacks, **headers):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse("api:auth-signup"),
+                {"email": "john@example.com", "password": PASSWORD},
+                content_type="application/json",
+                headers=headers,
+            )
+        assert response.status_code == HTTPStatus.ACCEPTED
+        return client.get(response.headers["Location"])
+
+    def test_signup_makes_two_cognito_calls(self, client, stubber: Stubber, django_capture_on_commit_callbacks):
+        stubber.add_response(
+            "admin_create_user",
+            {"User": {"Attributes": [{"Name": "sub", "Value": SUB}]}},
+        )
+        stubber.add_response("admin_set_user_password", {})
+
+        response = self.signup(client, django_capture_on_commit_callbacks)
+
+        assert response.json()["status"] == SignupStatus.COMPLETED.value
+        assert User.objects.filter(email="john@example.com", cognito_sub=SUB).exists()
+
+    def test_signup_user_exists(self, client, stubber: Stubber, django_capture_on_commit_callbacks):
+        stubber.add_client_error("admin_create_user", service_error_code="UsernameExistsException")
+
+        response = self.signup(client, django_capture_on_commit_callbacks)
+
+        assert response.json()["status"] == SignupStatus.FAILED.value
+        assert response.json()["error_code"] == "USER_EXISTS"
+        assert not User.objects.filter(email="john@example.com").exists()
+
+    def test_signup_is_idempotent(self, client, stubber: Stubber, django_capture_on_commit_callbacks):
+        stubber.add_response(
+            "admin_create_user",
+            {"User": {"Attributes": [{"Name": "sub", "Value": SUB}]}},
+        )
+        stubber.add_response("admin_set_user_password", {})
+
+        first = self.signup(client, django_capture_on_commit_callbacks, idempotency_key="abc")
+        second = self.signup(client, django_capture_on_commit_callbacks, idempotency_key="abc")
+
+        assert first.json() == second.json()
+
+    def test_status_needs_signed_location(self, client):
+        signup, _ = outbox.create_signup("john@example.com", PASSWORD)
+
+        response = client.get(reverse("api:auth-signup-status", kwargs={"token": f"{signup.pk}:forged"}))
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+# Error responses roll back the request transaction, a test transaction could not be used after them.
+@pytest.mark.django_db(transaction=True)
+class TestRefresh:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def refresh(self, client):
+        return client.post(reverse("api:auth-refresh"), {"refresh_token": "refresh"}, content_type="application/json")
+
+    def test_refresh_is_cached(self, client, stubber: Stubber):
+        id_token = jwt.encode({"cognito:username": SUB, "iat": int(time.time())}, "secret" * 8, algorithm="HS256")
+        stubber.add_response(
+            "admin_initiate_auth",
+            {"AuthenticationResult": {"IdToken": id_token, "AccessToken": "access", "ExpiresIn": 3600}},
+            {
+                "UserPoolId": ANY,
+                "ClientId": ANY,
+                "AuthFlow": "REFRESH_TOKEN_AUTH",
+                "AuthParameters": {"REFRESH_TOKEN": "refresh"},
+            },
+        )
+
+        first = self.refresh(client)
+        second = self.refresh(client)
+
+        assert first.status_code == HTTPStatus.OK
+        assert first.json()["id_token"] == second.json()["id_token"] == id_token
+
+    def test_invalid_refresh_token(self, client, stubber: Stubber):
+        stubber.add_client_error("admin_initiate_auth", service_error_code="NotAuthorizedException")
+
+        response = self.refresh(client)
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()["errors"]["code"] == "ERR_AUTH_INVALID_REFRESH_TOKEN"
@@ -0,0 +1,52 @@
+"""Define the auth throttles, this file limits the attempts to sign up and log in."""
+
+import hashlib
+
+from django.http import HttpRequest
+
+from django_app.core.throttling import SlidingWindowThrottle
+
+
+class AuthThrottle(SlidingWindowThrottle):
+    """
+    Throttle of the sign-up and login APIs, checked before any Cognito call
+
+    - `auth_ip`: attempts of a client IP, whatever the account
+    - `auth_email`: attempts on an account, from any IP (credential stuffing)
+    - `auth`: attempts of all clients together, keeping Cognito under its quota
+
+    Every action has its own buckets, shared by the DRF and the async views
+    of the action. The client IP is read like DRF does, `NUM_PROXIES` sets
+    how many `X-Forwarded-For` entries are trusted.
+    """
+
+    scopes = ("auth_ip", "auth_email", "auth")
+
+    def get_cache_key(self, request, view, scope: str) -> str | None:
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        return self.get_bucket(scope, view.action, self.get_ident(request), email)
+
+    def get_bucket(self, scope: str, action: str, ident: str, email) -> str | None:
+        """
+        Get the bucket of an attempt in a scope, None to not count it there
+        """
+        if scope == "auth_ip":
+            return f"{action}:{ident}"
+        if scope == "auth_email":
+            if not isinstance(email, str) or not email.strip():
+                return None
+            # Hashed, the cache does not need to hold the emails.
+            return f"{action}:{hashlib.sha256(email.strip().lower().encode()).hexdigest()}"
+        return action
+
+    def allow_plain_request(self, request: HttpRequest, action: str, data: dict) -> bool:
+        """
+        Check a request of a plain Django view, e.g. the async views, against the buckets of `action`
+
+        Args:
+            request (HttpRequest): The request
+            action (str): The action of the DRF view set doing the same, e.g. login
+            data (dict): The parsed body
+        """
+        ident = self.get_ident(request)
+        return self.hit(lambda scope: self.get_bucket(scope, action, ident, data.get("email")))
@@ -1,19 +1,44 @@
+from functools import partial
+
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
+from rest_framework.permissions import IsAdminUser
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.viewsets import ViewSet
 
-from django_app.core.exceptions import AuthError
+from django_app.core.parsers import CSVStreamParser
+from django_app.core.parsers import NDJSONStreamParser
+from django_app.core.parsers import ORJSONParser
 from django_app.core.views import BaseModelViewSet
+from django_app.core.views import BaseViewSet
 from django_app.core.views import CommonViewSet
-from django_app.integrations.cognito.real_cognito import RealCognito
+from django_app.integrations.cognito.provider import get_cognito
+from django_app.integrations.cognito.token_cache import get_refreshed_token_cache
 from django_app.users.models import User
-
+from django_app.users.models import UserImport
+
+from .cache import get_me_data
+from .cache import set_me_data
+from .imports import read_import
+from .models import SignupOutbox
+from .outbox import create_signup
+from .outbox import sign_signup_id
+from .outbox import unsign_signup_id
+from .serializers import RefreshRequestSerializer
 from .serializers import SignupRequestSerializer
+from .serializers import SignupSerializer
+from .serializers import UserImportRequestSerializer
+from .serializers import UserImportSerializer
 from .serializers import UserSerializer
-
-cognito = RealCognito()
+from .tasks import import_users_chunk
+from .tasks import send_signup
+from .throttling import AuthThrottle
 
 
 class AuthViewSet(ViewSet, CommonViewSet):
@@ -24,57 +49,161 @@ class AuthViewSet(ViewSet, CommonViewSet):
     authentication_classes = []
     permission_classes = [AllowAny]
 
-    @action(detail=False, methods=["post"], url_path="sign-up")
+    @action(detail=False, methods=["post"], url_path="sign-up", throttle_classes=[AuthThrottle])
     def signup(self, request: Request) -> Response:
         """
-        The Signup API creates new a user account
+        The Signup API accepts a new user account, created in the background
 
-        - Check if user already exists (error)
+        - Write the signup to the outbox with the request transaction, an
+          existing user is rejected (error)
+        - Create the Cognito user, then the user row, by the `send_signup` task
+          once committed; poll the `Location` until the status is not pending
         - Send invitation email (default by cognito)
+
+        A request repeated with the same `Idempotency-Key` header and email
+        gets the signup of the first one rather than an error. The `Location`
+        is signed, a signup id alone does not give its status.
         """
         serializer = SignupRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email, password = serializer.data["email"], serializer.data["password"]
 
-        if cognito.is_user_existed(email):
-            raise AuthError(code="USER_EXISTS")
+        signup, created = create_signup(email, password, request.headers.get("Idempotency-Key"))
+        if created:
+            transaction.on_commit(partial(send_signup.delay, str(signup.pk)))
 
-        # Cognito user create and set password
-        cognito_sub = cognito.create_user(email, password)
-        cognito.set_user_password(email, password)
+        location = reverse("api:auth-signup-status", kwargs={"token": sign_signup_id(signup.pk)}, request=request)
+        return self.accepted(SignupSerializer(signup).data, headers={"Location": location})
 
-        # Create user in database
-        User.objects.create(cognito_sub=cognito_sub, email=email)
-
-        return self.created()
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"sign-up/(?P<token>[0-9a-f-]{36}:[\w-]+)",
+        url_name="signup-status",
+    )
+    def signup_status(self, request: Request, token: str) -> Response:
+        """
+        Get the status of a signup from the `Location` of the signup request,
+        `error_code` tells why a signup failed
+        """
+        signup_id = unsign_signup_id(token)
+        if signup_id is None:
+            raise Http404
+        signup = get_object_or_404(SignupOutbox, pk=signup_id)
+        return self.ok(SignupSerializer(signup).data)
 
-    @action(detail=False, methods=["post"])
+    @action(detail=False, methods=["post"], throttle_classes=[AuthThrottle])
     def login(self, request):
         """
         Login user
         Note: This API is for admin test login user only
         """
-        data = cognito.admin_login_user(
+        data = get_cognito().admin_login_user(
             request.data["email"],
             request.data["password"],
         )
         return self.ok(data)
 
+    @action(detail=False, methods=["post"], throttle_classes=[AuthThrottle])
+    def refresh(self, request: Request) -> Response:
+        """
+        The Refresh API exchanges the refresh token of a login for new id and access tokens
+
+        The tokens are cached until shortly before they expire, repeated and
+        concurrent refreshes of the same token get the same tokens from a
+        single Cognito call, see `django_app/integrations/cognito/token_cache.py`
+        """
+        serializer = RefreshRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        data = get_refreshed_token_cache().get_or_refresh(
+            serializer.validated_data["refresh_token"],
+            get_cognito().admin_refresh_tokens,
+        )
+        return self.ok(data)
+
 
 class UserViewSet(BaseModelViewSet):
     serializer_class = UserSerializer
     queryset = User.objects.all()
+    list_from_values = True
+    filterset_fields = {
+        "email": ["exact", "startswith"],
+        "created": ["gte", "lt"],
+        "country": ["exact"],
+        "state": ["exact"],
+        "gender": ["exact", "in"],
+        "race": ["exact", "in"],
+    }
 
     @action(detail=False)
     def me(self, request):
         """
         Get current user request
 
+        The serialized user is cached per user, see `django_app/users/cache.py`
+
         Args:
             request (Request): The request object
 
         Returns:
-            Response: The response object
+            Response: The response object, 304 when the client copy is current
+        """
+        user = request.user
+        response = self.not_modified(user.pk, user.modified)
+        if response is not None:
+            return response
+
+        data = get_me_data(user)
+        if data is None:
+            data = self.get_serializer(user, fields=None).data
+            set_me_data(user, data)
+
+        # The cache holds every field, `?fields=` is applied to the cached copy.
+        fields = self.get_requested_fields()
+        if fields is not None:
+            data = {name: value for name, value in data.items() if name in fields}
+        return self.set_validators(self.ok(data), user.pk, user.modified)
+
+
+# Chunks are queued while the upload is read, the job row they update must be committed first.
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class UserImportViewSet(BaseViewSet):
+    """
+    Bulk user import view set
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [CSVStreamParser, NDJSONStreamParser, ORJSONParser]
+    lookup_value_regex = "[0-9a-f-]{36}"
+
+    def create(self, request: Request) -> Response:
+        """
+        The bulk import API creates the users of a CSV, NDJSON or JSON array upload
+
+        - The upload is read as a stream, valid rows are queued in chunks of
+          `USERS_IMPORT_CHUNK_SIZE` as soon as they are read
+        - Users are created in Cognito (invitation email sent by cognito) then
+          in the database by the `import_users_chunk` tasks
+        - `?adopt_existing=true` links the rows of emails that already have a
+          Cognito user to it, by default these rows fail as conflicts
+        - Responds 202 with the job, its URL (Location header) reports the progress
+        """
+        params = UserImportRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        rows = request.data
+        user_import = UserImport.objects.create(created_by=request.user, **params.validated_data)
+        for chunk in read_import(user_import, rows):
+            import_users_chunk.delay(str(user_import.pk), chunk)
+
+        user_import.refresh_from_db()
+        location = reverse("api:user-import-detail", kwargs={"pk": user_import.pk}, request=request)
+        return self.accepted(UserImportSerializer(user_import).data, headers={"Location": location})
+
+    def retrieve(self, request: Request, pk=None) -> Response:
+        """
+        Get the progress of a bulk import
         """
-        serializer = UserSerializer(request.user)
-        return self.ok(serializer.data)
+        user_import = get_object_or_404(UserImport, pk=pk)
+        return self.ok(UserImportSerializer(user_import).data)